@@ -1,18 +1,22 @@
 from __future__ import annotations
 
 from logging import getLogger
+from typing import TYPE_CHECKING
 
 from homeassistant import loader
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.device_registry import DeviceEntry
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN
+from .const import DOMAIN, SNAPSHOT_VERSION
 from .common import strepr
-from .coordinator import Coordinator
+
+if TYPE_CHECKING:
+    from .coordinator import Coordinator
 
 _LOGGER = getLogger(__name__)
 
@@ -28,11 +32,21 @@ async def async_setup(hass: HomeAssistant, _: ConfigType) -> bool:
     except loader.IntegrationNotFound as e:
         _LOGGER.debug(f"Error reading version: {strepr(e)}")
 
+    # Imported at setup rather than with the package, they pull in the coordinator
+    #
+    from . import services, view, websocket_api
+
+    websocket_api.async_setup(hass)
+    view.async_setup(hass)
+    services.async_setup(hass)
+
     return True
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[Coordinator]):
     _LOGGER.debug(f"async_setup_entry({config_entry.as_dict()})")
 
+    from .coordinator import Coordinator
+
     # Initiaize coordinator and fetch initial data
     #
     _LOGGER.debug(f"async_setup_entry: Coordinator.init -> async_config_entry_first_refresh")
@@ -47,9 +61,14 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[Coord
 
     # Post forward setup
     #
-    _LOGGER.debug(f"async_setup_entry: Coordinator.async_refresh")
+    if config_entry.runtime_data.restored:
+        _LOGGER.debug(f"async_setup_entry: Coordinator.async_revalidate")
+
+        config_entry.async_create_background_task(hass, config_entry.runtime_data.async_revalidate(), f"{DOMAIN} - {config_entry.title} - revalidate")
+    else:
+        _LOGGER.debug(f"async_setup_entry: Coordinator.async_refresh")
 
-    await config_entry.runtime_data.async_refresh()
+        await config_entry.runtime_data.async_refresh()
 
     # Add update listener
     #
@@ -57,6 +76,8 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry[Coord
 
     async def async_update_listener(hass: HomeAssistant, config_entry: ConfigEntry[Coordinator]) -> None:
         _LOGGER.debug(f"async_update_listener({config_entry.as_dict()})")
+        if config_entry.runtime_data.apply_options(config_entry.options):
+            return
         await hass.config_entries.async_reload(config_entry.entry_id)
 
     config_entry.async_on_unload(config_entry.add_update_listener(async_update_listener))
@@ -72,6 +93,11 @@ async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry[Coor
 
     return await hass.config_entries.async_unload_platforms(config_entry, _PLATFORMS)
 
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry[Coordinator]) -> None:
+    _LOGGER.debug(f"async_remove_entry({config_entry.as_dict()})")
+
+    await Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{config_entry.entry_id}").async_remove()
+
 async def async_remove_config_entry_device(_: HomeAssistant, config_entry: ConfigEntry[Coordinator], device_entry: DeviceEntry):
     _LOGGER.debug(f"async_remove_config_entry_device({config_entry.as_dict()}, {device_entry})")
 
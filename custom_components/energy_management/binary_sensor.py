@@ -3,10 +3,12 @@ from __future__ import annotations
 from logging import getLogger
 
 from homeassistant.core import HomeAssistant
+from homeassistant.const import MATCH_ALL
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.components.binary_sensor import BinarySensorEntity
 
+from .money import to_float
 from .coordinator import Coordinator
 from .entity import EnergyManagementEntity
 
@@ -21,7 +23,8 @@ async def async_setup_entry(_: HomeAssistant, config_entry: ConfigEntry[Coordina
         ExportSensor(config_entry.runtime_data),
         OverflowSensor(config_entry.runtime_data),
         SuppressExportSensor(config_entry.runtime_data),
-        CostRateBelowMeanElectricitySensor(config_entry.runtime_data)
+        CostRateBelowMeanElectricitySensor(config_entry.runtime_data),
+        StaleSensor(config_entry.runtime_data)
     ])
 
 class EnergyManagementBinarySensorEntity(EnergyManagementEntity, BinarySensorEntity):
@@ -29,6 +32,7 @@ class EnergyManagementBinarySensorEntity(EnergyManagementEntity, BinarySensorEnt
 
 class BatteryChargeFromGridSensor(EnergyManagementBinarySensorEntity):
     _attr_icon = "mdi:power-plug-battery"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Battery - charge from Grid"
@@ -38,11 +42,12 @@ class BatteryChargeFromGridSensor(EnergyManagementBinarySensorEntity):
         super().update()
         if not (o := self.coordinator.data.optimization):
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[3] for k, v in o.items()}
-        self._attr_is_on = o[self.coordinator.data.now][3]
+        self._attr_extra_state_attributes = o.series("charge")
+        self._attr_is_on = o[self.coordinator.data.now].charge
 
 class BatteryDischargeToGridSensor(EnergyManagementBinarySensorEntity):
     _attr_icon = "mdi:power-plug-battery-outline"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Battery - discharge to Grid"
@@ -52,11 +57,12 @@ class BatteryDischargeToGridSensor(EnergyManagementBinarySensorEntity):
         super().update()
         if not (data := self.coordinator.data) or not data.optimization:
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[4] for k, v in data.optimization.items()}
-        self._attr_is_on = data.optimization[self.coordinator.data.now][4] and data.compensation_rate[data.now] >= 0
+        self._attr_extra_state_attributes = data.optimization.series("discharge")
+        self._attr_is_on = data.optimization[self.coordinator.data.now].discharge and data.compensation_rate[data.now] >= 0
 
 class ExportSensor(EnergyManagementBinarySensorEntity):
     _attr_icon = "mdi:transmission-tower-import"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Export"
@@ -66,8 +72,8 @@ class ExportSensor(EnergyManagementBinarySensorEntity):
         super().update()
         if not (o := self.coordinator.data.optimization):
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[5] for k, v in o.items()}
-        self._attr_is_on = o[self.coordinator.data.now][5]
+        self._attr_extra_state_attributes = o.series("export")
+        self._attr_is_on = o[self.coordinator.data.now].export
 
 class OverflowSensor(EnergyManagementBinarySensorEntity):
     _attr_icon = "mdi:transmission-tower-off"
@@ -91,11 +97,12 @@ class OverflowSensor(EnergyManagementBinarySensorEntity):
                     end_time = k
                 else:
                     break
-            v = -sum(v[1] + v[6] for k, v in data.optimization.items() if data.now <= k <= end_time)
+            v = -sum(v.grid + v.surplus for k, v in data.optimization.items() if data.now <= k <= end_time)
         self._attr_extra_state_attributes["value"] = v
 
 class SuppressExportSensor(EnergyManagementBinarySensorEntity):
     _attr_icon = "mdi:transmission-tower-import"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Suppress export"
@@ -105,7 +112,7 @@ class SuppressExportSensor(EnergyManagementBinarySensorEntity):
         super().update()
         if not (data := self.coordinator.data):
             return
-        self._attr_extra_state_attributes = {k.astimezone(self.coordinator.data.zone_info).isoformat(): v < 0 for k, v in data.compensation_rate.items()}
+        self._attr_extra_state_attributes = data.series("compensation_negative")
         self._attr_is_on = data.compensation_rate[data.now] < 0
 
 class CostRateBelowMeanElectricitySensor(EnergyManagementBinarySensorEntity):
@@ -120,5 +127,20 @@ class CostRateBelowMeanElectricitySensor(EnergyManagementBinarySensorEntity):
         if (data := self.coordinator.data) is None:
             return
         self._attr_is_on = False
-        self._attr_extra_state_attributes["mean"] = float(data.mean)
+        self._attr_extra_state_attributes["mean"] = to_float(data.mean)
         self._attr_is_on = data.rates_full[data.now] < data.mean
+
+class StaleSensor(EnergyManagementBinarySensorEntity):
+    _attr_icon = "mdi:clock-alert-outline"
+
+    def __init__(self, coordinator: Coordinator) -> None:
+        self._attr_name = "Stale inputs"
+        self._attr_device_class = "problem"
+        super().__init__(coordinator)
+
+    def update(self):
+        super().update()
+        if (data := self.coordinator.data) is None:
+            return
+        self._attr_is_on = bool(stale := self.coordinator.stale(data.now))
+        self._attr_extra_state_attributes["inputs"] = stale
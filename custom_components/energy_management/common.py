@@ -41,5 +41,13 @@ async def pg(s: ClientSession, url: str, data: Any | None = None, json: Any | No
     except ClientError as e:
         raise e
 
+async def pgr(s: ClientSession, url: str, data: bytes, headers: dict | None = None) -> tuple[str, str | None, bytes]:
+    try:
+        async with s.post(url, data = data, headers = headers) as r:
+            r.raise_for_status()
+            return r.content_type, r.headers.get("Content-Encoding"), await r.read()
+    except ClientError as e:
+        raise e
+
 async def ec():
     pass
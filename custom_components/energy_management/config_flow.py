@@ -11,7 +11,8 @@ from homeassistant.data_entry_flow import section
 from homeassistant.helpers import selector
 from homeassistant.core import callback
 
-from .const import DOMAIN
+from .const import DOMAIN, RATES_LOOKBACK, RATES_RETENTION, FRESHNESS, MEMORY_CACHE_ENTRIES, MEMORY_COST_DAYS
+from .transport import ENCODINGS
 
 _LOGGER = getLogger(__name__)
 
@@ -22,6 +23,7 @@ DATA_SCHEMA = vol.Schema({
     vol.Required("rate", default = "D57d", description = {SUGGESTED_VALUE: "D57d"}): selector.SelectSelector(selector.SelectSelectorConfig(options = ["D01d", "D02d", "D25d", "D26d", "D27d", "D35d", "D45d", "D56d", "D57d", "D61d"], mode = "dropdown")),
     vol.Required("tariff", default = "EVV1", description = {SUGGESTED_VALUE: "EVV1"}): str,
     vol.Required("spot_hourly", default = False, description = {SUGGESTED_VALUE: False}): bool,
+    vol.Required("lookback", default = RATES_LOOKBACK, description = {SUGGESTED_VALUE: RATES_LOOKBACK}): vol.All(vol.Coerce(int), vol.Range(min = 1, max = RATES_RETENTION)),
     vol.Required("fix"): section(
         vol.Schema({
             vol.Optional("t1_id", description = {SUGGESTED_VALUE: None}): selector.EntitySelector(selector.EntitySelectorConfig(multiple = False)),
@@ -39,6 +41,24 @@ DATA_SCHEMA = vol.Schema({
     vol.Optional("import_ids", description = {SUGGESTED_VALUE: None}): selector.EntitySelector(selector.EntitySelectorConfig(device_class = SensorDeviceClass.POWER, multiple = True)),
     vol.Optional("export_id", description = {SUGGESTED_VALUE: None}): selector.EntitySelector(selector.EntitySelectorConfig(device_class = SensorDeviceClass.POWER, multiple = False)),
     vol.Optional("key", default = "", description = {SUGGESTED_VALUE: ""}): str,
+    vol.Required("transport"): section(
+        vol.Schema({
+            vol.Required("encoding", default = "json", description = {SUGGESTED_VALUE: "json"}): selector.SelectSelector(selector.SelectSelectorConfig(options = list(ENCODINGS), mode = "dropdown", translation_key = "encoding")),
+            vol.Required("compression", default = False, description = {SUGGESTED_VALUE: False}): bool,
+        }),
+        {"collapsed": True}
+    ),
+    vol.Required("freshness"): section(
+        vol.Schema({vol.Required(k, default = v, description = {SUGGESTED_VALUE: v}): vol.All(vol.Coerce(int), vol.Range(min = 1)) for k, v in FRESHNESS.items()}),
+        {"collapsed": True}
+    ),
+    vol.Required("memory"): section(
+        vol.Schema({
+            vol.Required("cache_entries", default = MEMORY_CACHE_ENTRIES, description = {SUGGESTED_VALUE: MEMORY_CACHE_ENTRIES}): vol.All(vol.Coerce(int), vol.Range(min = 64)),
+            vol.Required("cost_days", default = MEMORY_COST_DAYS, description = {SUGGESTED_VALUE: MEMORY_COST_DAYS}): vol.All(vol.Coerce(int), vol.Range(min = 1)),
+        }),
+        {"collapsed": True}
+    ),
 })
 
 class ConfigFlowHandler(ConfigFlow, domain = DOMAIN):
@@ -55,7 +75,7 @@ class ConfigFlowHandler(ConfigFlow, domain = DOMAIN):
         _LOGGER.debug(f"ConfigFlowHandler.async_step_user: {user_input}")
         if user_input is None:
             return self.async_show_form(step_id = "user", data_schema = self.add_suggested_values_to_schema(DATA_SCHEMA, user_input))
-        return self.async_create_entry(title = "Energy Management", data = {}, options = user_input)
+        return self.async_create_entry(title = f"Energy Management {n + 1}" if (n := len(self._async_current_entries(include_ignore = False))) else "Energy Management", data = {}, options = user_input)
 
 class OptionsFlowHandler(OptionsFlow):
     def __init__(self, entry: ConfigEntry) -> None:
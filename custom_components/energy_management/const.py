@@ -1,13 +1,9 @@
 from __future__ import annotations
 
-from holidays import country_holidays
 from datetime import timedelta
-from decimal import Decimal
 
 DOMAIN = "energy_management"
 
-HOLIDAYS = country_holidays("CZ")
-
 URL = "https://optimization.ranware.com/v0"
 
 TIME_QOUR = timedelta(minutes = 15)
@@ -15,12 +11,104 @@ TIME_DOUR = timedelta(minutes = 30)
 TIME_HOUR = timedelta(hours = 1)
 TIME_DAY = timedelta(days = 1)
 
+# Options that can be applied without reloading the config entry and the stages they invalidate
+#
+OPTIONS_RUNTIME = {
+    "capacity": ("plan",),
+    "amortization": ("plan",),
+    "battery": ("plan",),
+    "battery_entity_ids": ("profile", "plan"),
+    "exclude_entity_ids": ("profile", "plan"),
+    "import_ids": ("plan",),
+    "export_id": ("plan",),
+    "key": ("plan",),
+    "transport": ("plan",),
+    "memory": (),
+    "freshness": (),
+    "soc_limit": ("plan",),
+    "soc_max": ("plan",),
+    "soc_min": ("plan",),
+    "soc_reserve": ("plan",),
+    "soc_threshold": (),
+    "charge_power": ("plan",),
+    "discharge_power": ("plan",),
+    "coefficient": ("plan",),
+    "coefficient_strategy": ("plan",),
+    "consumption_strategy": ("profile", "plan"),
+    "strategy": ("plan",),
+    "now_strategy": ("plan",)
+}
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# Import time of the package, coordinator and platforms on top of the Home Assistant modules they use [s], see tests/test_import.py
+#
+IMPORT_BUDGET = 0.25
+
+RATES_RETENTION = 30
+
+# Days of rates kept in the window around today, lookahead is bound by day-ahead market publication
+#
+RATES_LOOKBACK = 1
+RATES_LOOKAHEAD = 1
+
+# Validity of resources shared by entries through the provider hub (seconds)
+#
+HUB_RETRY = 60
+HUB_RATE_TTL = 3600
+HUB_INTERVALS_TTL = 86400
+HUB_LAYER_TTL = 2 * 86400
+
 TIMINGS_INTERVAL = 60
 TIMINGS_UPDATE_INTERVAL = timedelta(seconds = TIMINGS_INTERVAL)
 
-ZERO_DECIMAL = Decimal("0")
-PZERO_DECIMAL = Decimal(".0")
-RATES_DEFAULT = [PZERO_DECIMAL for _ in range(24)]
+# Inputs of the pipeline and their default staleness thresholds [min]
+#
+FRESHNESS = {
+    "rates": 1560,
+    "ote": 1560,
+    "cnb": 5760,
+    "hdo": 2880,
+    "forecast": 360,
+    "profile": 120,
+    "battery": 30,
+    "solve": 30
+}
+
+# Memory accounting, default caps of shared caches (entries) and cost history (days)
+#
+MEMORY_CACHE_ENTRIES = 4096
+MEMORY_COST_DAYS = 366
+MEMORY_INTERVAL = 300
+
+# Trace stages, (emit every n-th event, field size cap in characters)
+#
+TRACE = {
+    "rates": (1, 256),
+    "forecast": (4, 256),
+    "query": (4, 512),
+    "sql": (1, 4096),
+    "optimizer": (1, 4096),
+    "provider": (1, 1024)
+}
+
+# Input size from which CPU bound steps run in the executor instead of the event loop (xml: response characters,
+# query/forecast/series: slots, payload: slots, a quarter of it with compression, plan: response bytes)
+#
+OFFLOAD = {
+    "xml": 65536,
+    "query": 1024,
+    "forecast": 1024,
+    "payload": 384,
+    "plan": 65536,
+    "series": 672
+}
+
+PROFILE_REFRESHES_MAX = 10
+PROFILE_TOP = 40
+
+RATES_DEFAULT = [0 for _ in range(24)]
 
 SQL_QUERY_TEMPLATE = """
 WITH filtered AS (
@@ -124,3 +212,15 @@ SQL_QUERY_BATTERY_SQLITE_PARAMS = {
     "datetime": "strftime('%Y-%m-%d %H:%M:%S', t.last_changed_ts, 'unixepoch', '{offset}')",
     "date_sub": "strftime('%Y-%m-%d %H:%M:%S', 'now', '-{days} day', '{offset}')",
 }
+
+# Holiday calendar is built on first access
+#
+_LAZY = {"HOLIDAYS"}
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from holidays import country_holidays
+
+    value = globals()[name] = country_holidays("CZ")
+    return value
@@ -1,56 +1,73 @@
 from __future__ import annotations
 
 import sys
+import json
 import asyncio
+import hashlib
 import itertools
 
-from typing import Any
+from time import monotonic
+
+from typing import TYPE_CHECKING, Any, Callable, Mapping, NamedTuple
 from pathlib import Path
 from operator import add
-from decimal import Decimal
 from functools import reduce
 from logging import getLogger
 from zoneinfo import ZoneInfo
-from holidays import country_holidays
-from datetime import datetime, timedelta
-from collections.abc import AsyncGenerator
-
-import aiofiles
-import sqlalchemy
+from datetime import date, datetime, timedelta
+from collections.abc import AsyncGenerator, Iterator
 
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, scoped_session, sessionmaker
-from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, async_sessionmaker, AsyncSession
 
 from homeassistant.util.dt import UTC, utcnow
 from homeassistant.core import Event, HomeAssistant, callback, CALLBACK_TYPE
 from homeassistant.const import ATTR_CONFIGURATION_URL, ATTR_IDENTIFIERS, ATTR_MANUFACTURER, ATTR_MODEL, ATTR_NAME, ATTR_SW_VERSION, EVENT_HOMEASSISTANT_STARTED, STATE_UNKNOWN, STATE_UNAVAILABLE
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers import aiohttp_client
 from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed, event
 from homeassistant.components.energy.data import async_get_manager
 from homeassistant.components.energy.websocket_api import async_get_energy_platforms
 from homeassistant.components.recorder import SupportedDialect, get_instance
-from homeassistant.components.recorder.history import get_significant_states_with_session
-from homeassistant.components.recorder.statistics import StatisticResult
-from homeassistant.components.recorder.util import session_scope
-from homeassistant.components.sensor.recorder import compile_statistics
 #from homeassistant.components.sql.sensor import _generate_lambda_stmt, _validate_and_get_session_maker_for_db_url, _async_get_or_init_domain_data
-from homeassistant.components.sql.util import resolve_db_url, redact_credentials
 
-from . import common
-from .util import generate_query_string_simple, generate_query_string, generate_lambda_stmt
-from .const import DOMAIN, URL, TIME_QOUR, TIME_DOUR, TIME_HOUR, TIME_DAY, ZERO_DECIMAL
+from . import common, hub, memory, money, trace, transport, providers
+from .util import generate_query_string_simple, generate_query_string, generate_lambda_stmt, sql_lambda_usage
+from .plan import Plan, PlanView
+from .rates import RateCache
+from .segments import DayRing, Segment
+from .timings import Stage, Timings, offload
+from .const import DOMAIN, URL, TIME_QOUR, TIME_DOUR, TIME_HOUR, TIME_DAY, OPTIONS_RUNTIME, SNAPSHOT_VERSION, SNAPSHOT_SAVE_DELAY, RATES_RETENTION, RATES_LOOKBACK, RATES_LOOKAHEAD, FRESHNESS, MEMORY_CACHE_ENTRIES, MEMORY_COST_DAYS, MEMORY_INTERVAL, OFFLOAD
 from .providers import get_function
 
+if TYPE_CHECKING:
+    from sqlalchemy.orm import Session, scoped_session
+    from sqlalchemy.ext.asyncio import async_scoped_session, AsyncSession
+    from homeassistant.components.recorder.statistics import StatisticResult
+
 _LOGGER = getLogger(__name__)
 
+_TRACE_RATES = trace.get("rates")
+_TRACE_FORECAST = trace.get("forecast")
+_TRACE_QUERY = trace.get("query")
+_TRACE_SQL = trace.get("sql")
+_TRACE_OPTIMIZER = trace.get("optimizer")
+
+# Heavy dependencies (SQLAlchemy, recorder internals, sql component, holidays) are imported on first use
+#
 async def _get_sessionmaker(hass: HomeAssistant) -> async_scoped_session[AsyncSession] | scoped_session[Session] | None:
+    import sqlalchemy
+
+    from sqlalchemy.exc import SQLAlchemyError
+    from homeassistant.components.sql.util import resolve_db_url, redact_credentials
+
     db_url = resolve_db_url(hass, None)
     try:
         if "greenlet" in sys.modules:
+            from sqlalchemy.ext.asyncio import create_async_engine, async_scoped_session, async_sessionmaker
+
             if db_url.startswith("mysql") and not db_url.startswith("mysql+aiomysql"):
                 db_url = db_url.replace("mysql", "mysql+aiomysql")
             if db_url.startswith("sqlite") and not db_url.startswith("sqlite+aiosqlite"):
@@ -63,6 +80,8 @@ async def _get_sessionmaker(hass: HomeAssistant) -> async_scoped_session[AsyncSe
             return maker
 
         def _get_session_maker_for_db_url() -> scoped_session[Session] | None:
+            from sqlalchemy.orm import scoped_session, sessionmaker
+
             maker = scoped_session(sessionmaker(bind = sqlalchemy.create_engine(db_url, future = True), future = True))
             with maker() as session:
                 session.execute(sqlalchemy.text("SELECT 1;"))
@@ -74,7 +93,20 @@ async def _get_sessionmaker(hass: HomeAssistant) -> async_scoped_session[AsyncSe
         _LOGGER.error( "Couldn't connect using %s DB_URL: %s", redact_credentials(db_url), redact_credentials(str(err)))
         return None
 
+def _is_async_sessionmaker(maker: Any) -> bool:
+    from sqlalchemy.ext.asyncio import async_scoped_session
+
+    return isinstance(maker, async_scoped_session)
+
+def _country_holidays(country: str):
+    from holidays import country_holidays
+
+    return country_holidays(country)
+
 def _compile_statistics(hass: HomeAssistant, dt: datetime):
+    from homeassistant.components.recorder.util import session_scope
+    from homeassistant.components.sensor.recorder import compile_statistics
+
     with session_scope(hass = hass, read_only = True) as session:
         try:
             return compile_statistics(hass, session, dt - timedelta.resolution, dt, {}).platform_stats
@@ -87,40 +119,151 @@ def _get_statistics_for_entity(statistics_results: list[StatisticResult], entity
             yield statistics_result
 
 def _get_significant_states_with_session(hass: HomeAssistant, dt: datetime, entity_ids: list[str]):
+    from homeassistant.components.recorder.util import session_scope
+    from homeassistant.components.recorder.history import get_significant_states_with_session
+
     with session_scope(hass = hass, read_only = True) as session:
         return get_significant_states_with_session(hass, session, dt - TIME_QOUR, dt, entity_ids, None, True, False, True, True, True)
 
+def _get_reserve(consumption: dict[datetime, float | int], forecast: dict[datetime, float | int], tzn: ZoneInfo, today: date) -> tuple[float, float]:
+    """Consumption until production covers it (from tomorrow if its profile is known) and the reserve needed."""
+    until_sunrise_consumption = 0
+    sunrise_datetime = datetime.combine(today + TIME_DAY, datetime.min.time()).astimezone(UTC)
+    date_anchor = today + TIME_DAY if sunrise_datetime in consumption else today
+    for k, v in consumption.items():
+        if k.astimezone(tzn).date() == date_anchor:
+            if (vv := v - forecast.get(k, 0)) > 0:
+                until_sunrise_consumption += vv
+                sunrise_datetime = k
+            else:
+                break
+    reserve = (sum(c) / len(c)) if (c := [v for kk, v in consumption.items() if kk.astimezone(tzn) >= sunrise_datetime and v is not None]) else 0
+    return until_sunrise_consumption, until_sunrise_consumption + (r if forecast and (r := reserve - sum([v for kk, v in forecast.items() if kk.astimezone(tzn) >= sunrise_datetime and v is not None])) > 0 else 0)
+
+def _shape_profile(mappings: list[Mapping[str, Any]], keys: list[datetime], tzn: ZoneInfo) -> list[tuple[datetime, dict[str | Any, Any | None] | dict]]:
+    """Hourly profile rows spread over the quarter hour slots, aligned to the hour of the first row unless it starts at 0."""
+    if not (values := [m for m in mappings for _ in range(4)]):
+        return []
+    if (f := values[0].get("idx")) is not None and f != 0:
+        values = [{} for _ in range((f - 1) * 4)] + values
+    return [(k, {vk: vv / 4 if (vv := v.get(vk)) is not None else None for vk in v.keys() if vk != "idx"} if f == 0 or k.astimezone(tzn).hour == v.get("idx") else {}) for k, v in itertools.zip_longest(keys, values, fillvalue = {}) if k]
+
+def _merge_forecast(forecast: dict[str, float | int], keys: list[datetime], tzn: ZoneInfo, yesterday: date, tomorrow: date) -> tuple[dict[datetime, float | int], dict[datetime, float]]:
+    """Solar forecast (Wh per hour, half or quarter hour) of the window and its kWh spread over the quarter hour slots."""
+    slots: dict[datetime, float] = {}
+    if wh_hours := {i: v for k, v in forecast.items() if (i := datetime.fromisoformat(k)) is not None and yesterday <= i.astimezone(tzn).date() <= tomorrow}:
+        for k in keys:
+            if (wh_hour := wh_hours.get(k)) is not None and (q := k + TIME_QOUR in wh_hours or k - TIME_QOUR in wh_hours) is not None and (d := q or k + TIME_DOUR in wh_hours or k - TIME_DOUR in wh_hours) is not None and (f := wh_hour / 1000 / ((1 if q else 2) if d else 4)):
+                slots[k] = f
+                if not q:
+                    k2 = k + TIME_QOUR
+                    slots[k2] = f
+                    if not d:
+                        k3 = k2 + TIME_QOUR
+                        slots[k3] = f
+                        slots[k3 + TIME_QOUR] = f
+    return wh_hours, slots
+
+_GENERATION = itertools.count()
+
+# Attribute series, the column of the data each is built from and its value
+#
+_SERIES: dict[str, tuple[str, Callable[[Any], Any]]] = {
+    "rates_full": ("rates_full", money.to_float),
+    "compensation_rate": ("compensation_rate", money.to_float),
+    "compensation_negative": ("compensation_rate", lambda v: v < 0),
+    "spot_rate": ("spot_rate", money.to_float),
+    "forecast": ("forecast", lambda v: v)
+}
+
+def _build_series(columns: dict[str, dict[datetime, Any]], tzn: ZoneInfo) -> dict[str, dict[str, Any]]:
+    """Every attribute series of the columns keyed by local ISO time, nothing but its arguments is read."""
+    iso = {k: k.astimezone(tzn).isoformat() for c in columns.values() for k in c}
+    return {name: {iso[k]: value(v) for k, v in columns[column].items()} for name, (column, value) in _SERIES.items()}
+
 class CoordinatorData:
-    def __init__(self, now: datetime, yesterday: dict[datetime, tuple[Decimal, Decimal, Decimal]], today: dict[datetime, tuple[Decimal, Decimal, Decimal]], tomorrow: dict[datetime, tuple[Decimal, Decimal, Decimal]], time_zone: str):
+    def __init__(self, now: datetime, ring: DayRing, time_zone: str):
+        self.generation = next(_GENERATION)
+        self._iso: dict[datetime, str] = {}
+        self._series: dict[str, dict[str, Any]] = {}
+        self.exports: dict[tuple, tuple[str, bytes]] = {}
         self.now = now
-        self.yesterday = yesterday
-        self.today = today
-        self.tomorrow = tomorrow
-        self.mean = ZERO_DECIMAL
+        self.day = ring.today
+        self.days = ring.days()
+        self.version = ring.version
         self.zone_info = ZoneInfo(time_zone)
-        self.rates: dict[datetime, Decimal] = {}
-        self.rates_full: dict[datetime, Decimal] = {}
-        self.compensation_rate: dict[datetime, Decimal] = {}
-        self.spot_rate: dict[datetime, Decimal] = {}
-        self.optimization: dict[datetime, tuple[int, float, bool]] = {}
-        for dt, v in self.yesterday.items():
-            self.rates_full[dt.astimezone(self.zone_info)] = v[0]
-            self.compensation_rate[dt.astimezone(self.zone_info)] = v[1]
-            self.spot_rate[dt.astimezone(self.zone_info)] = v[2]
+        self.rates: dict[datetime, int] = {}
+        self.rates_full: dict[datetime, int] = {}
+        self.compensation_rate: dict[datetime, int] = {}
+        self.spot_rate: dict[datetime, int] = {}
+        self.optimization: PlanView = Plan().view(now)
+        for day, segment in self.days.items():
+            if day < self.day - TIME_DAY:
+                continue
+            for dt, v in segment.items():
+                dt_local = dt.astimezone(self.zone_info)
+                self.rates_full[dt_local] = v[0]
+                self.compensation_rate[dt_local] = v[1]
+                self.spot_rate[dt_local] = v[2]
         for dt, v in self.today.items():
-            dt_local = dt.astimezone(self.zone_info)
-            self.rates[dt_local] = v[0]
-            self.mean += v[0]
-            self.rates_full[dt_local] = v[0]
-            self.compensation_rate[dt_local] = v[1]
-            self.spot_rate[dt_local] = v[2]
-        for dt, v in self.tomorrow.items():
-            self.rates_full[dt.astimezone(self.zone_info)] = v[0]
-            self.compensation_rate[dt.astimezone(self.zone_info)] = v[1]
-            self.spot_rate[dt.astimezone(self.zone_info)] = v[2]
-        self.mean /= len(self.today)
+            self.rates[dt.astimezone(self.zone_info)] = v[0]
+        self.mean = money.round_div(sum(self.rates.values()), len(self.rates))
         self.forecast: dict[datetime, float | int] = {}
 
+    def window(self, index: int) -> Iterator[tuple[datetime, int]]:
+        """Rates column over the whole window including the lookback days, read from the shared segments."""
+        for segment in self.days.values():
+            for dt, v in segment.items():
+                yield dt.astimezone(self.zone_info), v[index]
+
+    @property
+    def yesterday(self) -> Segment:
+        return self.days.get(self.day - TIME_DAY, {})
+
+    @property
+    def today(self) -> Segment:
+        return self.days.get(self.day, {})
+
+    @property
+    def tomorrow(self) -> Segment:
+        return self.days.get(self.day + TIME_DAY, {})
+
+    @property
+    def forecast(self) -> dict[datetime, float | int]:
+        return self._forecast
+
+    @forecast.setter
+    def forecast(self, value: dict[datetime, float | int]):
+        self._forecast = value
+        self._series.pop("forecast", None)
+        self.exports.clear()
+        self.generation = next(_GENERATION)
+
+    def iso(self, dt: datetime) -> str:
+        if (s := self._iso.get(dt)) is None:
+            s = self._iso[dt] = dt.astimezone(self.zone_info).isoformat()
+        return s
+
+    def series(self, name: str) -> dict[str, Any]:
+        if (s := self._series.get(name)) is None:
+            column, value = _SERIES[name]
+            s = self._series[name] = {self.iso(k): value(v) for k, v in getattr(self, column).items()}
+        return s
+
+class Rollover(NamedTuple):
+    """Profile of the next day prepared in the evening and swapped in at midnight."""
+    day: date
+    forecast: dict[datetime, float | int]
+    production: dict[datetime, float | int]
+    consumption: dict[datetime, float | int]
+    consumption_max: dict[datetime, float | int]
+    today_consumption: dict[datetime, float | int]
+    expected_consumption: dict[datetime, float | int]
+    consumption_mean: float
+    consumption_max_max: float
+    reserve: float
+    cost_today_expected: float
+
 class Coordinator(DataUpdateCoordinator[CoordinatorData]):
     def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry[Coordinator]):
         super().__init__(hass, _LOGGER, config_entry = config_entry, name = "")
@@ -145,11 +288,11 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
         self.cost_today_expected: float = None
         self.predicted_cost: float = .0
         self.predicted_amortization: float = .0
-        self.optimization: dict[datetime, tuple[int, float, bool]] = {}
+        self.optimization: Plan = Plan()
 
         self.default_service_info = {
             ATTR_IDENTIFIERS: {(DOMAIN, config_entry.entry_id)},
-            ATTR_NAME: "Energy Management",
+            ATTR_NAME: config_entry.title,
             ATTR_MANUFACTURER: "David Rapan",
             ATTR_MODEL: "Energy Management",
             "entry_type": DeviceEntryType.SERVICE,
@@ -157,14 +300,27 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
             #ATTR_CONFIGURATION_URL: "https://ranware.com/"
         }
 
-        self.holidays = country_holidays(self.hass.config.country)
-
         @callback
         def action(_: datetime):
             self.config_entry.async_create_task(self.hass, self.async_refresh())
 
         self._periodic_listener: CALLBACK_TYPE | None = event.async_track_utc_time_change(hass, action, second = 0)
         self._deferred_refresh: CALLBACK_TYPE | None = None
+        self._lock = asyncio.Lock()
+        self._store: Store[dict[str, Any]] = Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{config_entry.entry_id}")
+        self._hub = hub.async_get(hass)
+        self._hub.async_register(config_entry.entry_id)
+        self._rates = RateCache(Path(hass.config.path(DOMAIN, "rates")), RATES_RETENTION)
+        self._ring = DayRing(min(config_entry.options.get("lookback", RATES_LOOKBACK), RATES_RETENTION), RATES_LOOKAHEAD)
+        self._backfilled: date | None = None
+        self._warmed: int | None = None
+        self.restored = False
+        self._profile_dirty = False
+        self._rollover: Rollover | None = None
+        self.timings = Timings()
+        self._usage: tuple[float, dict[str, memory.Usage]] | None = None
+        self.fresh: dict[str, datetime] = {}
+        self._rolled: date | None = None
 
     @property
     def name(self):
@@ -174,6 +330,45 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
     def name(self, _: str):
         pass
 
+    def _trim_cost_total(self) -> None:
+        while len(self.cost_total) > self.config_memory_cost_days:
+            del self.cost_total[next(iter(self.cost_total))]
+
+    def usage(self) -> dict[str, memory.Usage]:
+        """Entries and approximate size of caches and state, recomputed at most every MEMORY_INTERVAL."""
+        if self._usage and self._usage[0] > monotonic():
+            return self._usage[1]
+        data = self._data
+        slots = (self.forecast, self.production, self.consumption, self.consumption_max, self.today_consumption, self.expected_consumption, self.imported, self.exported, self.cost)
+        usage = {name: c.usage() for name, c in memory.CACHES.items()} | {"sql.lambda": sql_lambda_usage()} | self._hub.usage() | {
+            "rates": memory.Usage(sum(len(d) for d in self._ring.days().values()), memory.sizeof(self._ring.days())),
+            "slots": memory.Usage(sum(len(d) for d in slots), memory.sizeof(slots)),
+            "rollover": memory.Usage(1 if self._rollover else 0, memory.sizeof(self._rollover)),
+            "cost_total": memory.Usage(len(self.cost_total), memory.sizeof(self.cost_total), self.config_memory_cost_days),
+            "plan": memory.Usage(len(self.optimization), memory.sizeof(self.optimization.columns)),
+            "attributes": memory.Usage(len(data._series) + len(data.exports), memory.sizeof((data._series, data._iso, data.exports))) if data else memory.Usage(0, 0)
+        }
+        self._usage = (monotonic() + MEMORY_INTERVAL, usage)
+        return usage
+
+    def freshness(self) -> dict[str, datetime]:
+        """When each input was last obtained, provider ones come through the hub."""
+        return {k: max(t) for k in FRESHNESS if (t := [d[k] for d in (self.fresh, self._hub.fresh) if k in d])}
+
+    def stale(self, now: datetime) -> list[str]:
+        """Inputs older than their threshold, inputs never obtained (e.g. not used) are not stale."""
+        return [k for k, v in self.freshness().items() if now - v > self.config_freshness[k]]
+
+    def stages(self) -> dict[str, Stage]:
+        """Timings of this entry's stages along with the provider ones shared through the hub."""
+        return self._hub.timings.stages | self.timings.stages
+
+    @callback
+    def async_update_listeners(self) -> None:
+        with self.timings.measure("fanout") as stage:
+            stage.items += len(self._listeners)
+            super().async_update_listeners()
+
     async def _get_energy_entries(self):
         sensors: dict[str, str] = self.hass.data["energy"]["cost_sensors"]
         for source in self._manager.data.get("energy_sources", {}):
@@ -224,7 +419,10 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                                 c.setdefault("to_price", []).append(energy_price)
 
     async def _execute_simple(self, query_str: str):
-        if isinstance(self._maker, async_scoped_session):
+        from sqlalchemy.exc import SQLAlchemyError
+        from homeassistant.components.sql.util import redact_credentials
+
+        if self._maker_async:
             async with self._maker() as session:
                 try:
                     result = await session.execute(generate_lambda_stmt(query_str))
@@ -232,7 +430,7 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                     _LOGGER.error(f"Error executing query {query_str}: {redact_credentials(common.strepr(e))}")
                     await session.rollback()
                 else:
-                    _LOGGER.debug(f"Query: {query_str}")
+                    _TRACE_SQL("query", sql = query_str)
                     return result.scalar()
         else:
             def _sync_execute():
@@ -243,7 +441,7 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                         _LOGGER.error(f"Error executing query {query_str}: {redact_credentials(common.strepr(e))}")
                         session.rollback()
                     else:
-                        _LOGGER.debug(f"Query: {query_str}")
+                        _TRACE_SQL("query", sql = query_str)
                         return result.scalar()
 
             if self._use_database_executor:
@@ -252,9 +450,12 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                 return await self.hass.async_add_executor_job(_sync_execute)
 
     async def _execute(self, query_str: str, time_zone: ZoneInfo) -> AsyncGenerator[tuple[datetime, dict[str | Any, Any | None] | dict], None]:
+        from sqlalchemy.exc import SQLAlchemyError
+        from homeassistant.components.sql.util import redact_credentials
+
         mappings = None
 
-        if isinstance(self._maker, async_scoped_session):
+        if self._maker_async:
             async with self._maker() as session:
                 try:
                     result = await session.execute(generate_lambda_stmt(query_str))
@@ -262,8 +463,8 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                     _LOGGER.error(f"Error executing query {query_str}: {redact_credentials(common.strepr(e))}")
                     await session.rollback()
                 else:
-                    _LOGGER.debug(f"Query: {query_str}")
-                    mappings = result.mappings()
+                    _TRACE_SQL("query", sql = query_str)
+                    mappings = result.mappings().all()
         else:
             def _sync_execute():
                 with self._maker() as session:
@@ -273,68 +474,197 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                         _LOGGER.error(f"Error executing query {query_str}: {redact_credentials(common.strepr(e))}")
                         session.rollback()
                     else:
-                        _LOGGER.debug(f"Query: {query_str}")
-                        return result.mappings()
+                        _TRACE_SQL("query", sql = query_str)
+                        return result.mappings().all()
 
             if self._use_database_executor:
                 mappings = await get_instance(self.hass).async_add_executor_job(_sync_execute)
             else:
                 mappings = await self.hass.async_add_executor_job(_sync_execute)
 
-        if mappings and (values := [m for m in mappings for _ in range(4)]):
-            if (f := values[0].get("idx")) is not None and f != 0:
-                values = [{} for _ in range((f - 1) * 4)] + values
-            for k, v in itertools.zip_longest(self.consumption.keys(), values, fillvalue = {}):
-                if k:
-                    yield k, {vk: vv / 4 if (vv := v.get(vk)) is not None else None for vk in v.keys() if vk != "idx"} if f == 0 or k.astimezone(time_zone).hour == v.get("idx") else {}
-
-    async def _async_setup(self) -> None:
-        await super()._async_setup()
-        self._session = aiohttp_client.async_get_clientsession(self.hass)
-        self.config_area = self.config_entry.options.get("area", "cez")
-        self.config_rate = self.config_entry.options.get("rate", "D57d")
-        self.config_tariff = self.config_entry.options.get("tariff", "EVV1")
-        self.config_spot_hourly = self.config_entry.options.get("spot_hourly", False)
-        self.config_fix_t1_id = self.config_entry.options.get("fix", {}).get("t1_id", None)
-        self.config_fix_t2_id = self.config_entry.options.get("fix", {}).get("t2_id", None)
-        self.config_cost_fee = self.config_entry.options.get("cost_fee", 0.3)
-        self.config_compensation_fee = self.config_entry.options.get("compensation_fee", 0.4)
-        self.config_capacity = self.config_entry.options.get("capacity", 9.7)
-        self.config_amortization = self.config_entry.options.get("amortization", 2.0)
-        self.config_battery = self.config_entry.options.get("battery", "min")
-        self.config_battery_entity_ids = self.config_entry.options.get("battery_entity_ids", [])
-        self.config_exclude_entity_ids = self.config_entry.options.get("exclude_entity_ids", [])
-        self.config_import_ids = self.config_entry.options.get("import_ids")
-        self.config_export_id = self.config_entry.options.get("export_id")
-        self.config_key = self.config_entry.options.get("key", "")
-        self.config_soc_limit = self.config_entry.options.get("soc_limit", 99)
-        self.config_soc_max = self.config_entry.options.get("soc_max", 90)
-        self.config_soc_min = self.config_entry.options.get("soc_min", 20)
-        self.config_soc_reserve = self.config_entry.options.get("soc_reserve", 50 if self.config_soc_max >= 50 >= self.config_soc_min else self.config_soc_min)
-        self.config_soc_threshold = self.config_entry.options.get("soc_threshold", self.config_soc_max)
-        self.config_charge_power = self.config_entry.options.get("charge_power", 5.0)
-        self.config_discharge_power = self.config_entry.options.get("discharge_power", 5.0)
-        self.config_coefficient = self.config_entry.options.get("coefficient", 1.5)
-        self.config_coefficient_strategy = self.config_entry.options.get("coefficient_strategy", 1.2)
-        self.config_consumption_strategy = self.config_entry.options.get("consumption_strategy", 30)
-        self.config_strategy = self.config_entry.options.get("strategy", "hourly")
-        self.config_now_strategy = self.config_entry.options.get("now_strategy", "auto")
+        if mappings:
+            for k, v in await offload(self.hass, self.timings, "loop_query", len(self.consumption), OFFLOAD["query"], _shape_profile, mappings, list(self.consumption), time_zone):
+                yield k, v
+
+    def _load_options(self, options: Mapping[str, Any]) -> None:
+        self.config_area = options.get("area", "cez")
+        self.config_rate = options.get("rate", "D57d")
+        self.config_tariff = options.get("tariff", "EVV1")
+        self.config_spot_hourly = options.get("spot_hourly", False)
+        self.config_fix_t1_id = options.get("fix", {}).get("t1_id", None)
+        self.config_fix_t2_id = options.get("fix", {}).get("t2_id", None)
+        self.config_cost_fee = options.get("cost_fee", 0.3)
+        self.config_compensation_fee = options.get("compensation_fee", 0.4)
+        self.config_capacity = options.get("capacity", 9.7)
+        self.config_amortization = options.get("amortization", 2.0)
+        self.config_battery = options.get("battery", "min")
+        self.config_battery_entity_ids = options.get("battery_entity_ids", [])
+        self.config_exclude_entity_ids = options.get("exclude_entity_ids", [])
+        self.config_import_ids = options.get("import_ids")
+        self.config_export_id = options.get("export_id")
+        self.config_key = options.get("key", "")
+        self.config_transport_encoding = options.get("transport", {}).get("encoding", "json")
+        self.config_transport_compression = options.get("transport", {}).get("compression", False)
+        self.config_freshness = {k: timedelta(minutes = options.get("freshness", {}).get(k, v)) for k, v in FRESHNESS.items()}
+        self.config_memory_cache_entries = options.get("memory", {}).get("cache_entries", MEMORY_CACHE_ENTRIES)
+        self.config_memory_cost_days = options.get("memory", {}).get("cost_days", MEMORY_COST_DAYS)
+        self.config_soc_limit = options.get("soc_limit", 99)
+        self.config_soc_max = options.get("soc_max", 90)
+        self.config_soc_min = options.get("soc_min", 20)
+        self.config_soc_reserve = options.get("soc_reserve", 50 if self.config_soc_max >= 50 >= self.config_soc_min else self.config_soc_min)
+        self.config_soc_threshold = options.get("soc_threshold", self.config_soc_max)
+        self.config_charge_power = options.get("charge_power", 5.0)
+        self.config_discharge_power = options.get("discharge_power", 5.0)
+        self.config_coefficient = options.get("coefficient", 1.5)
+        self.config_coefficient_strategy = options.get("coefficient_strategy", 1.2)
+        self.config_consumption_strategy = options.get("consumption_strategy", 30)
+        self.config_strategy = options.get("strategy", "hourly")
+        self.config_now_strategy = options.get("now_strategy", "auto")
         _LOGGER.debug(f"Area: {self.config_area}, rate: {self.config_rate}, tariff: {self.config_tariff}, spot_hourly: {self.config_spot_hourly}, cost_fee: {self.config_cost_fee}, compensation_fee: {self.config_compensation_fee}, capacity: {self.config_capacity}, amortization: {self.config_amortization}, battery_entity_id: {self.config_battery_entity_ids}, exclude_entity_ids {self.config_exclude_entity_ids}, key: {"***" if self.config_key else "Empty"}")
+        self._options = dict(options)
+        memory.configure(self.config_entry.entry_id, self.config_memory_cache_entries)
+        self._trim_cost_total()
+
+    def apply_options(self, options: Mapping[str, Any]) -> bool:
+        if not (changed := {k for k in options.keys() | self._options.keys() if options.get(k) != self._options.get(k)}):
+            return True
+        if not changed <= OPTIONS_RUNTIME.keys():
+            _LOGGER.debug(f"Options {changed - OPTIONS_RUNTIME.keys()} require reload")
+            return False
+        stages = {s for k in changed for s in OPTIONS_RUNTIME[k]}
+        _LOGGER.debug(f"Applying options {changed} in place, invalidating {stages}")
+        self._load_options(options)
+        if "profile" in stages:
+            self.invalidate_profile()
+        if "plan" in stages:
+            self.config_entry.async_create_task(self.hass, self.async_revalidate())
+        return True
+
+    def invalidate_profile(self) -> None:
+        """Requery the consumption profile with the next refresh."""
+        self._profile_dirty = True
+
+    async def _fetch(self) -> None:
+        async with self._lock:
+            with self.timings.measure("refresh"):
+                await self._fetch_data()
+            if self._data:
+                self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+
+    async def _async_initialize(self) -> None:
+        self._session = aiohttp_client.async_get_clientsession(self.hass)
+        self._load_options(self.config_entry.options)
         try:
             self._energy_entries: dict[str, dict[str, list[str] | dict[str, str | None]]] = {}
             self._manager = await async_get_manager(self.hass)
             self._manager.async_listen_updates(self._get_energy_entries)
             if self._manager.data:
                 await self._get_energy_entries()
+            self.holidays = await self.hass.async_add_executor_job(_country_holidays, self.hass.config.country)
+            # Years of every day a pricing layer is prepared for, yesterday up to the day after the lookahead
+            #
+            today = utcnow().astimezone(ZoneInfo(self.hass.config.time_zone)).date()
+            await self.hass.async_add_executor_job(providers.preload, self.hass.config.country, tuple({(today + n * TIME_DAY).year for n in range(-1, self._ring.lookahead + 2)}))
+            await self.hass.async_add_executor_job(self._rates.remove_legacy)
             self._maker = await _get_sessionmaker(self.hass)
+            self._maker_async = _is_async_sessionmaker(self._maker)
             self._use_database_executor = self._maker is not None and get_instance(self.hass).dialect_name == SupportedDialect.SQLITE
         except TimeoutError:
             raise
         except Exception as e:
             raise UpdateFailed(common.strepr(e)) from e
 
+    def _snapshot(self) -> dict[str, Any]:
+        return {
+            "saved": utcnow().isoformat(),
+            "rates_key": self._get_rates_key(),
+            "options": self._get_options_key(),
+            "days": [[(k.isoformat(), i, o, v) for k, (i, o, v) in d.items()] for day, d in self._data.days.items() if day >= self._data.day - TIME_DAY],
+            "profile": {
+                "forecast": [(k.isoformat(), v) for k, v in self.forecast.items()],
+                "consumption": [(k.isoformat(), v) for k, v in self.consumption.items()],
+                "consumption_max": [(k.isoformat(), v) for k, v in self.consumption_max.items()],
+                "consumption_mean": getattr(self, "consumption_mean", 0.5),
+                "consumption_max_max": getattr(self, "consumption_max_max", 1.0),
+                "reserve": getattr(self, "reserve", 0),
+                "battery_max": self.battery_max
+            },
+            "plan": {"start": self.optimization.keys()[0].isoformat(), "columns": self.optimization.columns} if self.optimization else None,
+            "battery": self.battery,
+            "predicted": (self.predicted_cost, self.predicted_amortization),
+            "fresh": {k: v.isoformat() for k, v in self.freshness().items()}
+        }
+
+    async def _async_restore(self) -> bool:
+        try:
+            if not (snapshot := await self._store.async_load()):
+                return False
+            # Prices and plan of other rates or structural options are not published, the entry reloads with them
+            #
+            if snapshot.get("rates_key") != self._get_rates_key() or snapshot.get("options") != self._get_options_key():
+                _LOGGER.debug(f"Snapshot from {snapshot['saved']} was taken with other options")
+                return False
+            tzn = ZoneInfo(self.hass.config.time_zone)
+            now = common.dt_block(utcnow())
+            today = now.astimezone(tzn).date()
+            days = [{datetime.fromisoformat(k): tuple(x if isinstance(x, int) else money.to_money(x) for x in (i, o, v)) for k, i, o, v in d} for d in snapshot["days"]]
+            ring = DayRing(self._ring.lookback, self._ring.lookahead)
+            ring.rotate(today)
+            for d in days:
+                if d:
+                    ring.put(next(iter(d)).astimezone(tzn).date(), d)
+            if today not in ring:
+                _LOGGER.debug(f"Snapshot from {snapshot['saved']} is outdated")
+                return False
+            profile = snapshot["profile"]
+            forecast = {datetime.fromisoformat(k): v for k, v in profile["forecast"]}
+            consumption = {datetime.fromisoformat(k): v for k, v in profile["consumption"]}
+            consumption_max = {datetime.fromisoformat(k): v for k, v in profile["consumption_max"]}
+            self._ring = ring
+            self._reset_profile()
+            for k in self.forecast:
+                self.forecast[k] = forecast.get(k, 0)
+                self.consumption[k] = consumption.get(k)
+                self.consumption_max[k] = consumption_max.get(k)
+            for k in ring.get(today):
+                self.expected_consumption[k] = self.consumption[k]
+            self.consumption_mean = profile["consumption_mean"]
+            self.consumption_max_max = profile["consumption_max_max"]
+            self.reserve = profile["reserve"]
+            self.battery_max = profile["battery_max"]
+            self.battery = snapshot["battery"]
+            self.predicted_cost, self.predicted_amortization = snapshot["predicted"]
+            self.fresh = {k: datetime.fromisoformat(v) for k, v in snapshot.get("fresh", {}).items() if k in FRESHNESS}
+            if plan := snapshot["plan"]:
+                self.optimization = Plan(datetime.fromisoformat(plan["start"]).astimezone(tzn), tuple(map(tuple, plan["columns"])))
+        except Exception as e:
+            _LOGGER.warning(f"Snapshot of {self.config_entry.title} not restored, starting from a full refresh: {common.strepr(e)}")
+            return False
+        self.now = now
+        self._data = CoordinatorData(now, self._ring, self.hass.config.time_zone)
+        self._data.optimization = self.optimization.view(now)
+        self.async_set_updated_data(self._data)
+        _LOGGER.debug(f"Restored snapshot from {snapshot['saved']}")
+        return True
+
+    async def async_revalidate(self) -> None:
+        await self._fetch()
+        if self._data:
+            self._data.optimization = self.optimization.view(self._data.now)
+            self.async_update_listeners()
+
     async def init(self):
-        await super().async_config_entry_first_refresh()
+        # Options and runtime config shape the snapshot, they are loaded before it is restored
+        #
+        try:
+            await self._async_initialize()
+        except (TimeoutError, UpdateFailed) as e:
+            raise ConfigEntryNotReady(common.strepr(e)) from e
+
+        self.restored = await self._async_restore()
+
+        if not self.restored:
+            await super().async_config_entry_first_refresh()
 
         if self.config_export_id and (e := self.hass.states.get(self.config_export_id)) and e.state in (STATE_UNKNOWN, STATE_UNAVAILABLE) or self.config_fix_t1_id and (t1 := self.hass.states.get(self.config_fix_t1_id)) and t1.state in (STATE_UNKNOWN, STATE_UNAVAILABLE):
             @callback
@@ -347,25 +677,93 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
 
     async def async_shutdown(self) -> None:
         await super().async_shutdown()
+        self._hub.async_release(self.config_entry.entry_id)
+        memory.configure(self.config_entry.entry_id, None)
         if self._periodic_listener:
             self._periodic_listener()
             self._periodic_listener = None
         if self._deferred_refresh:
             self._deferred_refresh()
             self._deferred_refresh = None
-        if isinstance(self._maker, async_scoped_session):
+        if self._maker_async:
             await (await self._maker.connection()).engine.dispose()
         else:
             self._maker.connection().engine.dispose()
 
     def get_strategy(self, dt: datetime) -> str:
-        return ("daily_max" if self.optimization and not ((self.optimization[dt][4] or self.optimization[dt][5])) else "this_hour_max" if not self.optimization or not (self.optimization[dt][5] or (self.config_now_strategy == "auto+" and self.optimization[dt][4])) else "this_hour_mean") if self.config_now_strategy in ("auto", "auto+") else self.config_now_strategy
+        return ("daily_max" if self.optimization and not ((self.optimization[dt].discharge or self.optimization[dt].export)) else "this_hour_max" if not self.optimization or not (self.optimization[dt].export or (self.config_now_strategy == "auto+" and self.optimization[dt].discharge)) else "this_hour_mean") if self.config_now_strategy in ("auto", "auto+") else self.config_now_strategy
 
     def get_consumption(self, dt: datetime, strt: str) -> float | int:
         return ((self.consumption_max_max * (1 + float(self.rats[dt] - self.rmin) * (self.config_coefficient - 1) / self.rang) if self.rang > 0 else 1) if strt == "daily_max" else ((c if (c := (self.consumption_max.get(dt) if strt == "this_hour_max" else (c if self.config_strategy == "hourly" and (c := self.consumption.get(dt)) and c >= 0 else self.consumption_mean))) and c >= 0 else self.consumption_max_max) * (1 + float(self.rats[dt] - self.rmin) * (self.config_coefficient - 1) / self.rang) if self.rang > 0 else 1)) if self.config_area != "disabled" else 0
 
-    def _get_rates_params(self, dt: datetime) -> dict[str, datetime | Decimal]:
-        return {"dt": dt} | ({"T1": Decimal(t1.state if t1.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else "0")} if self.config_fix_t1_id and (t1 := self.hass.states.get(self.config_fix_t1_id)) else {}) | ({"T2": Decimal(t2.state if t2.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else "0")} if self.config_fix_t2_id and (t2 := self.hass.states.get(self.config_fix_t2_id)) else {})
+    def _reset_profile(self) -> None:
+        """Profile slots for today and the days ahead in the rates window."""
+        for d in (self.forecast, self.production, self.consumption, self.consumption_max, self.today_consumption, self.expected_consumption):
+            d.clear()
+        ring = self._ring
+        for n in range(ring.lookahead + 1):
+            for k in ring.get(ring.today + n * TIME_DAY):
+                self.forecast[k] = 0
+                self.production[k] = None
+                self.consumption[k] = None
+                self.consumption_max[k] = None
+        for k in ring.get(ring.today):
+            self.today_consumption[k] = None
+            self.expected_consumption[k] = None
+
+    def _prepare_rollover(self, tzn: ZoneInfo, day: date) -> Rollover:
+        """Next day profile from the one already queried along with today, completed the way the midnight query would."""
+        keys = tuple(self._ring.get(day))
+        consumption = {k: self.consumption.get(k) for k in keys}
+        consumption_max = {k: self.consumption_max.get(k) for k in keys}
+        consumption_mean = (sum(c) / len(c)) if (c := [v for v in consumption.values() if v is not None]) else 0.5
+        consumption_max_max = max([1.0] + [v for v in consumption_max.values() if v is not None])
+        consumption = {k: v if v is not None else consumption_mean for k, v in consumption.items()}
+        consumption_max = {k: v if v is not None else consumption_max_max for k, v in consumption_max.items()}
+        forecast = {k: self.forecast.get(k, 0) for k in keys}
+        _, reserve = _get_reserve(consumption, forecast, tzn, day)
+        return Rollover(day, forecast, dict.fromkeys(keys), consumption, consumption_max, dict.fromkeys(keys), dict(consumption), consumption_mean, consumption_max_max, reserve, sum(money.to_float(self._data.rates_full[k]) * v for k, v in consumption.items()))
+
+    def _needs_profile_query(self, today: date) -> bool:
+        """Whether the profile is queried, always when invalidated or missing, otherwise while the last hour's consumption is unknown."""
+        if self._profile_dirty or not self.consumption or next(iter(self.consumption.values())) is None or not self.today_consumption:
+            return True
+        # Right after the rollover the last hour belongs to the previous day, which the prepared profile does not cover
+        #
+        if self._rolled == today and self.now - TIME_HOUR not in self.today_consumption:
+            return False
+        return self.today_consumption.get(self.now - TIME_HOUR) is None
+
+    def _swap_rollover(self, today: date) -> bool:
+        """Atomically switch to the profile prepared for today, False if there is none."""
+        if (r := self._rollover) is None or r.day != today:
+            return False
+        self._rollover = None
+        self.forecast, self.production, self.consumption, self.consumption_max, self.today_consumption, self.expected_consumption = r.forecast, r.production, r.consumption, r.consumption_max, r.today_consumption, r.expected_consumption
+        self.consumption_mean, self.consumption_max_max, self.reserve = r.consumption_mean, r.consumption_max_max, r.reserve
+        self.imported, self.exported, self.cost = {}, {}, {}
+        self.cost_today, self.cost_rate_today, self.cost_today_expected = 0, None, r.cost_today_expected
+        self._rolled = today
+        _LOGGER.debug(f"Rolled over to the profile prepared for {today}")
+        return True
+
+    async def _async_prepare_layers(self, days: tuple[date, ...]) -> None:
+        try:
+            await self.hass.async_add_executor_job(providers.preload, self.hass.config.country, tuple({d.year for d in days}))
+            await providers.prepare(self._hub, self.config_area, self.config_rate, self.config_tariff, (self.config_cost_fee, self.config_compensation_fee), self.hass.config.country, days)
+        except Exception as e:
+            _LOGGER.warning(f"Pricing layers not prepared: {common.strepr(e)}")
+
+    def _get_rates_key(self) -> str:
+        return "|".join(map(str, (self.hass.config.country, self.hass.config.currency, self.config_area, self.config_rate, self.config_tariff, self.config_spot_hourly, self.config_cost_fee, self.config_compensation_fee)))
+
+    def _get_options_key(self) -> str:
+        """Digest of the options that reload the entry, a change of any of them invalidates the snapshot."""
+        options = {k: v for k, v in self.config_entry.options.items() if k not in OPTIONS_RUNTIME}
+        return hashlib.blake2b(json.dumps(options, sort_keys = True, default = str).encode(), digest_size = 8).hexdigest()
+
+    def _get_rates_params(self, dt: datetime) -> dict[str, datetime | int]:
+        return {"dt": dt} | ({"T1": money.parse(t1.state if t1.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else "0")} if self.config_fix_t1_id and (t1 := self.hass.states.get(self.config_fix_t1_id)) else {}) | ({"T2": money.parse(t2.state if t2.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else "0")} if self.config_fix_t2_id and (t2 := self.hass.states.get(self.config_fix_t2_id)) else {})
 
     async def _fetch_data(self):
         async with asyncio.timeout(30):
@@ -376,136 +774,75 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
             today = local.date()
             yesterday = today - TIME_DAY
             tomorrow = today + TIME_DAY
-            get_rates, tomorrow_available = get_function(self._session, self.config_area, self.config_rate, self.config_tariff, "" if not self.config_spot_hourly else "Hourly", (self.config_cost_fee, self.config_compensation_fee), self.hass.config.country, self.hass.config.currency)
-            if not self.data or not self.data.tomorrow and tomorrow_available(self.now):
-                yesterday_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = {}
-                today_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = {}
-                tomorrow_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = {}
-                self.forecast.clear()
-                self.production.clear()
-                self.consumption.clear()
-                self.consumption_max.clear()
-                self.today_consumption.clear()
-                self.expected_consumption.clear()
+            get_rates, tomorrow_available = get_function(self._hub, self.config_entry.entry_id, self.config_area, self.config_rate, self.config_tariff, "" if not self.config_spot_hourly else "Hourly", (self.config_cost_fee, self.config_compensation_fee), self.hass.config.country, self.hass.config.currency)
+            ring = self._ring
+            if ring.rotate(today) and self._data and not self._swap_rollover(today):
+                self._reset_profile()
+            if tomorrow not in ring:
+                # Precompute everything but the spot price while waiting for it
+                #
+                await self._async_prepare_layers((yesterday, today, tomorrow))
+            rates_key = self._get_rates_key()
+            if not self._data or tomorrow not in ring and tomorrow_available(self.now):
                 rates_params = self._get_rates_params(self.now)
-                Path(f"{self.hass.config.config_dir}/energy_management").mkdir(parents=False, exist_ok=True)
-                path = self.hass.config.path(f"{self.hass.config.config_dir}/energy_management/ote")
                 try:
                     cache = []
                     async for k, i, o, v in get_rates(**rates_params):
-                        _LOGGER.debug(f"Rate at {k}: {i}, {o}, {v}")
-                        cache.append(f"{k.isoformat()} {i} {o} {v}")
-                        l_date = k.astimezone(tzn).date()
-                        if l_date == yesterday:
-                            yesterday_data[k] = (i, o, v)
-                        else:
-                            self.forecast[k] = 0
-                            self.production[k] = None
-                            self.consumption[k] = None
-                            self.consumption_max[k] = None
-                        if l_date == today:
-                            today_data[k] = (i, o, v)
-                            self.today_consumption[k] = None
-                            self.expected_consumption[k] = None
-                        elif l_date == tomorrow:
-                            tomorrow_data[k] = (i, o, v)
-                    async with aiofiles.open(path, "w") as f:
-                        for c in cache:
-                            await f.write(f"{c}\n")
+                        _TRACE_RATES("rate", at = k, i = i, o = o, v = v)
+                        cache.append((k, i, o, v))
+                    self.fresh["rates"] = utcnow()
                 except Exception as e:
                     _LOGGER.exception(f"Updated rates not availabe: {common.strepr(e)}")
-                    async with aiofiles.open(path) as f:
-                        for l in (await f.read()).splitlines():
-                            k, i, o, v = l.split(' ')
-                            k = datetime.fromisoformat(k)
-                            i = Decimal(i)
-                            o = Decimal(o)
-                            v = Decimal(v)
-                            _LOGGER.debug(f"Rate at {k}: {i}, {o}, {v}")
-                            l_date = k.astimezone(tzn).date()
-                            if l_date == yesterday:
-                                yesterday_data[k] = (i, o, v)
-                            else:
-                                self.forecast[k] = 0
-                                self.production[k] = None
-                                self.consumption[k] = None
-                                self.consumption_max[k] = None
-                            if l_date == today:
-                                today_data[k] = (i, o, v)
-                                self.today_consumption[k] = None
-                                self.expected_consumption[k] = None
-                            elif l_date == tomorrow:
-                                tomorrow_data[k] = (i, o, v)
-                if get_fix_rates := get_function(self._session, self.config_area, self.config_rate, self.config_tariff, "" if not self.config_spot_hourly else "Hourly", (self.config_cost_fee, self.config_compensation_fee), self.hass.config.country + "-fix", self.hass.config.currency)[0] if self.config_fix_t1_id else {}:
-                    async for k, i, o, v in get_fix_rates(**rates_params):
-                        _LOGGER.debug(f"Fix at {k}: {i}, {o}, {v}")
-                        l_date = k.astimezone(tzn).date()
-                        if l_date == yesterday:
-                            if k in yesterday_data:
-                                yesterday_data[k] = (i,) + yesterday_data[k][1:]
-                            #else:
-                            #    yesterday_data[k] = (i, o, v)
-                        #else:
-                        #    self.forecast[k] = 0
-                        #    self.production[k] = None
-                        #    self.consumption[k] = None
-                        #    self.consumption_max[k] = None
-                        if l_date == today:
-                            if k in today_data:
-                                today_data[k] = (i,) + today_data[k][1:]
-                            #else:
-                            #    today_data[k] = (i, o, v)
-                            #self.today_consumption[k] = None
-                            #self.expected_consumption[k] = None
-                        elif l_date == tomorrow:
-                            if k in tomorrow_data:
-                                tomorrow_data[k] = (i,) + tomorrow_data[k][1:]
-                            #else:
-                            #    tomorrow_data[k] = (i, o, v) 
-            else:
-                if next(iter(self.data.today)).astimezone(tzn).date() != today:
-                    yesterday_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = self.data.today
-                    today_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = self.data.tomorrow
-                    tomorrow_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = {}
-                    self.forecast.clear()
-                    self.production.clear()
-                    self.consumption.clear()
-                    self.consumption_max.clear()
-                    self.today_consumption.clear()
-                    self.expected_consumption.clear()
-                    for k in today_data:
-                        self.forecast[k] = 0
-                        self.production[k] = None
-                        self.consumption[k] = None
-                        self.consumption_max[k] = None
-                        self.today_consumption[k] = None
-                        self.expected_consumption[k] = None
+                    cache = await self.hass.async_add_executor_job(self._rates.read, rates_key, yesterday, tomorrow)
+                    _LOGGER.debug(f"Rates from cache {rates_key}: {len(cache)}")
                 else:
-                    yesterday_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = self.data.yesterday
-                    today_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = self.data.today
-                    tomorrow_data: dict[datetime, tuple[Decimal, Decimal, Decimal]] = self.data.tomorrow
-            self._data = CoordinatorData(self.now, yesterday_data, today_data, tomorrow_data, self.hass.config.time_zone)
+                    # A failed cache write leaves the fetched rates in use
+                    #
+                    try:
+                        await self.hass.async_add_executor_job(self._rates.store, rates_key, cache, tzn, today)
+                    except Exception as e:
+                        _LOGGER.warning(f"Rates not cached {rates_key}: {common.strepr(e)}")
+                days: dict[date, dict[datetime, tuple[int, int, int]]] = {}
+                for k, i, o, v in cache:
+                    days.setdefault(k.astimezone(tzn).date(), {})[k] = (i, o, v)
+                if get_fix_rates := get_function(self._hub, self.config_entry.entry_id, self.config_area, self.config_rate, self.config_tariff, "" if not self.config_spot_hourly else "Hourly", (self.config_cost_fee, self.config_compensation_fee), self.hass.config.country + "-fix", self.hass.config.currency)[0] if self.config_fix_t1_id else {}:
+                    async for k, i, o, v in get_fix_rates(**rates_params):
+                        _TRACE_RATES("fix", at = k, i = i, o = o, v = v)
+                        if (day := days.get(k.astimezone(tzn).date())) and k in day:
+                            day[k] = (i,) + day[k][1:]
+                ring.clear()
+                for day, segment in days.items():
+                    ring.put(day, segment)
+                self._reset_profile()
+            if ring.lookback > 1 and self._backfilled != today:
+                # Older days of the window come from the local rate cache only
+                #
+                self._backfilled = today
+                if missing := ring.missing(yesterday - TIME_DAY):
+                    history: dict[date, dict[datetime, tuple[int, int, int]]] = {}
+                    for k, i, o, v in await self.hass.async_add_executor_job(self._rates.read, rates_key, missing[0], missing[-1]):
+                        history.setdefault(k.astimezone(tzn).date(), {})[k] = (i, o, v)
+                    for day in missing:
+                        if segment := history.get(day):
+                            ring.put(day, segment)
+                    _LOGGER.debug(f"Rates window backfilled from cache {rates_key}: {len(history)} of {len(missing)} days")
+            if not self._data or self._data.version != ring.version:
+                self._data = CoordinatorData(self.now, ring, self.hass.config.time_zone)
             if self._energy_entries:
                 production = self._energy_entries.setdefault("solar", {})
-                if (solar_entries := production.get("forecast")) and (forecast_platforms := await async_get_energy_platforms(self.hass)):
-                    for solar_entry_id in solar_entries:
-                        if (solar_entry := self.hass.config_entries.async_get_entry(solar_entry_id)) and solar_entry is not None and solar_entry.domain in forecast_platforms and (forecast := await forecast_platforms[solar_entry.domain](self.hass, solar_entry_id)) and (wh_hours := {i: v for k, v in forecast["wh_hours"].items() if (i := datetime.fromisoformat(k)) is not None and yesterday <= i.astimezone(tzn).date() <= tomorrow}):
-                            self._data.forecast = wh_hours
-                            for k in self.forecast.keys():
-                                if (wh_hour := wh_hours.get(k)) is not None and (q := k + TIME_QOUR in wh_hours or k - TIME_QOUR in wh_hours) is not None and (d := q or k + TIME_DOUR in wh_hours or k - TIME_DOUR in wh_hours) is not None and (f := wh_hour / 1000 / ((1 if q else 2) if d else 4)):
-                                    self.forecast[k] = f
-                                    _LOGGER.debug(f"Solar forecast of {solar_entry_id} for {k} ({wh_hour}): {f}")
-                                    if not q:
-                                        k2 = k + TIME_QOUR
-                                        self.forecast[k2] = f
-                                        _LOGGER.debug(f"Solar forecast of {solar_entry_id} for {k2} ({wh_hour}): {f}")
-                                        if not d:
-                                            k3 = k2 + TIME_QOUR
-                                            self.forecast[k3] = f
-                                            _LOGGER.debug(f"Solar forecast of {solar_entry_id} for {k3} ({wh_hour}): {f}")
-                                            k4 = k3 + TIME_QOUR
-                                            self.forecast[k4] = f
-                                            _LOGGER.debug(f"Solar forecast of {solar_entry_id} for {k4} ({wh_hour}): {f}")
+                with self.timings.measure("solar"):
+                    if (solar_entries := production.get("forecast")) and (forecast_platforms := await async_get_energy_platforms(self.hass)):
+                        for solar_entry_id in solar_entries:
+                            if (solar_entry := self.hass.config_entries.async_get_entry(solar_entry_id)) and solar_entry is not None and solar_entry.domain in forecast_platforms and (forecast := await forecast_platforms[solar_entry.domain](self.hass, solar_entry_id)):
+                                wh_hours, slots = await offload(self.hass, self.timings, "loop_forecast", len(self.forecast), OFFLOAD["forecast"], _merge_forecast, forecast["wh_hours"], list(self.forecast), tzn, yesterday, tomorrow)
+                                if wh_hours:
+                                    self.fresh["forecast"] = utcnow()
+                                    if wh_hours != self._data.forecast:
+                                        self._data.forecast = wh_hours
+                                    self.forecast.update(slots)
+                                    if _TRACE_FORECAST:
+                                        for k, f in slots.items():
+                                            _TRACE_FORECAST("slot", entry = solar_entry_id, at = k, kwh = f)
                 grid = self._energy_entries.setdefault("grid", {})
                 grid_from = grid.get("from", [])
                 grid_to = grid.get("to", [])
@@ -518,7 +855,8 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                 _LOGGER.debug(f"Production: {production_from}, Grid from: {grid_from}, Grid to: {grid_to}, Battery from: {battery_from}, Battery to: {battery_to}, Battery: {battery_soc}")
                 recorder = get_instance(self.hass)
                 try:
-                    if not self.consumption or next(iter(self.consumption.values())) is None or not self.today_consumption or self.today_consumption.get(self.now - TIME_HOUR) is None:
+                    if self._needs_profile_query(today):
+                        self._profile_dirty = False
                         offset = f"{o[:3]}:{o[3:]}" if (o := local.strftime('%z')) else "+00:00"
                         query_str = generate_query_string(
                             recorder.dialect_name == SupportedDialect.SQLITE,
@@ -540,20 +878,22 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                         self.cost.clear()
                         self.consumption_mean = 0.5
                         self.consumption_max_max = 1.0
-                        async for k, v in self._execute(query_str, tzn):
-                            _LOGGER.debug(f"Query result {k}: {v}")
-                            l_date = k.astimezone(tzn).date()
-                            self.consumption[k] = c if (c := v.get("mean")) is not None else self.consumption.get(k - TIME_DAY)
-                            self.consumption_max[k] = c if (c := v.get("maximum")) is not None else self.consumption_max.get(k - TIME_DAY)
-                            self.today_consumption[k] = v.get("consumption")
-                            self.expected_consumption[k] = c if (c := self.today_consumption[k]) is not None else self.consumption[k] if l_date == today else None
-                            self.production[k] = v.get("production")
-                            self.imported[k] = v.get("imported")
-                            self.exported[k] = v.get("exported")
-                            self.cost[k] = v.get("cost")
-                            if l_date == today:
-                                self.consumption_mean = (sum(c) / len(c)) if (c := [v for kk, v in self.consumption.items() if kk <= k and v is not None]) else self.consumption_mean
-                                self.consumption_max_max = max(self.consumption_max[k], self.consumption_max_max) if self.consumption_max[k] is not None else self.consumption_max_max
+                        with self.timings.measure("consumption") as stage:
+                            async for k, v in self._execute(query_str, tzn):
+                                stage.items += 1
+                                _TRACE_QUERY("row", at = k, values = v)
+                                l_date = k.astimezone(tzn).date()
+                                self.consumption[k] = c if (c := v.get("mean")) is not None else self.consumption.get(k - TIME_DAY)
+                                self.consumption_max[k] = c if (c := v.get("maximum")) is not None else self.consumption_max.get(k - TIME_DAY)
+                                self.today_consumption[k] = v.get("consumption")
+                                self.expected_consumption[k] = c if (c := self.today_consumption[k]) is not None else self.consumption[k] if l_date == today else None
+                                self.production[k] = v.get("production")
+                                self.imported[k] = v.get("imported")
+                                self.exported[k] = v.get("exported")
+                                self.cost[k] = v.get("cost")
+                                if l_date == today:
+                                    self.consumption_mean = (sum(c) / len(c)) if (c := [v for kk, v in self.consumption.items() if kk <= k and v is not None]) else self.consumption_mean
+                                    self.consumption_max_max = max(self.consumption_max[k], self.consumption_max_max) if self.consumption_max[k] is not None else self.consumption_max_max
                         for k in self.consumption.keys():
                             if k.astimezone(tzn).date() == today:
                                 if self.consumption[k] is None:
@@ -563,34 +903,35 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                                 if self.expected_consumption[k] is None:
                                     self.expected_consumption[k] = self.consumption[k]
                         self.consumption_mean = (sum(c) / len(c)) if (c := [v for kk, v in self.consumption.items() if kk.astimezone(tzn).date() == today and v is not None]) else 0.5
-                        until_sunrise_consumption = 0
-                        sunrise_datetime = datetime.combine(tomorrow, datetime.min.time()).astimezone(UTC)
-                        date_anchor = tomorrow if sunrise_datetime in self.consumption else today
-                        for k, v in self.consumption.items():
-                            if k.astimezone(tzn).date() == date_anchor:
-                                if (vv := v - self.forecast.get(k, 0)) > 0:
-                                    until_sunrise_consumption += vv
-                                    sunrise_datetime = k
-                                else:
-                                    break
-                        self.reserve = (sum(c) / len(c)) if (c := [v for kk, v in self.consumption.items() if kk.astimezone(tzn) >= sunrise_datetime and v is not None]) else 0
-                        self.reserve = until_sunrise_consumption + (r if self.forecast and (r := self.reserve - sum([v for kk, v in self.forecast.items() if kk.astimezone(tzn) >= sunrise_datetime and v is not None])) > 0 else 0)
+                        self.fresh["profile"] = utcnow()
+                        until_sunrise_consumption, self.reserve = _get_reserve(self.consumption, self.forecast, tzn, today)
+                        if tomorrow in ring and (self._rollover is None or self._rollover.day != tomorrow):
+                            # Tomorrow's profile comes with today's, keep it ready along with the day after's pricing layers
+                            #
+                            self.config_entry.async_create_background_task(self.hass, self._async_prepare_layers((tomorrow + TIME_DAY,)), f"{DOMAIN} - prepare layers", eager_start = False)
+                        if tomorrow in ring:
+                            self._rollover = self._prepare_rollover(tzn, tomorrow)
                         _LOGGER.debug(f"Daily mean: {self.consumption_mean}, top consumption: {self.consumption_max_max}, until sunrise consumption: {until_sunrise_consumption} and tommorrow reserve needed: {self.reserve}")
                         self.cost_today = sum(filter(None, self.cost.values()))
                         self.cost_rate_today = (self.cost_today / imported_sum) if (imported_sum := sum(filter(None, self.imported.values()))) > 0 else None
-                        self.cost_today_expected = sum(float(self._data.rates_full[k]) * v for k, v in self.expected_consumption.items() if v is not None)
-                        if not today in self.cost_total and (cost_sensors := self.hass.data["energy"]["cost_sensors"]) and (c := [cost_sensors[j] for j in grid_from]) and (all_stats := await recorder.async_add_executor_job(_compile_statistics, self.hass, now)):
-                            try:
-                                self.cost_total[today] = reduce(add, map(lambda i: i["stat"]["sum"], _get_statistics_for_entity(all_stats, c)))
-                            except Exception as e:
-                                _LOGGER.debug(f"Cost statistics error: {common.strepr(e)}")
+                        self.cost_today_expected = sum(money.to_float(self._data.rates_full[k]) * v for k, v in self.expected_consumption.items() if v is not None)
+                        with self.timings.measure("cost"):
+                            if not today in self.cost_total and (cost_sensors := self.hass.data["energy"]["cost_sensors"]) and (c := [cost_sensors[j] for j in grid_from]) and (all_stats := await recorder.async_add_executor_job(_compile_statistics, self.hass, now)):
+                                try:
+                                    self.cost_total[today] = reduce(add, map(lambda i: i["stat"]["sum"], _get_statistics_for_entity(all_stats, c)))
+                                    self._trim_cost_total()
+                                except Exception as e:
+                                    _LOGGER.debug(f"Cost statistics error: {common.strepr(e)}")
                         if battery_soc:
                             self.battery_max = float(await self._execute_simple(generate_query_string_simple(recorder.dialect_name == SupportedDialect.SQLITE, common.joinify(*battery_soc), offset, 15)))
                 except Exception as e:
                     _LOGGER.debug(f"Consumption statistics error: {common.strepr(e)}")
                 try:
-                    if battery_soc and (stats := await recorder.async_add_executor_job(_get_significant_states_with_session, self.hass, self.now, battery_soc)):
-                        self.battery = min(map(lambda i: float(stats[i][-1]["s"]), stats)) if self.config_battery == "min" else (sum(map(lambda i: float(stats[i][-1]["s"]), stats)) / len(stats))
+                    with self.timings.measure("battery"):
+                        if battery_soc and (stats := await recorder.async_add_executor_job(_get_significant_states_with_session, self.hass, self.now, battery_soc)):
+                            self.battery = min(map(lambda i: float(stats[i][-1]["s"]), stats)) if self.config_battery == "min" else (sum(map(lambda i: float(stats[i][-1]["s"]), stats)) / len(stats))
+                            if sampled := [lu for i in stats if (lu := stats[i][-1].get("lu")) is not None]:
+                                self.fresh["battery"] = datetime.fromtimestamp(min(sampled), UTC)
                 except Exception as e:
                     _LOGGER.debug(f"Last battery state error: {common.strepr(e)}")
             if self.battery is not None and self.consumption and next(iter(self.consumption.values())):
@@ -601,18 +942,31 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
                     strt = self.get_strategy(self.now)
                     self.consumption_now = self.get_consumption(self.now, strt)
                     json = {
-                        "rate": [(float(self._data.rates_full[k]), float(self._data.compensation_rate[k])) for k in rats.keys()],
+                        "rate": [(money.to_float(self._data.rates_full[k]), money.to_float(self._data.compensation_rate[k])) for k in rats.keys()],
                         "production": [self.forecast[k] for k in rats.keys()],
                         "consumption": ([self.consumption_now] + [(c if self.config_strategy == "hourly" and (c := self.consumption.get(k)) and c >= 0 else self.consumption_mean) * q for k in rats.keys() if k > self.now and (q := (1 + float(rats[k] - rmin) * (self.config_coefficient_strategy - 1) / rang) if rang > 0 else 1) is not None]) if self.config_area != "disabled" else [0 for _ in rats.keys()],
-                        "constraints": {"soc": self.battery / 100, "grid_power": i / 1000 / 4 if self.config_import_ids and (i := sum(float(v.state) for id in self.config_import_ids if (v := self.hass.states.get(id)) and v.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE))) else 99999.9, "sell_power": float(e.state) / 1000 / 4 if self.config_export_id and (e := self.hass.states.get(self.config_export_id)) and e.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else 99999.9, "charge_power": self.config_charge_power / 4, "discharge_power": self.config_discharge_power / 4, "soc_limit": self.config_soc_limit / 100, "soc_max": ((self.config_soc_limit if not self.optimization or not self.optimization[self.now][3] else self.config_soc_max) if self.battery_max > self.config_soc_limit - 2 else 100) / 100, "soc_min": self.config_soc_min / 100, "soc_reserve": (self.config_soc_min + (0 if self._data.tomorrow or (r := min(self.reserve / self.config_capacity * 100, 100)) <= 0 else ((self.config_soc_reserve / 100) * (r / 100) * 100))) / 100, "capacity": self.config_capacity, "amortization": self.config_amortization}
+                        "constraints": {"soc": self.battery / 100, "grid_power": i / 1000 / 4 if self.config_import_ids and (i := sum(float(v.state) for id in self.config_import_ids if (v := self.hass.states.get(id)) and v.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE))) else 99999.9, "sell_power": float(e.state) / 1000 / 4 if self.config_export_id and (e := self.hass.states.get(self.config_export_id)) and e.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE) else 99999.9, "charge_power": self.config_charge_power / 4, "discharge_power": self.config_discharge_power / 4, "soc_limit": self.config_soc_limit / 100, "soc_max": ((self.config_soc_limit if not self.optimization or not self.optimization[self.now].charge else self.config_soc_max) if self.battery_max > self.config_soc_limit - 2 else 100) / 100, "soc_min": self.config_soc_min / 100, "soc_reserve": (self.config_soc_min + (0 if self._data.tomorrow or (r := min(self.reserve / self.config_capacity * 100, 100)) <= 0 else ((self.config_soc_reserve / 100) * (r / 100) * 100))) / 100, "capacity": self.config_capacity, "amortization": self.config_amortization}
                     }
-                    if (r := await common.pg(self._session, URL, json = json, headers = { "X-API-Key": self.config_key })) is not None:
-                        _LOGGER.debug(f"Optimization ({strt}: {self.consumption_now}) of {json}: {r}")
-                        self.predicted_cost = float(r[0][1])
-                        self.predicted_amortization = float(r[0][3])
-                        self.optimization = {k: v for k, v in zip(rats.keys(), r[1])}
+                    data, headers = await offload(self.hass, self.timings, "loop_payload", len(rats), OFFLOAD["payload"] // (4 if self.config_transport_compression else 1), transport.encode, json, self.config_transport_encoding, self.config_transport_compression)
+                    with self.timings.measure("optimizer") as stage:
+                        stage.items += len(rats)
+                        response = await common.pgr(self._session, URL, data, headers | { "X-API-Key": self.config_key })
+                        summary, plan = await offload(self.hass, self.timings, "loop_plan", len(response[2]), OFFLOAD["plan"], transport.decode, *response)
+                    _TRACE_OPTIMIZER("solve", strategy = strt, consumption_now = self.consumption_now, request = json, summary = summary, plan = plan)
+                    self.predicted_cost = float(summary[1])
+                    self.predicted_amortization = float(summary[3])
+                    self.optimization = Plan(next(iter(rats)), plan)
+                    self.fresh["solve"] = utcnow()
                 except Exception as e:
                     _LOGGER.exception(f"Optimization failed: {common.strepr(e)} ({json})")
+            if (current := self._data).generation != self._warmed:
+                self._warmed = generation = current.generation
+                series = await offload(self.hass, self.timings, "loop_series", len(current.rates_full), OFFLOAD["series"], _build_series, {c: getattr(current, c) for c, _ in _SERIES.values()}, current.zone_info)
+                # Columns are never modified once built, a new forecast replaces its column as a new generation whose
+                # series the entities build as they read them
+                #
+                if current.generation == generation:
+                    current._series = series | current._series
 
     async def _async_update_data(self):
 
@@ -620,7 +974,7 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
             if self._deferred_refresh:
                 self._deferred_refresh()
                 self._deferred_refresh = None
-            await self._fetch_data()
+            await self._fetch()
 
             #async def action():
             #    self.async_set_updated_data(await self._fetch_data())
@@ -630,9 +984,9 @@ class Coordinator(DataUpdateCoordinator[CoordinatorData]):
         if self._data:
             self._deferred_refresh = event.async_call_later(self.hass, 30, action)
         else:
-            await self._fetch_data()
+            await self._fetch()
 
         self._data.now = common.dt_block(utcnow())
-        self._data.optimization = {k: v for k, v in self.optimization.items() if k >= self._data.now}
+        self._data.optimization = self.optimization.view(self._data.now)
 
         return self._data
@@ -1,6 +1,7 @@
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 
+from .money import to_float
 from .coordinator import Coordinator
 
 async def async_get_config_entry_diagnostics(_: HomeAssistant, config_entry: ConfigEntry[Coordinator]):
@@ -10,6 +11,9 @@ async def async_get_config_entry_diagnostics(_: HomeAssistant, config_entry: Con
             "time": config_entry.runtime_data.now.isoformat(),
             "battery": config_entry.runtime_data.battery
         },
-        "triad": {k.isoformat(): (float(v), config_entry.runtime_data.forecast.get(k, 0), config_entry.runtime_data.consumption.get(k, 0)) for k, v in config_entry.runtime_data.data.rates_full.items()},
-        "optimization": config_entry.runtime_data.optimization
+        "triad": {k.isoformat(): (to_float(v), config_entry.runtime_data.forecast.get(k, 0), config_entry.runtime_data.consumption.get(k, 0)) for k, v in config_entry.runtime_data.data.rates_full.items()},
+        "optimization": config_entry.runtime_data.optimization.as_dict(),
+        "timings": {k: v.as_dict() for k, v in config_entry.runtime_data.stages().items()},
+        "freshness": {k: v.isoformat() for k, v in config_entry.runtime_data.freshness().items()},
+        "memory": {k: v._asdict() for k, v in config_entry.runtime_data.usage().items()}
     }
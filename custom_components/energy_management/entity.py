@@ -21,6 +21,7 @@ class EnergyManagementEntity(CoordinatorEntity[Coordinator]):
         self._attr_native_value: StateType | str | date | datetime | time | float | Decimal | None = None
         self._attr_extra_state_attributes: dict[str, Any] = {}
         self._attr_is_on: bool | None = None
+        self._last_written: tuple[bool, Any, dict[str, Any] | None] | None = None
         self.update()
 
     @property
@@ -30,6 +31,10 @@ class EnergyManagementEntity(CoordinatorEntity[Coordinator]):
     @callback
     def _handle_coordinator_update(self) -> None:
         self.update()
+        # Series attributes are shared per data generation so the identity check in tuple comparison keeps this cheap
+        if (written := (self.available, self.state, self.extra_state_attributes)) == self._last_written:
+            return
+        self._last_written = written
         super()._handle_coordinator_update()
 
     def update(self):
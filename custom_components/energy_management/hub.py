@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+
+from time import monotonic
+from logging import getLogger
+from typing import Any, Awaitable, Callable
+
+from datetime import datetime
+from aiohttp import ClientSession
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import aiohttp_client
+from homeassistant.util.hass_dict import HassKey
+from homeassistant.util.dt import utcnow
+
+from .const import DOMAIN
+from .timings import Timings
+from . import trace
+from .memory import Usage, sizeof
+
+_LOGGER = getLogger(__name__)
+_TRACE = trace.get("provider")
+
+DATA_HUB: HassKey[ProviderHub] = HassKey(f"{DOMAIN}_hub")
+
+class ProviderHub:
+    """Upstream resources shared by all config entries, each fetched once per validity period."""
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.session: ClientSession = aiohttp_client.async_get_clientsession(hass)
+        self.entries: set[str] = set()
+        self.timings = Timings()
+        self.fresh: dict[str, datetime] = {}
+        self._resources: dict[tuple, tuple[float, asyncio.Future]] = {}
+        self._functions: dict[tuple[str, str], tuple[tuple, Any]] = {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({len(self.entries)} entries)"
+
+    async def fetch(self, key: tuple, factory: Callable[[], Awaitable[tuple[Any, float]]]) -> Any:
+        """Return the resource under key, concurrent callers share one request, factory returns (value, ttl in seconds)."""
+        if (resource := self._resources.get(key)) is None or resource[1].done() and resource[0] <= monotonic():
+            now = monotonic()
+            self._resources = {k: v for k, v in self._resources.items() if not v[1].done() or v[0] > now}
+            _TRACE("fetch", key = key)
+            resource = self._resources[key] = (float("inf"), self.hass.async_create_task(factory(), f"{DOMAIN} - fetch {key[0]}", eager_start = False))
+        try:
+            value, ttl = await asyncio.shield(resource[1])
+        except Exception:
+            if self._resources.get(key) is resource:
+                self._resources.pop(key)
+            raise
+        if self._resources.get(key) is resource and resource[0] == float("inf"):
+            self._resources[key] = (monotonic() + ttl, resource[1])
+        return value
+
+    def function(self, key: tuple[str, str], params: tuple, factory: Callable[[], Any]) -> Any:
+        """Provider function for an entry, rebuilt only when its parameters change."""
+        if (function := self._functions.get(key)) is None or function[0] != params:
+            function = self._functions[key] = (params, factory())
+        return function[1]
+
+    def mark(self, name: str, when: datetime | None = None) -> None:
+        """Record when an upstream input was last obtained (or what time it is valid for)."""
+        self.fresh[name] = when or utcnow()
+
+    def usage(self) -> dict[str, Usage]:
+        return {
+            "hub.resources": Usage(len(self._resources), sizeof([f.result() for _, f in self._resources.values() if f.done() and not f.cancelled() and f.exception() is None])),
+            "hub.functions": Usage(len(self._functions), sizeof([p for p, _ in self._functions.values()]))
+        }
+
+    @callback
+    def async_register(self, entry_id: str) -> None:
+        self.entries.add(entry_id)
+
+    @callback
+    def async_release(self, entry_id: str) -> None:
+        self.entries.discard(entry_id)
+        self._functions = {k: v for k, v in self._functions.items() if k[0] != entry_id}
+        if not self.entries:
+            self._resources.clear()
+            self.hass.data.pop(DATA_HUB, None)
+
+@callback
+def async_get(hass: HomeAssistant) -> ProviderHub:
+    if (hub := hass.data.get(DATA_HUB)) is None:
+        hub = hass.data[DATA_HUB] = ProviderHub(hass)
+    return hub
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import sys
+
+from functools import update_wrapper
+from xml.etree.ElementTree import Element
+from typing import Any, Callable, Generic, NamedTuple, ParamSpec, TypeVar
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+class Usage(NamedTuple):
+    entries: int
+    size: int
+    cap: int | None = None
+    evicted: int = 0
+
+def sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """Approximate deep size in bytes, follows builtin containers and XML elements only."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    match obj:
+        case dict():
+            size += sum(sizeof(k, seen) + sizeof(v, seen) for k, v in obj.items())
+        case list() | tuple() | set() | frozenset():
+            size += sum(sizeof(i, seen) for i in obj)
+        case Element():
+            size += sizeof(obj.tag, seen) + sizeof(obj.attrib, seen) + sizeof(obj.text, seen) + sizeof(obj.tail, seen) + sum(sizeof(i, seen) for i in obj)
+    return size
+
+# Module level caches shared by all entries, capped by the largest limit any loaded entry configured
+#
+CACHES: dict[str, Cache] = {}
+
+_caps: dict[str, int] = {}
+
+class Cache(Generic[_P, _R]):
+    """Memoization like functools.cache, accounted and evicting the oldest entries over the cap."""
+
+    def __init__(self, name: str, function: Callable[_P, _R]):
+        self.name = name
+        self.cap: int | None = max(_caps.values(), default = None)
+        self.evicted = 0
+        self._function = function
+        self._data: dict[Any, _R] = {}
+        update_wrapper(self, function)
+        CACHES[name] = self
+
+    def __call__(self, *args: _P.args, **kwargs: _P.kwargs) -> _R:
+        key = args + tuple(kwargs.items()) if kwargs else args
+        try:
+            return self._data[key]
+        except KeyError:
+            pass
+        value = self._data[key] = self._function(*args, **kwargs)
+        if self.cap is not None and len(self._data) > self.cap:
+            self.evict(self.cap)
+        return value
+
+    def evict(self, size: int) -> None:
+        while len(self._data) > size:
+            del self._data[next(iter(self._data))]
+            self.evicted += 1
+
+    def cache_clear(self) -> None:
+        self._data.clear()
+
+    def usage(self) -> Usage:
+        return Usage(len(self._data), sizeof(self._data), self.cap, self.evicted)
+
+def cache(name: str) -> Callable[[Callable[_P, _R]], Cache[_P, _R]]:
+    return lambda function: Cache(name, function)
+
+def configure(owner: str, cap: int | None) -> None:
+    if cap is None:
+        _caps.pop(owner, None)
+    else:
+        _caps[owner] = cap
+    effective = max(_caps.values(), default = None)
+    for c in CACHES.values():
+        c.cap = effective
+        if effective is not None:
+            c.evict(effective)
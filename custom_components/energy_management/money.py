@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# Prices are carried as integer nano units (1e-9 of the currency, CZK/kWh etc.) through pricing, caching and storage
+#
+# Spot prices (EUR/MWh with 2 decimals × CNB rate with 3 decimals / 1000) need 8 decimals, so they are exact,
+# every other rounding (VAT multiplication, values with more than 9 decimals) is half to even at 1e-9,
+# i.e. results differ from the former Decimal arithmetic by at most 0.5e-9. Floats only at the presentation boundary.
+#
+DIGITS = 9
+SCALE = 10 ** DIGITS
+
+_QUANTUM = Decimal(1).scaleb(-DIGITS)
+
+def round_div(n: int, d: int) -> int:
+    q, r = divmod(n, d)
+    return q + 1 if r * 2 > d or r * 2 == d and q & 1 else q
+
+def mul(a: int, b: int) -> int:
+    return round_div(a * b, SCALE)
+
+def muldiv(a: int, b: int, d: int) -> int:
+    return round_div(a * b, SCALE * d)
+
+def parse(value: str) -> int:
+    text = value.strip()
+    negative = text.startswith("-")
+    whole, _, fraction = text.lstrip("+-").partition(".")
+    if (whole.isdigit() or not whole and fraction) and (fraction.isdigit() or not fraction) and len(fraction) <= DIGITS:
+        n = int(whole or "0") * SCALE + int(fraction.ljust(DIGITS, "0"))
+        return -n if negative else n
+    return from_decimal(Decimal(text))
+
+def from_decimal(value: Decimal) -> int:
+    return int(value.quantize(_QUANTUM, rounding = ROUND_HALF_EVEN).scaleb(DIGITS))
+
+def to_money(value: str | float | int | Decimal) -> int:
+    """Amount in currency units to fixed point, floats by their shortest repr."""
+    match value:
+        case int():
+            return value * SCALE
+        case Decimal():
+            return from_decimal(value)
+        case float():
+            return parse(repr(value))
+    return parse(value)
+
+def to_decimal(value: int) -> Decimal:
+    return Decimal(value).scaleb(-DIGITS)
+
+def to_float(value: int) -> float:
+    return value / SCALE
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, NamedTuple
+from datetime import datetime, tzinfo
+from itertools import count, islice
+
+from homeassistant.util.dt import UTC
+
+from .const import TIME_QOUR
+
+class PlanSlot(NamedTuple):
+    soc: float
+    grid: float
+    battery: float
+    charge: bool
+    discharge: bool
+    export: bool
+    surplus: float
+
+PLAN_FIELDS = PlanSlot._fields
+
+_INDEX = {f: i for i, f in enumerate(PLAN_FIELDS)}
+
+_GENERATION = count()
+
+def _changes(keys: Iterator[Any], values: Iterator[Any]) -> Iterator[tuple[Any, Any]]:
+    previous = None
+    for k, v in zip(keys, values):
+        if v != previous:
+            yield k, v
+        previous = v
+
+class Plan:
+    """Optimization plan stored column-wise and addressed by 15 minute slot index."""
+
+    __slots__ = ("generation", "start", "zone", "columns", "_keys", "_iso", "_series")
+
+    def __init__(self, start: datetime | None = None, columns: tuple[tuple[Any, ...], ...] = ()):
+        self.generation = next(_GENERATION)
+        self.start = start.astimezone(UTC) if start else None
+        self.zone: tzinfo | None = start.tzinfo if start else None
+        self.columns = columns if columns and columns[0] else ()
+        self._keys: tuple[datetime, ...] | None = None
+        self._iso: tuple[str, ...] | None = None
+        self._series: dict[tuple[str, bool], tuple[int, dict[str, Any]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __bool__(self) -> bool:
+        return bool(self.columns)
+
+    def __contains__(self, dt: datetime) -> bool:
+        return bool(self.columns) and 0 <= self.index(dt) < len(self)
+
+    def __getitem__(self, dt: datetime) -> PlanSlot:
+        if not self.columns or not 0 <= (i := self.index(dt)) < len(self):
+            raise KeyError(dt)
+        return self.slot(i)
+
+    def get(self, dt: datetime, default: PlanSlot | None = None) -> PlanSlot | None:
+        return self[dt] if dt in self else default
+
+    def index(self, dt: datetime) -> int:
+        return (dt - self.start) // TIME_QOUR
+
+    def slot(self, i: int) -> PlanSlot:
+        return PlanSlot(*(c[i] for c in self.columns))
+
+    def keys(self) -> tuple[datetime, ...]:
+        if self._keys is None:
+            self._keys = tuple((self.start + TIME_QOUR * i).astimezone(self.zone) for i in range(len(self)))
+        return self._keys
+
+    def iso_keys(self) -> tuple[str, ...]:
+        if self._iso is None:
+            self._iso = tuple(k.isoformat() for k in self.keys())
+        return self._iso
+
+    def column(self, field: str) -> tuple[Any, ...]:
+        return self.columns[_INDEX[field]] if self.columns else ()
+
+    def series(self, field: str, offset: int = 0, changes: bool = False) -> dict[str, Any]:
+        if (entry := self._series.get(key := (field, changes))) is None or entry[0] != offset:
+            keys, values = islice(self.iso_keys(), offset, None), islice(self.column(field), offset, None)
+            self._series[key] = entry = (offset, dict(_changes(keys, values) if changes else zip(keys, values)))
+        return entry[1]
+
+    def view(self, dt: datetime) -> PlanView:
+        return PlanView(self, min(max(self.index(dt), 0), len(self)) if self.columns else 0)
+
+    def as_dict(self) -> dict[str, tuple[Any, ...]]:
+        return {k.isoformat(): self.slot(i) for i, k in enumerate(self.keys())}
+
+class PlanView:
+    """Read-only window of a plan starting at slot offset, nothing is copied."""
+
+    __slots__ = ("plan", "offset")
+
+    def __init__(self, plan: Plan, offset: int = 0):
+        self.plan = plan
+        self.offset = offset
+
+    def __len__(self) -> int:
+        return len(self.plan) - self.offset
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __contains__(self, dt: datetime) -> bool:
+        return bool(self.plan.columns) and self.offset <= self.plan.index(dt) < len(self.plan)
+
+    def __getitem__(self, dt: datetime) -> PlanSlot:
+        if dt not in self:
+            raise KeyError(dt)
+        return self.plan.slot(self.plan.index(dt))
+
+    def get(self, dt: datetime, default: PlanSlot | None = None) -> PlanSlot | None:
+        return self[dt] if dt in self else default
+
+    def keys(self) -> Iterator[datetime]:
+        return islice(self.plan.keys(), self.offset, None)
+
+    def values(self) -> Iterator[PlanSlot]:
+        return map(self.plan.slot, range(self.offset, len(self.plan)))
+
+    def items(self) -> Iterator[tuple[datetime, PlanSlot]]:
+        return zip(self.keys(), self.values())
+
+    def column(self, field: str) -> Iterator[Any]:
+        return islice(self.plan.column(field), self.offset, None)
+
+    def changes(self, field: str) -> Iterator[tuple[datetime, Any]]:
+        return _changes(self.keys(), self.column(field))
+
+    def series(self, field: str, changes: bool = False) -> dict[str, Any]:
+        return self.plan.series(field, self.offset, changes)
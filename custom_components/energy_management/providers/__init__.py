@@ -1,36 +1,57 @@
-from datetime import datetime, time
-from aiohttp import ClientSession
-from functools import lru_cache, partial
+from __future__ import annotations
+
+from datetime import datetime, date, time
+from functools import partial
 from decimal import Decimal
+from typing import TYPE_CHECKING
 
 from homeassistant.util.dt import UTC
 
-from ..const import TIME_DAY, PZERO_DECIMAL, RATES_DEFAULT
-from .cz import get_function as get_cz
+from ..const import TIME_DAY, RATES_DEFAULT
+from .cz import get_function as get_cz, preload as preload_cz, prepare as prepare_cz
 from .cz.ote import post as ote_post
 from .cz.fix import post as fix_post
 
+if TYPE_CHECKING:
+    from ..hub import ProviderHub
+
 _map = {
     "CZ": partial(get_cz, ote_post),
     "CZ-fix": partial(get_cz, fix_post)
 }
 
+_preload = {
+    "CZ": preload_cz
+}
+
+_prepare = {
+    "CZ": prepare_cz,
+    "CZ-fix": prepare_cz
+}
+
 async def _default(dt: datetime, **kwargs: list[float]):
     t = dt.astimezone(UTC).date()
     print(t)
     r = kwargs.get("rates", RATES_DEFAULT)
     y = t - TIME_DAY
     for i in range(24):
-        yield datetime.combine(y, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (PZERO_DECIMAL, PZERO_DECIMAL))
+        yield datetime.combine(y, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (0, 0))
     for i in range(24):
-        yield datetime.combine(t, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (PZERO_DECIMAL, PZERO_DECIMAL))
+        yield datetime.combine(t, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (0, 0))
     t = t + TIME_DAY
     for i in range(24):
-        yield datetime.combine(t, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (PZERO_DECIMAL, PZERO_DECIMAL))
+        yield datetime.combine(t, time(i, tzinfo = dt.tzinfo)).astimezone(UTC), *((r[i], r[i]) if i < len(r) else (0, 0))
 
-def _get_default(_: ClientSession, _area: str, _rate: str, _tariff: str, _fee: tuple[float | Decimal] | float | Decimal, _pmod: str, _currency: str):
+def _get_default(_: ProviderHub, _area: str, _rate: str, _tariff: str, _fee: tuple[float | Decimal] | float | Decimal, _pmod: str, _currency: str):
     return _default, lambda _: False
 
-@lru_cache(maxsize = len(_map) + 1)
-def get_function(s: ClientSession, area: str, rate: str, tariff: str, pmod: str, fee: tuple[float | Decimal] | float | Decimal, country: str, currency: str):
-    return _map.get(country, _get_default)(s, area, rate, tariff, fee, pmod, currency)
+def get_function(hub: ProviderHub, entry_id: str, area: str, rate: str, tariff: str, pmod: str, fee: tuple[float | Decimal] | float | Decimal, country: str, currency: str):
+    return hub.function((entry_id, country), (area, rate, tariff, pmod, fee, currency), lambda: _map.get(country, _get_default)(hub, area, rate, tariff, fee, pmod, currency))
+
+def preload(country: str, years: tuple[int, ...] = ()):
+    if p := _preload.get(country):
+        p(years)
+
+async def prepare(hub: ProviderHub, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, country: str, days: tuple[date, ...]):
+    if p := _prepare.get(country):
+        await p(hub, area, rate, tariff, fee, days)
@@ -1,29 +1,35 @@
-import asyncio
+from __future__ import annotations
+
 import re
 
 from logging import getLogger
-from functools import cache, partial
+from functools import partial
 from datetime import datetime, date, time
 from collections.abc import AsyncGenerator
-from typing import Any, Callable, Coroutine
+from typing import TYPE_CHECKING, Any, Callable, Coroutine
 from aiohttp import ClientSession
 from decimal import Decimal
 
+from homeassistant.util.dt import UTC
+
+from ...const import TIME_QOUR, HUB_RETRY, HUB_INTERVALS_TTL, HUB_LAYER_TTL
 from ...common import strepr, fruple, pg
-from .const import VAT, HOLIDAYS, TIMEZONE, RATE, TARIFF, URL_CEZ, CEZ_TUPLES, URL_EGD_REGION, URL_EGD
+from ...money import SCALE, mul, to_money
+from ...memory import cache
+from ... import trace
+from . import const, tariffs
+from .const import VAT, TIMEZONE, URL_CEZ, CEZ_TUPLES, URL_EGD_REGION, URL_EGD
 
-_LOGGER = getLogger(__name__)
+if TYPE_CHECKING:
+    from ...hub import ProviderHub
 
-def acache(function):
-    @cache
-    def cached_function(*args, **kwargs):
-        return asyncio.ensure_future(function(*args, **kwargs))
-    return cached_function
+_LOGGER = getLogger(__name__)
+_TRACE = trace.get("provider")
 
 def _all_same(values):
     return all(i == values[0] for i in values)
 
-@cache
+@cache("cz.area")
 def _area_normalized(area: str):
     area = area.lower()
     match area:
@@ -35,7 +41,7 @@ def _area_normalized(area: str):
             return "pre"
     return area
 
-@cache
+@cache("cz.region")
 def _region_normalized(region: str):
     region = region.lower()
     match region:
@@ -54,8 +60,7 @@ def _region_normalized(region: str):
             return x
     return region
 
-@acache
-async def _get_intervals(s: ClientSession, area: str, rate: str, tariff: str, dt: date):
+async def _fetch_intervals(s: ClientSession, area: str, rate: str, tariff: str, dt: date):
     try:
         match area:
             case "cez" if ';' in tariff:
@@ -64,7 +69,7 @@ async def _get_intervals(s: ClientSession, area: str, rate: str, tariff: str, dt
                 code = code.upper()
                 data = (await pg(s, URL_CEZ.format(region, code)))["data"]
                 resp = tuple(tuple((time(hour = int(o[0]), minute = int(o[1])), time(hour = int(f[0]), minute = int(f[1]))) for on, off in CEZ_TUPLES if d[on] and (o := d[on].split(":")) and (f := d[off].split(":"))) for d in data)
-                _LOGGER.debug(f"Tariff intervals for '{region}' w/ code '{code}': {resp}")
+                _TRACE("intervals", region = region, code = code, intervals = resp)
                 if _all_same(resp):
                     return resp[0]
                 if len(resp) == 2:
@@ -80,7 +85,7 @@ async def _get_intervals(s: ClientSession, area: str, rate: str, tariff: str, dt
                 code_a, code_b, code_dp = (regex.group(1), regex.group(2), regex.group(4)) if (regex := re.search("A(\\d+)B(\\d+)(DP|P)(\\d+)", code, re.IGNORECASE)) and len(regex.groups()) > 3 else (code, code, code)
                 szby = [d for d in await pg(s, URL_EGD) if ((not region and d["kodHdo_A"] == code_a) or (d["region"] == region and d['A'] == code_a and d['B'] == code_b and (d["DP"] == code_dp or d["DP"] == '0' + code_dp))) and date(year = int(d["od"]["rok"]) if int(d["od"]["rok"]) != 9999 else dt.year if dt.month >= int(d["od"]["mesic"]) else dt.year - 1, month = int(d["od"]["mesic"]), day = int(d["od"]["den"])) <= dt <= date(year = int(d["do"]["rok"]) if int(d["do"]["rok"]) != 9999 else dt.year if dt.month <= int(d["do"]["mesic"]) else dt.year + 1, month = int(d["do"]["mesic"]), day = int(d["do"]["den"]))][0]["sazby"]
                 resp = tuple(tuple((time(hour = int(o[0]), minute = int(o[1])), time(hour = int(f[0]), minute = int(f[1]))) for c in s["casy"] if (o := c["od"].split(":")) and (f := c["do"].split(":"))) for s in [r for r in szby if rate in r["sazba"] or len(szby) == 1][0]["dny"])
-                _LOGGER.debug(f"Tariff intervals for '{region}' w/ code '{code}': {resp}")
+                _TRACE("intervals", region = region, code = code, intervals = resp)
                 if _all_same(resp):
                     return resp[0]
                 return resp
@@ -90,30 +95,73 @@ async def _get_intervals(s: ClientSession, area: str, rate: str, tariff: str, dt
         _LOGGER.error(f"Tariff intervals error: {strepr(e)}")
     return None
 
-@cache
-def _get_tariff(tariff: tuple[tuple[time, time]] | tuple[tuple[tuple[time, time]]], dt: datetime, weekday: int, t: time):
+async def _get_intervals(hub: ProviderHub, area: str, rate: str, tariff: str, dt: date):
+    async def fetch():
+        with hub.timings.measure("hdo") as stage:
+            intervals = await _fetch_intervals(hub.session, area, rate, tariff, dt)
+            stage.items += intervals is not None
+            stage.errors += intervals is None and area != "pre"
+        if intervals is not None:
+            hub.mark("hdo")
+        return intervals, HUB_INTERVALS_TTL if intervals is not None else HUB_RETRY
+    return await hub.fetch(("intervals", area, rate, tariff, dt), fetch)
+
+@cache("cz.tariff")
+def _get_tariff(tariff: tuple[tuple[time, time]] | tuple[tuple[tuple[time, time]]], dt: date, weekday: int, t: time):
     if tariff:
-        for start, end in tariff if tariff[0] and isinstance(tariff[0][0], time) else tariff[weekday if dt not in HOLIDAYS else 6]:
+        for start, end in tariff if tariff[0] and isinstance(tariff[0][0], time) else tariff[weekday if dt not in const.HOLIDAYS else 6]:
             if start <= t < end:
                 return "T2"
     return "T1"
 
-@acache
-async def _get_distribution(s: ClientSession, area: str, rate: str, tariff: str, dt: datetime) -> tuple[int, Decimal]:
-    return ((0 if t == "T1" else -1, RATE[dt.year][""] + RATE[dt.year][area][rate][t]) if (t := _get_tariff(RATE[dt.year][area][rate]["Type"][tariff[-2:]] if "Type" in RATE[dt.year][area][rate] and tariff in TARIFF and RATE[dt.year][area][rate]["Name"] == tariff[:-2] else TARIFF[tariff] if tariff in TARIFF else await _get_intervals(s, area, rate, tariff, dt.date()), dt, dt.weekday(), dt.time())) else (0, RATE[dt.year][""] + RATE[dt.year][area][rate]["T1"])) if area != "disabled" else (0, Decimal(0))
+async def _get_distribution(hub: ProviderHub, area: str, rate: str, tariff: str, dt: datetime) -> tuple[int, int]:
+    if area == "disabled":
+        return (0, 0)
+    if not tariffs.loaded(dt.year):
+        await hub.hass.async_add_executor_job(tariffs.load, (dt.year,))
+    d = tariffs.get(dt.year, area, rate)
+    t = _get_tariff(d.types[tariff[-2:]] if d.types and tariff in tariffs.TARIFF and d.name == tariff[:-2] else tariffs.TARIFF[tariff] if tariff in tariffs.TARIFF else await _get_intervals(hub, area, rate, tariff, dt.date()), dt.date(), dt.weekday(), dt.time())
+    return (0 if t == "T1" else -1, d.fee + d.rates[t])
+
+def _get_distribution_function(hub: ProviderHub, area: str, rate: str, tariff: str):
+    return partial(_get_distribution, hub, _area_normalized(area), rate, tariff)
+
+_VAT = SCALE + VAT
+
+@cache("cz.fees")
+def _get_fees(fee: tuple[float | Decimal] | float | Decimal) -> tuple[int, int]:
+    return to_money(fruple(fee)), to_money(fruple(fee, -1))
+
+# Everything but the spot price is known ahead, additive part (distribution + fee) and price column per slot of a local day,
+# keyed by the UTC start of the slot so both repeated hours of the fall-back day (100 slots) have their own entry
+#
+async def _get_layer(hub: ProviderHub, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, day: date) -> dict[datetime, tuple[int, int]]:
+    async def build():
+        distribution = _get_distribution_function(hub, area, rate, tariff)
+        start = datetime.combine(day, time(0), tzinfo = TIMEZONE).astimezone(UTC)
+        cost = _get_fees(fee)[0]
+        layer: dict[datetime, tuple[int, int]] = {}
+        for i in range(100):
+            if (dt := (slot := start + TIME_QOUR * i).astimezone(TIMEZONE)).date() != day:
+                break
+            t = await distribution(dt)
+            layer[slot] = (t[0], t[1] + cost)
+        return layer, HUB_LAYER_TTL
+    return await hub.fetch(("layer", area, rate, tariff, fee, day), build)
 
-@cache
-def _get_distribution_function(s: ClientSession, area: str, rate: str, tariff: str):
-    return partial(_get_distribution, s, _area_normalized(area), rate, tariff)
+async def _get_final_pricing(hub: ProviderHub, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, dt: datetime, price: int | tuple[int, int]) -> tuple[int, int, int]:
+    i, add = (await _get_layer(hub, area, rate, tariff, fee, dt.date()))[dt.astimezone(UTC)]
+    p = fruple(price, i)
+    return mul(add + p, _VAT), p - _get_fees(fee)[1], mul(p, _VAT)
 
-@acache
-async def _get_final_pricing(s: ClientSession, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, dt: datetime, price: Decimal | tuple[Decimal, Decimal]):
-    return ((t[1] + fruple(price, t[0]) + Decimal(fruple(fee))) * (1 + VAT), fruple(price, t[0]) - Decimal(fruple(fee, -1)), fruple(price, t[0]) * (1 + VAT)) if (t := await _get_distribution_function(s, area, rate, tariff)(dt)) else ((fruple(price) + Decimal(fruple(fee))) * (1 + VAT), fruple(price) - Decimal(fruple(fee, -1)), fruple(price) * (1 + VAT))
+async def prepare(hub: ProviderHub, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, days: tuple[date, ...]):
+    for day in days:
+        await _get_layer(hub, area, rate, tariff, fee, day)
 
-@cache
-def _get_final_pricing_function(s: ClientSession, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal):
-    return partial(_get_final_pricing, s, area, rate, tariff, fee)
+def get_function(f: Callable[[ProviderHub, Callable[[datetime, int | tuple[int, int]], Coroutine[None, None, tuple[int, int, int]]], str, str, datetime, Any], AsyncGenerator[tuple[datetime, int, int, int], None]], hub: ProviderHub, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, pmod: str, currency: str):
+    return partial(f, hub, partial(_get_final_pricing, hub, area, rate, tariff, fee), pmod, currency), lambda dt: dt.astimezone(TIMEZONE).hour > 12
 
-@cache
-def get_function(f: Callable[[ClientSession, Callable[[datetime, Decimal | tuple[Decimal, Decimal]], Coroutine[None, None, tuple[Decimal, Decimal, Decimal]]], str, str, datetime, Any], AsyncGenerator[tuple[datetime, Decimal, Decimal], None]], s: ClientSession, area: str, rate: str, tariff: str, fee: tuple[float | Decimal] | float | Decimal, pmod: str, currency: str):
-    return partial(f, s, _get_final_pricing_function(s, area, rate, tariff, fee), pmod, currency), lambda dt: dt.astimezone(TIMEZONE).hour > 12
+def preload(years: tuple[int, ...] = ()):
+    for name in const._LAZY:
+        getattr(const, name)
+    tariffs.load(years)
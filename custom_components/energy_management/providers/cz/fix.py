@@ -1,6 +1,6 @@
-from decimal import Decimal
-from aiohttp import ClientSession
-from typing import Callable, Coroutine
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable, Coroutine
 from collections.abc import AsyncGenerator
 from datetime import datetime, date, time, timedelta
 
@@ -10,7 +10,10 @@ from ...const import TIME_DAY
 
 from .const import TIMEZONE
 
-async def post(_: ClientSession, prep: Callable[[datetime, Decimal | tuple[Decimal, Decimal]], Coroutine[None, None, tuple[Decimal, Decimal, Decimal]]], _pmod: str, _currency: str, **kwargs: datetime | Decimal) -> AsyncGenerator[tuple[datetime, Decimal, Decimal], None]:
+if TYPE_CHECKING:
+    from ...hub import ProviderHub
+
+async def post(_: ProviderHub, prep: Callable[[datetime, int | tuple[int, int]], Coroutine[None, None, tuple[int, int, int]]], _pmod: str, _currency: str, **kwargs: datetime | int) -> AsyncGenerator[tuple[datetime, int, int, int], None]:
     l: date = (kwargs.get("dt", utcnow())).astimezone(TIMEZONE).date()
     t1 = kwargs.get("T1", 0)
     t2 = kwargs.get("T2", t1)
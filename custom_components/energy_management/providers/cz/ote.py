@@ -1,19 +1,24 @@
+from __future__ import annotations
+
 import asyncio
 
-from decimal import Decimal
-from aiohttp import ClientSession
 from xml.etree import ElementTree
-from typing import Callable, Coroutine
+from typing import TYPE_CHECKING, Callable, Coroutine
 from collections.abc import AsyncGenerator
 from datetime import datetime, date, time, timedelta
 
 from homeassistant.util.dt import UTC, utcnow
 
-from ...const import TIME_DAY
-from ...common import ec, pg, ClientError
+from ...const import TIME_DAY, HUB_RETRY, HUB_RATE_TTL, OFFLOAD
+from ...common import pg, ClientError
+from ...money import muldiv, parse
+from ...timings import offload
 
 from .const import TIMEZONE
 
+if TYPE_CHECKING:
+    from ...hub import ProviderHub
+
 _URL_CNB = "https://api.cnb.cz/cnbapi/exrates/daily"
 _URL_OTE = "https://www.ote-cr.cz/services/PublicDataService"
 _QUERY_SOAP = "http://schemas.xmlsoap.org/soap/envelope/"
@@ -31,24 +36,53 @@ _QUERY_TEMPLATE = f"""
 </soapenv:Envelope>
 """.strip()
 
-async def post(s: ClientSession, prep: Callable[[datetime, Decimal | tuple[Decimal, Decimal]], Coroutine[None, None, tuple[Decimal, Decimal, Decimal]]], pmod: str, currency: str, **kwargs: datetime | Decimal) -> AsyncGenerator[tuple[datetime, Decimal, Decimal], None]:
-    try:
-        l = (kwargs.get("dt", utcnow())).astimezone(TIMEZONE).date()
-        ote_resp, cnb_resp = await asyncio.gather(pg(s, _URL_OTE, _QUERY_TEMPLATE.format(start = (l - TIME_DAY).isoformat(), end = (l + TIME_DAY).isoformat())), pg(s, _URL_CNB) if currency in ("CZK", "Kč") else ec())
-        root = ElementTree.fromstring(ote_resp)
-    except ClientError as e:
-        raise e
-    except Exception as e:
-        if "Application is not available" in ote_resp:
-            raise Exception("OTE Application is currently not available!") from e
-        raise Exception(f"Failed to parse response: {e!r}") from e
-
-    if (fault := root.find(f".//{{{_QUERY_SOAP}}}Fault")) is not None:
-        raise Exception(f"Fault: {faultstring.text if (faultstring := fault.find("faultstring")) is not None else ote_resp}")
-
-    crate = Decimal([x for x in cnb_resp["rates"] if x["currencyCode"] == "EUR"][0]["rate"] if cnb_resp else 0)
-
-    for item in root.findall(f".//{{{_QUERY_SCHEMA}}}Item"):
-        indh, indm = (x // 4, (x % 4) * 15) if (x := (int(h.text) - 1) if (h := item.find(f"{{{_QUERY_SCHEMA}}}PeriodIndex")) is not None and h.text else None) is not None else (None, None)
-        idth = datetime.combine(date.fromisoformat(d.text) if (d := item.find(f"{{{_QUERY_SCHEMA}}}Date")) is not None and d.text else None, time(0), tzinfo = TIMEZONE).astimezone(UTC) + timedelta(hours = indh, minutes = indm)
-        yield idth, *await prep(idth.astimezone(TIMEZONE), ((Decimal(p.text) * crate) / Decimal(1000)) if (p := item.find(f"{{{_QUERY_SCHEMA}}}{pmod}Price")) is not None and p.text else None)
+async def _get_ote(hub: ProviderHub, l: date) -> ElementTree.Element:
+    async def fetch():
+        try:
+            with hub.timings.measure("ote") as stage:
+                ote_resp = await pg(hub.session, _URL_OTE, _QUERY_TEMPLATE.format(start = (l - TIME_DAY).isoformat(), end = (l + TIME_DAY).isoformat()))
+                stage.items += 1
+            with hub.timings.measure("xml") as stage:
+                root = await offload(hub.hass, hub.timings, "loop_xml", len(ote_resp), OFFLOAD["xml"], ElementTree.fromstring, ote_resp)
+                stage.items += len(ote_resp)
+        except ClientError as e:
+            raise e
+        except Exception as e:
+            if "Application is not available" in ote_resp:
+                raise Exception("OTE Application is currently not available!") from e
+            raise Exception(f"Failed to parse response: {e!r}") from e
+
+        if (fault := root.find(f".//{{{_QUERY_SOAP}}}Fault")) is not None:
+            raise Exception(f"Fault: {faultstring.text if (faultstring := fault.find("faultstring")) is not None else ote_resp}")
+
+        hub.mark("ote")
+
+        # Complete once tomorrow is published, then valid for the rest of the day
+        #
+        tomorrow = (l + TIME_DAY).isoformat()
+        complete = any(d.text == tomorrow for d in root.iter(f"{{{_QUERY_SCHEMA}}}Date"))
+        return root, (datetime.combine(l + TIME_DAY, time(0), tzinfo = TIMEZONE) - utcnow()).total_seconds() if complete else HUB_RETRY
+    return await hub.fetch(("ote", l), fetch)
+
+async def _get_crate(hub: ProviderHub, currency: str, l: date) -> int:
+    if currency not in ("CZK", "Kč"):
+        return 0
+    async def fetch():
+        with hub.timings.measure("cnb") as stage:
+            cnb_resp = await pg(hub.session, _URL_CNB)
+            stage.items += 1
+        rate = [x for x in cnb_resp["rates"] if x["currencyCode"] == "EUR"][0]
+        hub.mark("cnb", datetime.combine(date.fromisoformat(v), time(0), tzinfo = TIMEZONE) if (v := rate.get("validFor")) else None)
+        return parse(str(rate["rate"])), HUB_RATE_TTL
+    return await hub.fetch(("cnb", l), fetch)
+
+async def post(hub: ProviderHub, prep: Callable[[datetime, int | tuple[int, int]], Coroutine[None, None, tuple[int, int, int]]], pmod: str, currency: str, **kwargs: datetime | int) -> AsyncGenerator[tuple[datetime, int, int, int], None]:
+    l = (kwargs.get("dt", utcnow())).astimezone(TIMEZONE).date()
+    root, crate = await asyncio.gather(_get_ote(hub, l), _get_crate(hub, currency, l))
+
+    with hub.timings.measure("pricing") as stage:
+        for item in root.findall(f".//{{{_QUERY_SCHEMA}}}Item"):
+            stage.items += 1
+            indh, indm = (x // 4, (x % 4) * 15) if (x := (int(h.text) - 1) if (h := item.find(f"{{{_QUERY_SCHEMA}}}PeriodIndex")) is not None and h.text else None) is not None else (None, None)
+            idth = datetime.combine(date.fromisoformat(d.text) if (d := item.find(f"{{{_QUERY_SCHEMA}}}Date")) is not None and d.text else None, time(0), tzinfo = TIMEZONE).astimezone(UTC) + timedelta(hours = indh, minutes = indm)
+            yield idth, *await prep(idth.astimezone(TIMEZONE), muldiv(parse(p.text), crate, 1000) if (p := item.find(f"{{{_QUERY_SCHEMA}}}{pmod}Price")) is not None and p.text else None)
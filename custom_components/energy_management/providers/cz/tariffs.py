@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+
+from pathlib import Path
+from decimal import InvalidOperation
+from logging import getLogger
+from datetime import time
+from typing import Any, NamedTuple
+
+from ...money import parse
+
+_LOGGER = getLogger(__name__)
+
+DATA = Path(__file__).parent / "data"
+DATA_VERSION = 1
+
+Intervals = tuple[tuple[time, time], ...] | tuple[tuple[tuple[time, time], ...], ...]
+
+class Distribution(NamedTuple):
+    fee: int
+    rates: dict[str, int]
+    name: str | None
+    types: dict[str, Intervals]
+
+# Compiled lookups, (year, area, rate) → distribution and tariff code → intervals
+#
+RATE: dict[tuple[int, str, str], Distribution] = {}
+TARIFF: dict[str, Intervals] = {}
+
+_loaded: set[int | str] = set()
+
+def _time(value: str) -> time:
+    return time.max if value == "24:00" else time.fromisoformat(value)
+
+def _intervals(value: Any, where: str) -> Intervals:
+    if isinstance(value, dict):
+        if len(week := value.get("week", ())) != 7:
+            raise ValueError(f"{where}: week must have 7 days")
+        return tuple(_intervals(day, where) for day in week)
+    intervals = tuple((_time(start), _time(end)) for start, end in value)
+    if any(start >= end for start, end in intervals):
+        raise ValueError(f"{where}: interval start must precede its end")
+    return intervals
+
+def _money(value: Any, where: str) -> int:
+    try:
+        return parse(value)
+    except (InvalidOperation, AttributeError) as e:
+        raise ValueError(f"{where}: invalid number {value!r}") from e
+
+def _read(name: str) -> dict[str, Any] | None:
+    try:
+        data = json.loads((DATA / f"{name}.json").read_text(encoding = "utf-8"))
+    except FileNotFoundError:
+        return None
+    if data.get("version") != DATA_VERSION:
+        raise ValueError(f"{name}.json: unsupported version {data.get('version')}")
+    return data
+
+def _compile_year(year: int, data: dict[str, Any]) -> dict[tuple[int, str, str], Distribution]:
+    if data.get("year") != year:
+        raise ValueError(f"{year}.json: year mismatch {data.get('year')}")
+    fee = sum(_money(f, f"{year}.json fees") for f in data["fees"])
+    rates = {}
+    for area, items in data["areas"].items():
+        for rate, d in items.items():
+            where = f"{year}.json {area}/{rate}"
+            if "T1" not in d or "Type" in d and ("T2" not in d or "Name" not in d):
+                raise ValueError(f"{where}: T1 is required, Type requires T2 and Name")
+            rates[(year, area, rate)] = Distribution(fee, {t: _money(d[t], where) for t in ("T1", "T2") if t in d}, d.get("Name"), {k: _intervals(v, where) for k, v in d.get("Type", {}).items()})
+    return rates
+
+def load(years: tuple[int, ...] = ()) -> None:
+    """Load and compile tariff codes and the given years, files are read once (executor)."""
+    if "tariffs" not in _loaded:
+        if data := _read("tariffs"):
+            TARIFF.update({k: _intervals(v, f"tariffs.json {k}") for k, v in data["tariffs"].items()})
+        _loaded.add("tariffs")
+    for year in years:
+        if year in _loaded:
+            continue
+        try:
+            if data := _read(str(year)):
+                RATE.update(_compile_year(year, data))
+            else:
+                _LOGGER.error(f"Distribution rates for {year} are not available, the nearest year's are used instead")
+        except (ValueError, KeyError, TypeError) as e:
+            _LOGGER.error(f"Distribution rates for {year} are invalid, the nearest year's are used instead: {e!r}")
+        _loaded.add(year)
+
+def loaded(year: int) -> bool:
+    return year in _loaded
+
+def get(year: int, area: str, rate: str) -> Distribution:
+    """Distribution of the year, or of the nearest (earlier first) year having the rate if the year has no data, never reads files."""
+    if (d := RATE.get((year, area, rate))) is not None:
+        return d
+    if not (years := [y for y, a, r in RATE if a == area and r == rate]):
+        raise ValueError(f"Distribution rate {area}/{rate} is not available")
+    return RATE[(min(years, key = lambda y: (abs(y - year), y)), area, rate)]
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import os
+import zlib
+import struct
+import threading
+
+from pathlib import Path
+from logging import getLogger
+from zoneinfo import ZoneInfo
+from datetime import date, datetime
+from collections.abc import Iterable
+
+from homeassistant.util.dt import UTC
+
+_LOGGER = getLogger(__name__)
+
+# One file per key and day, <crc32 of key>-<day>.bin in the cache directory, layout (little-endian):
+#   header: magic, version, payload crc32
+#   payload: key length, key (utf-8), record count, records
+#   record: UTC timestamp, rates full, compensation rate, spot rate (money fixed point)
+#
+_MAGIC = b"EMRC"
+_VERSION = 3
+_HEADER = struct.Struct("<4sHI")
+_COUNT = struct.Struct("<I")
+_KEY = struct.Struct("<H")
+_RECORD = struct.Struct("<qqqq")
+
+_LOCK = threading.Lock()
+
+Rate = tuple[datetime, int, int, int]
+
+def _records(payload: memoryview, offset: int, count: int) -> list[Rate]:
+    if len(payload) < offset + count * _RECORD.size:
+        raise ValueError("truncated records")
+    return [(datetime.fromtimestamp(t, UTC), i, o, v) for t, i, o, v in _RECORD.iter_unpack(payload[offset:offset + count * _RECORD.size])]
+
+def _payload(path: Path) -> memoryview | None:
+    """Checksummed payload of a cache file, None if it is missing, truncated, corrupted or of another version."""
+    try:
+        data = path.read_bytes()
+        magic, v, crc = _HEADER.unpack_from(data)
+    except FileNotFoundError:
+        return None
+    except struct.error:
+        _LOGGER.warning(f"Rate cache {path} is truncated")
+        return None
+    if magic != _MAGIC or v != _VERSION:
+        _LOGGER.debug(f"Rate cache {path} has unsupported format {magic!r} v{v}")
+        return None
+    if zlib.crc32(payload := memoryview(data)[_HEADER.size:]) != crc:
+        _LOGGER.warning(f"Rate cache {path} is corrupted")
+        return None
+    return payload
+
+def _write(path: Path, payload: bytes) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, zlib.crc32(payload)) + payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class RateCache:
+    """Versioned, checksummed cache of final rates in per-day segment files keyed by provider parameters."""
+
+    def __init__(self, path: Path, retention: int):
+        self.path = path
+        self.retention = retention
+
+    def _file(self, key: str, day: date) -> Path:
+        return self.path / f"{zlib.crc32(key.encode()):08x}-{day.isoformat()}.bin"
+
+    def _load(self, key: str, day: date) -> list[Rate]:
+        if (payload := _payload(self._file(key, day))) is None:
+            return []
+        try:
+            (length,), offset = _KEY.unpack_from(payload), _KEY.size
+            k, offset = bytes(payload[offset:offset + length]).decode(), offset + length
+            (count,), offset = _COUNT.unpack_from(payload, offset), offset + _COUNT.size
+            return _records(payload, offset, count) if k == key else []
+        except (struct.error, ValueError) as e:
+            _LOGGER.warning(f"Rate cache {self._file(key, day)} is malformed: {e}")
+            return []
+
+    def _dump(self, key: str, day: date, rates: list[Rate]) -> None:
+        k = key.encode()
+        _write(self._file(key, day), _KEY.pack(len(k)) + k + _COUNT.pack(len(rates)) + b"".join(_RECORD.pack(int(t.timestamp()), i, o, v) for t, i, o, v in rates))
+
+    def _prune(self, today: date) -> None:
+        oldest = date.fromordinal(today.toordinal() - self.retention).isoformat()
+        for f in self.path.glob("*-*.bin"):
+            if f.stem.partition("-")[2] < oldest:
+                f.unlink(missing_ok = True)
+
+    def remove_legacy(self) -> None:
+        """Remove the text file the cache replaced, it is not keyed by the provider parameters (executor)."""
+        self.path.with_name("ote").unlink(missing_ok = True)
+
+    def store(self, key: str, rates: Iterable[Rate], tz: ZoneInfo, today: date) -> None:
+        """Rewrite the day files of the given rates only, drop the ones past retention."""
+        days: dict[date, list[Rate]] = {}
+        for rate in rates:
+            days.setdefault(rate[0].astimezone(tz).date(), []).append(rate)
+        with _LOCK:
+            self.path.mkdir(parents = True, exist_ok = True)
+            for day, day_rates in days.items():
+                self._dump(key, day, day_rates)
+            self._prune(today)
+
+    def read(self, key: str, start: date, end: date) -> list[Rate]:
+        with _LOCK:
+            return [rate for day in range(start.toordinal(), end.toordinal() + 1) for rate in self._load(key, date.fromordinal(day))]
+
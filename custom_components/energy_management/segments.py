@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from types import MappingProxyType
+from datetime import date, datetime, timedelta
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+
+Segment = Mapping[datetime, tuple[int, int, int]]
+
+_DAY = timedelta(days = 1)
+_EMPTY: Segment = MappingProxyType({})
+
+class DayRing:
+    """Date ordered window of per-day rate segments from today - lookback to today + lookahead.
+
+    Segments are shared with every CoordinatorData built from the ring and never modified once put,
+    rotation only drops expired days from the front.
+    """
+
+    def __init__(self, lookback: int, lookahead: int):
+        self.lookback = lookback
+        self.lookahead = lookahead
+        self.today: date | None = None
+        self.version = 0
+        self._segments: OrderedDict[date, Segment] = OrderedDict()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.today}, -{self.lookback}/+{self.lookahead}, {list(self._segments)})"
+
+    def __contains__(self, day: date) -> bool:
+        return bool(self._segments.get(day))
+
+    def __iter__(self) -> Iterator[date]:
+        return iter(self._segments)
+
+    @property
+    def start(self) -> date:
+        return self.today - self.lookback * _DAY
+
+    @property
+    def end(self) -> date:
+        return self.today + self.lookahead * _DAY
+
+    def get(self, day: date) -> Segment:
+        return self._segments.get(day, _EMPTY)
+
+    def put(self, day: date, segment: Segment) -> None:
+        if self.today is not None and not self.start <= day <= self.end:
+            return
+        if self._segments.get(day) is segment:
+            return
+        last = next(reversed(self._segments), None)
+        self._segments[day] = segment
+        if last is not None and last > day:
+            self._segments = OrderedDict(sorted(self._segments.items()))
+        self.version += 1
+
+    def rotate(self, today: date) -> bool:
+        """Move the window to today, returns whether it moved."""
+        if today == self.today:
+            return False
+        self.today = today
+        while self._segments and next(iter(self._segments)) < self.start:
+            self._segments.popitem(last = False)
+        while self._segments and next(reversed(self._segments)) > self.end:
+            self._segments.popitem()
+        self.version += 1
+        return True
+
+    def clear(self) -> None:
+        self._segments.clear()
+        self.version += 1
+
+    def missing(self, end: date) -> list[date]:
+        return [d for n in range((end - self.start).days + 1) if (d := self.start + n * _DAY) not in self]
+
+    def days(self) -> dict[date, Segment]:
+        """The current window, a new mapping of the shared segments."""
+        return dict(self._segments)
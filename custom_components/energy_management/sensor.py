@@ -6,10 +6,12 @@ from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.components.sensor import SensorEntity, RestoreSensor
-from homeassistant.const import ATTR_IDENTIFIERS, ATTR_NAME, ATTR_VIA_DEVICE
+from homeassistant.const import ATTR_IDENTIFIERS, ATTR_NAME, ATTR_VIA_DEVICE, MATCH_ALL, EntityCategory, UnitOfInformation, UnitOfTime
 
-from .const import DOMAIN
+from .const import DOMAIN, FRESHNESS
 from .common import slugify, strepr
+from .money import to_float
+from .timings import STAGES
 from .coordinator import Coordinator
 from .entity import EnergyManagementEntity
 
@@ -32,7 +34,10 @@ async def async_setup_entry(_: HomeAssistant, config_entry: ConfigEntry[Coordina
         CostRateToday(config_entry.runtime_data),
         CostRateOrder(config_entry.runtime_data),
         CostRateNegatives(config_entry.runtime_data),
-        SpotRate(config_entry.runtime_data)
+        SpotRate(config_entry.runtime_data),
+        Memory(config_entry.runtime_data),
+        *(Freshness(config_entry.runtime_data, name) for name in FRESHNESS),
+        *(Timing(config_entry.runtime_data, stage) for stage in STAGES)
     ])
 
 class EnergyManagementSensorEntity(EnergyManagementEntity, SensorEntity):
@@ -45,6 +50,8 @@ class EnergyManagementRestoreSensor(EnergyManagementEntity, RestoreSensor):
             self._attr_native_value = last_sensor_data.native_value
 
 class Battery(EnergyManagementSensorEntity):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Battery"
         self._attr_device_class = "battery"
@@ -55,11 +62,12 @@ class Battery(EnergyManagementSensorEntity):
         super().update()
         if not (o := self.coordinator.data.optimization):
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[0] for k, v, c in zip(o.keys(), o.values(), [[None]] + list(o.values())) if v[0] != c[0]}
-        self._attr_native_value = o[self.coordinator.data.now][0]
+        self._attr_extra_state_attributes = o.series("soc", changes = True)
+        self._attr_native_value = o[self.coordinator.data.now].soc
 
 class CompRate(EnergyManagementSensorEntity):
     _attr_icon = "mdi:cash-clock"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Compensation rate"
@@ -71,8 +79,8 @@ class CompRate(EnergyManagementSensorEntity):
         super().update()
         if not (data := self.coordinator.data):
             return
-        self._attr_extra_state_attributes = {k.astimezone(self.coordinator.data.zone_info).isoformat(): float(v) for k, v in data.compensation_rate.items()}
-        self._attr_native_value = data.compensation_rate[data.now]
+        self._attr_extra_state_attributes = data.series("compensation_rate")
+        self._attr_native_value = to_float(data.compensation_rate[data.now])
 
 class Cost(EnergyManagementRestoreSensor):
     _attr_icon = "mdi:cash"
@@ -119,6 +127,7 @@ class CostTodayExpected(EnergyManagementSensorEntity):
 
 class CostRate(EnergyManagementSensorEntity):
     _attr_icon = "mdi:cash-clock"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Cost rate"
@@ -130,8 +139,8 @@ class CostRate(EnergyManagementSensorEntity):
         super().update()
         if not (data := self.coordinator.data):
             return
-        self._attr_extra_state_attributes = {k.astimezone(self.coordinator.data.zone_info).isoformat(): float(v) for k, v in data.rates_full.items()}
-        self._attr_native_value = data.rates_full[data.now]
+        self._attr_extra_state_attributes = data.series("rates_full")
+        self._attr_native_value = to_float(data.rates_full[data.now])
 
 class CostRateToday(EnergyManagementSensorEntity):
     _attr_icon = "mdi:cash-clock"
@@ -155,9 +164,11 @@ class CostRateOrder(EnergyManagementSensorEntity):
 
     def update(self):
         super().update()
-        if (data := self.coordinator.data) is None:
+        # The minute tick at midnight moves now into the new day, its rates come with the deferred fetch
+        #
+        if (data := self.coordinator.data) is None or (rate := data.rates.get(data.now)) is None:
             return
-        self._attr_native_value = sorted(set(data.rates.values())).index(data.rates[data.now]) + 1
+        self._attr_native_value = sorted(set(data.rates.values())).index(rate) + 1
 
 class CostRateNegatives(EnergyManagementSensorEntity):
     _attr_icon = "mdi:order-numeric-descending"
@@ -179,6 +190,7 @@ class CostRateNegatives(EnergyManagementSensorEntity):
 
 class SpotRate(EnergyManagementSensorEntity):
     _attr_icon = "mdi:cash-clock"
+    _unrecorded_attributes = frozenset({MATCH_ALL})
 
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Spot rate"
@@ -190,10 +202,12 @@ class SpotRate(EnergyManagementSensorEntity):
         super().update()
         if not (data := self.coordinator.data):
             return
-        self._attr_extra_state_attributes = {k.astimezone(self.coordinator.data.zone_info).isoformat(): float(v) for k, v in data.spot_rate.items()}
-        self._attr_native_value = data.spot_rate[data.now]
+        self._attr_extra_state_attributes = data.series("spot_rate")
+        self._attr_native_value = to_float(data.spot_rate[data.now])
 
 class Consumption(EnergyManagementSensorEntity):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Consumption"
         self._attr_device_class = "energy"
@@ -234,6 +248,8 @@ class ConsumptionNow(EnergyManagementSensorEntity):
             _LOGGER.debug(f"Consumption - now sensor error: {strepr(e)}")
 
 class Forecast(EnergyManagementSensorEntity):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Forecast"
         self._attr_device_class = "energy"
@@ -245,11 +261,13 @@ class Forecast(EnergyManagementSensorEntity):
         super().update()
         if not (d := self.coordinator.data):
             return
-        self._attr_extra_state_attributes = {k.astimezone(self.coordinator.data.zone_info).isoformat(): v for k, v in d.forecast.items()}
+        self._attr_extra_state_attributes = d.series("forecast")
         today = self.coordinator.data.now.astimezone(self.coordinator.data.zone_info).date()
         self._attr_native_value = sum(v for k, v in d.forecast.items() if k.astimezone(self.coordinator.data.zone_info).date() == today) / 1000
 
 class Grid(EnergyManagementSensorEntity):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Grid"
         self._attr_device_class = "energy"
@@ -261,8 +279,8 @@ class Grid(EnergyManagementSensorEntity):
         super().update()
         if not (o := self.coordinator.data.optimization):
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[1] for k, v in o.items()}
-        self._attr_native_value = o[self.coordinator.data.now][1] * 4
+        self._attr_extra_state_attributes = o.series("grid")
+        self._attr_native_value = o[self.coordinator.data.now].grid * 4
 
 class PredictedCost(EnergyManagementSensorEntity):
     _attr_icon = "mdi:cash"
@@ -307,6 +325,8 @@ class PredictedAmortization(EnergyManagementSensorEntity):
         self._attr_native_value = self.coordinator.predicted_amortization
 
 class PredictedBattery(EnergyManagementSensorEntity):
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
     def __init__(self, coordinator: Coordinator) -> None:
         self._attr_name = "Battery"
         self._attr_device_class = "battery"
@@ -324,5 +344,79 @@ class PredictedBattery(EnergyManagementSensorEntity):
         super().update()
         if not (o := self.coordinator.data.optimization):
             return
-        self._attr_extra_state_attributes = {k.isoformat(): v[1] for k, v, c in zip(o.keys(), o.values(), [[None], [None]] + list(o.values())) if v[1] != c[1]}
-        self._attr_native_value = o[self.coordinator.data.now][1]
+        self._attr_extra_state_attributes = o.series("grid", changes = True)
+        self._attr_native_value = o[self.coordinator.data.now].grid
+
+class Timing(EnergyManagementSensorEntity):
+    _attr_icon = "mdi:timer-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({"histogram"})
+
+    def __init__(self, coordinator: Coordinator, stage: str) -> None:
+        self._stage = stage
+        self._attr_name = f"Timing - {STAGES[stage]}"
+        self._attr_device_class = "duration"
+        self._attr_state_class = "measurement"
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_suggested_display_precision = 1
+        super().__init__(coordinator)
+
+    def update(self):
+        super().update()
+        if (stage := self.coordinator.stages().get(self._stage)) is None:
+            return
+        self._attr_extra_state_attributes = stage.as_dict()
+        self._attr_native_value = stage.last * 1000
+
+class Memory(EnergyManagementSensorEntity):
+    _attr_icon = "mdi:memory"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({MATCH_ALL})
+
+    def __init__(self, coordinator: Coordinator) -> None:
+        self._attr_name = "Memory"
+        self._attr_device_class = "data_size"
+        self._attr_state_class = "measurement"
+        self._attr_native_unit_of_measurement = UnitOfInformation.KIBIBYTES
+        self._attr_suggested_display_precision = 0
+        super().__init__(coordinator)
+
+    def update(self):
+        super().update()
+        if not (usage := self.coordinator.usage()):
+            return
+        self._attr_extra_state_attributes = {k: v._asdict() for k, v in usage.items()}
+        self._attr_native_value = sum(v.size for v in usage.values()) / 1024
+
+_FRESHNESS_NAMES = {
+    "rates": "Price window",
+    "ote": "OTE prices",
+    "cnb": "Exchange rate",
+    "hdo": "HDO schedule",
+    "forecast": "Solar forecast",
+    "profile": "Consumption profile",
+    "battery": "Battery sample",
+    "solve": "Optimization"
+}
+
+class Freshness(EnergyManagementSensorEntity):
+    _attr_icon = "mdi:clock-check-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: Coordinator, name: str) -> None:
+        self._input = name
+        self._attr_name = f"Freshness - {_FRESHNESS_NAMES[name]}"
+        self._attr_device_class = "timestamp"
+        super().__init__(coordinator)
+
+    def update(self):
+        super().update()
+        if (data := self.coordinator.data) is None or (fresh := self.coordinator.freshness().get(self._input)) is None:
+            return
+        # The age follows from the timestamp state, only crossing the threshold changes the attributes
+        #
+        self._attr_native_value = fresh
+        self._attr_extra_state_attributes["threshold"] = (threshold := self.coordinator.config_freshness[self._input].total_seconds())
+        self._attr_extra_state_attributes["stale"] = (data.now - fresh).total_seconds() > threshold
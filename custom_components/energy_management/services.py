@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import io
+import asyncio
+import voluptuous as vol
+
+from pathlib import Path
+from typing import Any
+from logging import DEBUG, NOTSET, getLogger
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse, callback
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.helpers import config_validation
+from homeassistant.util.dt import utcnow
+
+from . import trace
+from .const import DOMAIN, PROFILE_REFRESHES_MAX, PROFILE_TOP, TRACE
+from .coordinator import Coordinator
+from .websocket_api import async_get_entry
+
+_LOGGER = getLogger(__name__)
+
+SERVICE_PROFILE = "profile"
+
+PROFILE_SCHEMA = vol.Schema({
+    vol.Optional("entry_id"): config_validation.string,
+    vol.Optional("refreshes", default = 1): vol.All(vol.Coerce(int), vol.Range(min = 1, max = PROFILE_REFRESHES_MAX)),
+    vol.Optional("full", default = False): config_validation.boolean,
+    vol.Optional("tracemalloc", default = False): config_validation.boolean
+})
+
+SERVICE_TRACE = "trace"
+
+TRACE_SCHEMA = vol.Schema({
+    vol.Required("stages"): vol.All(config_validation.ensure_list, [vol.In(TRACE)]),
+    vol.Optional("enabled"): config_validation.boolean,
+    vol.Optional("sample"): vol.All(vol.Coerce(int), vol.Range(min = 1)),
+    vol.Optional("payload"): vol.All(vol.Coerce(int), vol.Range(min = 16))
+})
+
+_PROFILE_LOCK = asyncio.Lock()
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    hass.services.async_register(DOMAIN, SERVICE_PROFILE, _async_profile, schema = PROFILE_SCHEMA, supports_response = SupportsResponse.OPTIONAL)
+    hass.services.async_register(DOMAIN, SERVICE_TRACE, _async_trace, schema = TRACE_SCHEMA)
+
+async def _async_trace(call: ServiceCall) -> None:
+    """Enable trace stages and set their sampling and field size cap at runtime."""
+    for stage in call.data["stages"]:
+        trace.configure(stage, call.data.get("sample"), call.data.get("payload"))
+        if (enabled := call.data.get("enabled")) is not None:
+            trace.get(stage).logger.setLevel(DEBUG if enabled else NOTSET)
+        _LOGGER.info(f"Trace {stage}: {trace.get(stage).logger.getEffectiveLevel() == DEBUG and 'enabled' or 'disabled'}, sample {trace.get(stage).sample}, payload {trace.get(stage).payload}")
+
+def _write_report(path: Path, profile: Any, report: str) -> None:
+    path.parent.mkdir(parents = True, exist_ok = True)
+    profile.dump_stats(path.with_suffix(".prof"))
+    path.write_text(report, encoding = "utf-8")
+
+async def _async_profile(call: ServiceCall) -> ServiceResponse:
+    """Run refreshes of an entry and the following entity updates under cProfile, optionally diffing tracemalloc snapshots."""
+    import pstats
+    import cProfile
+    import tracemalloc
+
+    hass = call.hass
+    if (entry := async_get_entry(hass, call.data.get("entry_id"))) is None:
+        raise ServiceValidationError("Config entry not found")
+    if _PROFILE_LOCK.locked():
+        raise HomeAssistantError("Profiling is already running")
+
+    coordinator: Coordinator = entry.runtime_data
+    refreshes = call.data["refreshes"]
+    tracing = call.data["tracemalloc"] and not tracemalloc.is_tracing()
+
+    async with _PROFILE_LOCK:
+        if tracing:
+            tracemalloc.start(8)
+        before = tracemalloc.take_snapshot() if call.data["tracemalloc"] else None
+        profile = cProfile.Profile()
+        try:
+            # Everything running on the event loop meanwhile is included, executor jobs are not
+            #
+            for _ in range(refreshes):
+                if call.data["full"]:
+                    coordinator.invalidate_profile()
+                profile.enable()
+                try:
+                    await coordinator.async_revalidate()
+                finally:
+                    profile.disable()
+            after = tracemalloc.take_snapshot() if before else None
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+    report = io.StringIO()
+    report.write(f"Energy Management profile of {entry.title} ({entry.entry_id}), {refreshes} refresh(es){', full' if call.data['full'] else ''}, {utcnow().isoformat()}\n\n")
+    pstats.Stats(profile, stream = report).strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_TOP)
+    pstats.Stats(profile, stream = report).strip_dirs().sort_stats(pstats.SortKey.TIME).print_stats(PROFILE_TOP)
+    if after:
+        report.write(f"\nAllocations (tracemalloc, top {PROFILE_TOP} by size difference)\n\n")
+        for stat in after.compare_to(before, "lineno")[:PROFILE_TOP]:
+            report.write(f"{stat}\n")
+
+    path = Path(hass.config.path(DOMAIN, "profiles", f"{entry.entry_id}-{utcnow().strftime('%Y%m%dT%H%M%S')}.txt"))
+    await hass.async_add_executor_job(_write_report, path, profile, report.getvalue())
+    _LOGGER.info(f"Profile of {entry.title} written to {path}")
+
+    return {"report": str(path), "stats": str(path.with_suffix(".prof"))}
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from time import perf_counter
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+_R = TypeVar("_R")
+
+# Stages of the refresh pipeline, provider ones are recorded by the shared hub
+#
+STAGES = {
+    "refresh": "Refresh",
+    "ote": "OTE fetch",
+    "cnb": "CNB fetch",
+    "hdo": "HDO fetch",
+    "xml": "XML parse",
+    "pricing": "Pricing",
+    "solar": "Solar forecast",
+    "consumption": "Consumption query",
+    "cost": "Cost statistics",
+    "battery": "Battery state",
+    "optimizer": "Optimizer",
+    "fanout": "Entity fan-out",
+    "loop_xml": "Loop block - XML parse",
+    "loop_query": "Loop block - profile rows",
+    "loop_forecast": "Loop block - forecast merge",
+    "loop_payload": "Loop block - optimizer payload",
+    "loop_plan": "Loop block - optimizer plan",
+    "loop_series": "Loop block - attribute series"
+}
+
+# Latency histogram bucket upper bounds [s]
+#
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float("inf"))
+
+class Stage:
+    """Latency histogram, error count and processed items of a pipeline stage."""
+
+    __slots__ = ("count", "errors", "items", "offloaded", "total", "last", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.items = 0
+        self.offloaded = 0
+        self.total = .0
+        self.last = .0
+        self.max = .0
+        self.histogram = [0] * len(BUCKETS)
+
+    def record(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.last = elapsed
+        self.max = max(self.max, elapsed)
+        self.histogram[bisect_left(BUCKETS, elapsed)] += 1
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket the q-th quantile falls into."""
+        n = 0
+        for bound, count in zip(BUCKETS, self.histogram):
+            if (n := n + count) >= q * self.count:
+                return bound if bound != float("inf") else self.max
+        return .0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "items": self.items,
+            "offloaded": self.offloaded,
+            "last": self.last,
+            "mean": self.total / self.count if self.count else .0,
+            "p95": self.percentile(.95),
+            "max": self.max,
+            "throughput": self.items / self.total if self.total else .0,
+            "histogram": {f"le_{bound}": count for bound, count in zip(BUCKETS, self.histogram)}
+        }
+
+class Timings:
+    """Per stage timings, exceptions leaving a measured block count as errors."""
+
+    def __init__(self):
+        self.stages: dict[str, Stage] = {}
+
+    def __getitem__(self, name: str) -> Stage:
+        if (stage := self.stages.get(name)) is None:
+            stage = self.stages[name] = Stage()
+        return stage
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[Stage]:
+        stage = self[name]
+        start = perf_counter()
+        try:
+            yield stage
+        except Exception:
+            stage.errors += 1
+            raise
+        finally:
+            stage.record(perf_counter() - start)
+
+    def as_dict(self) -> dict[str, dict[str, Any]]:
+        return {name: stage.as_dict() for name, stage in self.stages.items()}
+
+async def offload(hass: HomeAssistant, timings: Timings, name: str, size: int, threshold: int, function: Callable[..., _R], *args: Any) -> _R:
+    """Run function in the executor once its input size reaches threshold, inline below it, recording how long the event loop was held."""
+    stage = timings[name]
+    stage.items += size
+    start = perf_counter()
+    if size >= threshold:
+        stage.offloaded += 1
+        future = hass.async_add_executor_job(function, *args)
+        stage.record(perf_counter() - start)
+        try:
+            return await future
+        except Exception:
+            stage.errors += 1
+            raise
+    try:
+        return function(*args)
+    except Exception:
+        stage.errors += 1
+        raise
+    finally:
+        stage.record(perf_counter() - start)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from typing import Any
+from logging import DEBUG, getLogger
+
+from .const import TRACE
+
+# Structured trace of the hot path, one logger per stage (<package>.trace.<stage>) so stages are enabled
+# through the logger integration; fields are formatted only when a record is emitted, every sample-th
+# event is emitted and each field is capped to payload characters
+#
+class _Capped:
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        if len(s := str(self.value)) <= self.limit:
+            return s
+        return f"{s[:self.limit]}… (+{len(s) - self.limit})"
+
+class _Fields:
+    __slots__ = ("fields", "limit")
+
+    def __init__(self, fields: dict[str, Any], limit: int):
+        self.fields = fields
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return " ".join(f"{k}={_Capped(v, self.limit)}" for k, v in self.fields.items())
+
+class Tracer:
+    """Trace of a stage, falsy while its logger is not enabled for debug."""
+
+    __slots__ = ("stage", "logger", "sample", "payload", "_count")
+
+    def __init__(self, stage: str, sample: int, payload: int):
+        self.stage = stage
+        self.logger = getLogger(f"{__package__}.trace.{stage}")
+        self.sample = sample
+        self.payload = payload
+        self._count = 0
+
+    def __bool__(self) -> bool:
+        return self.logger.isEnabledFor(DEBUG)
+
+    def __call__(self, event: str, **fields: Any) -> None:
+        if not self.logger.isEnabledFor(DEBUG):
+            return
+        self._count += 1
+        if self.sample > 1 and (self._count - 1) % self.sample:
+            return
+        self.logger.debug("%s %s", event, _Fields(fields, self.payload))
+
+TRACERS: dict[str, Tracer] = {stage: Tracer(stage, sample, payload) for stage, (sample, payload) in TRACE.items()}
+
+def get(stage: str) -> Tracer:
+    return TRACERS[stage]
+
+def configure(stage: str, sample: int | None = None, payload: int | None = None) -> None:
+    tracer = TRACERS[stage]
+    if sample is not None:
+        tracer.sample = sample
+    if payload is not None:
+        tracer.payload = payload
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import gzip
+import zlib
+import struct
+
+from typing import Any
+
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.json import json_loads
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_PACKED = "application/vnd.ranware.packed"
+
+ENCODINGS = ("json", "packed")
+
+# Packed layout (little-endian):
+#   header: magic, version, slot count, scalar count, column count
+#   request: constraints (float32 * scalars), then columns (float32 * slots each)
+#   response: summary (float32 * scalars), then plan columns (float32 * slots each)
+#
+_MAGIC = b"EMP"
+_VERSION = 1
+_HEADER = struct.Struct("<3sBHBB")
+
+CONSTRAINTS = ("soc", "grid_power", "sell_power", "charge_power", "discharge_power", "soc_limit", "soc_max", "soc_min", "soc_reserve", "capacity", "amortization")
+
+# Plan columns returned by the optimizer, bool columns are sent as 0.0/1.0
+#
+PLAN_BOOLS = (3, 4, 5)
+
+def _floats(values: list[float]) -> bytes:
+    return struct.pack(f"<{len(values)}f", *values)
+
+def _unfloats(data: bytes | memoryview, offset: int, count: int) -> tuple[float, ...]:
+    return struct.unpack_from(f"<{count}f", data, offset)
+
+def encode(json: dict[str, Any], encoding: str = "json", compression: bool = False) -> tuple[bytes, dict[str, str]]:
+    match encoding:
+        case "packed":
+            rate = json["rate"]
+            constraints = json["constraints"]
+            columns = ([i for i, _ in rate], [o for _, o in rate], json["production"], json["consumption"])
+            data = _HEADER.pack(_MAGIC, _VERSION, len(rate), len(CONSTRAINTS), len(columns)) + _floats([constraints[k] for k in CONSTRAINTS]) + b"".join(_floats(c) for c in columns)
+            headers = {"Content-Type": CONTENT_TYPE_PACKED}
+        case _:
+            data = json_bytes(json)
+            headers = {"Content-Type": CONTENT_TYPE_JSON}
+    headers["Accept"] = f"{CONTENT_TYPE_PACKED}, {CONTENT_TYPE_JSON};q=0.9" if encoding == "packed" else CONTENT_TYPE_JSON
+    headers["Accept-Encoding"] = "gzip, deflate"
+    if compression:
+        data = gzip.compress(data, compresslevel = 6)
+        headers["Content-Encoding"] = "gzip"
+    return data, headers
+
+def decode(content_type: str, content_encoding: str | None, body: bytes) -> tuple[tuple[float, ...], tuple[tuple[Any, ...], ...]]:
+    match content_encoding:
+        case "gzip" if body[:2] == b"\x1f\x8b":
+            body = gzip.decompress(body)
+        case "deflate" if body[:1] == b"\x78":
+            body = zlib.decompress(body)
+
+    match content_type:
+        case "application/json":
+            r = json_loads(body)
+            return tuple(r[0]), tuple(zip(*r[1])) if r[1] else ()
+        case "application/vnd.ranware.packed":
+            magic, version, slots, scalars, columns = _HEADER.unpack_from(body)
+            if magic != _MAGIC or version != _VERSION:
+                raise ValueError(f"Unsupported packed response: {magic!r} v{version}")
+            offset = _HEADER.size
+            summary = _unfloats(body, offset, scalars)
+            offset += scalars * 4
+            plan = []
+            for i in range(columns):
+                column = _unfloats(body, offset, slots)
+                plan.append(tuple(map(bool, column)) if i in PLAN_BOOLS else column)
+                offset += slots * 4
+            return summary, tuple(plan)
+    raise ValueError(f"Unexpected optimization response mimetype: {content_type}")
@@ -1,17 +1,28 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from functools import cache
 from collections import defaultdict
 
-from sqlalchemy import text
-from sqlalchemy import lambda_stmt
-from sqlalchemy.util import LRUCache
-from sqlalchemy.sql.lambdas import StatementLambdaElement
-
 from .const import *
 from .common import *
+from .memory import Usage, sizeof, cache as accounted
+
+from . import trace
 
-_SQL_LAMBDA_CACHE: LRUCache = LRUCache(1000)
+_TRACE = trace.get("sql")
+
+if TYPE_CHECKING:
+    from sqlalchemy.util import LRUCache
+    from sqlalchemy.sql.lambdas import StatementLambdaElement
 
 @cache
+def _sql_lambda_cache() -> LRUCache:
+    from sqlalchemy.util import LRUCache
+
+    return LRUCache(1000)
+
+@accounted("sql.battery")
 def generate_query_string_simple(
     is_sqlite: bool,
     battery_ids: str,
@@ -20,7 +31,7 @@ def generate_query_string_simple(
 ) -> str:
     return SQL_QUERY_BATTERY.format(**(SQL_QUERY_BATTERY_MYSQL_PARAMS if not is_sqlite else SQL_QUERY_BATTERY_SQLITE_PARAMS), battery_ids = battery_ids).format(offset = offset, days = days)
 
-@cache
+@accounted("sql.query")
 def generate_query_string(
     is_sqlite: bool,
     from_ids: str,
@@ -36,6 +47,7 @@ def generate_query_string(
     weekday: int,
     next_weekday: int
 ) -> str:
+    _TRACE("build", weekday = weekday, next_weekday = next_weekday, offset = offset, days = days)
     return SQL_QUERY_TEMPLATE.format(
         **(SQL_QUERY_MYSQL_PARAMS if not is_sqlite else SQL_QUERY_SQLITE_PARAMS),
         from_ids = from_ids,
@@ -52,7 +64,15 @@ def generate_query_string(
         slot = weekslot(weekday), next_slot = weekslot(next_weekday) # slot = weekday, next_slot = next_weekday
     )
 
+def sql_lambda_usage() -> Usage:
+    if not _sql_lambda_cache.cache_info().currsize:
+        return Usage(0, 0)
+    c = _sql_lambda_cache()
+    return Usage(len(c), sizeof(dict(c.items())), c.capacity)
+
 def generate_lambda_stmt(query: str) -> StatementLambdaElement:
     """Generate the lambda statement."""
+    from sqlalchemy import text, lambda_stmt
+
     t = text(query)
-    return lambda_stmt(lambda: t, lambda_cache = _SQL_LAMBDA_CACHE)
+    return lambda_stmt(lambda: t, lambda_cache = _sql_lambda_cache())
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import csv
+import io
+import hashlib
+
+from typing import Any, Callable, Iterator
+from datetime import datetime
+from http import HTTPStatus
+from logging import getLogger
+
+from aiohttp import web
+from aiohttp.hdrs import CACHE_CONTROL, ETAG, IF_NONE_MATCH
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.helpers.json import json_bytes
+from homeassistant.util.dt import parse_datetime
+
+from .const import DOMAIN
+from .money import to_float
+from .coordinator import CoordinatorData
+from .websocket_api import async_get_entry
+
+_LOGGER = getLogger(__name__)
+
+EXPORT: dict[str, Callable[[CoordinatorData], Iterator[tuple[datetime, Any]]]] = {
+    "rates_full": lambda d: ((k, to_float(v)) for k, v in d.window(0)),
+    "compensation_rate": lambda d: ((k, to_float(v)) for k, v in d.window(1)),
+    "spot_rate": lambda d: ((k, to_float(v)) for k, v in d.window(2)),
+    "forecast": lambda d: iter(d.forecast.items()),
+    "soc": lambda d: zip(d.optimization.keys(), d.optimization.column("soc")),
+    "grid": lambda d: zip(d.optimization.keys(), d.optimization.column("grid")),
+    "battery": lambda d: zip(d.optimization.keys(), d.optimization.column("battery")),
+    "charge": lambda d: zip(d.optimization.keys(), d.optimization.column("charge")),
+    "discharge": lambda d: zip(d.optimization.keys(), d.optimization.column("discharge")),
+    "export": lambda d: zip(d.optimization.keys(), d.optimization.column("export")),
+    "surplus": lambda d: zip(d.optimization.keys(), d.optimization.column("surplus"))
+}
+
+_FORMATS = {"json": "application/json", "csv": "text/csv"}
+
+_EXPORTS_MAX = 32
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    hass.http.register_view(ExportView)
+
+def _serialize(data: CoordinatorData, fmt: str, names: tuple[str, ...], start: datetime | None, end: datetime | None) -> tuple[str, bytes]:
+    series = {name: [(data.iso(k), v) for k, v in EXPORT[name](data) if (start is None or k >= start) and (end is None or k < end)] for name in names}
+    match fmt:
+        case "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator = "\n")
+            writer.writerow(("series", "time", "value"))
+            for name, rows in series.items():
+                writer.writerows((name, k, v) for k, v in rows)
+            body = buffer.getvalue().encode()
+        case _:
+            body = json_bytes({name: {"time": [k for k, _ in rows], "value": [v for _, v in rows]} for name, rows in series.items()})
+    return f"\"{hashlib.blake2b(body, digest_size = 8).hexdigest()}\"", body
+
+def _matches(header: str, etag: str) -> bool:
+    """Whether If-None-Match lists the entity-tag (weak comparison) or is *."""
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag in tags
+
+class ExportView(HomeAssistantView):
+    url = f"/api/{DOMAIN}/export"
+    name = f"api:{DOMAIN}:export"
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass = request.app[KEY_HASS]
+        query = request.query
+
+        if (entry := async_get_entry(hass, query.get("entry_id"))) is None or not (data := entry.runtime_data.data):
+            return self.json_message("Config entry not found", HTTPStatus.NOT_FOUND)
+
+        if (fmt := query.get("format", "json")) not in _FORMATS:
+            return self.json_message(f"Unsupported format: {fmt}", HTTPStatus.BAD_REQUEST)
+
+        names = tuple(query.get("series", ",".join(EXPORT)).split(","))
+        if any(name not in EXPORT for name in names):
+            return self.json_message(f"Unsupported series: {', '.join(n for n in names if n not in EXPORT)}", HTTPStatus.BAD_REQUEST)
+
+        try:
+            start = parse_datetime(query["start"], raise_on_error = True) if "start" in query else None
+            end = parse_datetime(query["end"], raise_on_error = True) if "end" in query else None
+        except ValueError as e:
+            return self.json_message(f"Invalid range: {e}", HTTPStatus.BAD_REQUEST)
+
+        start, end = (dt.replace(tzinfo = data.zone_info) if dt and dt.tzinfo is None else dt for dt in (start, end))
+
+        # Pre-serialized once per data generation, plan and current slot
+        #
+        key = (data.optimization.plan.generation, data.optimization.offset, fmt, names, start, end)
+        if (export := data.exports.get(key)) is None:
+            if len(data.exports) >= _EXPORTS_MAX:
+                data.exports.clear()
+            export = data.exports[key] = _serialize(data, fmt, names, start, end)
+
+        etag, body = export
+        headers = {ETAG: etag, CACHE_CONTROL: "no-cache"}
+
+        if (match := request.headers.get(IF_NONE_MATCH)) and _matches(match, etag):
+            return web.Response(status = HTTPStatus.NOT_MODIFIED, headers = headers)
+
+        return web.Response(body = body, content_type = _FORMATS[fmt], headers = headers)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import voluptuous as vol
+
+from typing import Any, Callable
+from logging import getLogger
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.components import websocket_api
+from homeassistant.helpers import config_validation
+
+from .const import DOMAIN
+from .coordinator import Coordinator, CoordinatorData
+
+_LOGGER = getLogger(__name__)
+
+SERIES: dict[str, Callable[[CoordinatorData], dict[str, Any]]] = {
+    "rates_full": lambda d: d.series("rates_full"),
+    "compensation_rate": lambda d: d.series("compensation_rate"),
+    "spot_rate": lambda d: d.series("spot_rate"),
+    "forecast": lambda d: d.series("forecast"),
+    "soc": lambda d: d.optimization.series("soc"),
+    "grid": lambda d: d.optimization.series("grid"),
+    "charge": lambda d: d.optimization.series("charge"),
+    "discharge": lambda d: d.optimization.series("discharge"),
+    "export": lambda d: d.optimization.series("export")
+}
+
+_MISSING = object()
+
+@callback
+def async_setup(hass: HomeAssistant) -> None:
+    websocket_api.async_register_command(hass, ws_subscribe_series)
+
+@callback
+def async_get_entry(hass: HomeAssistant, entry_id: str | None) -> ConfigEntry[Coordinator] | None:
+    return next((e for e in hass.config_entries.async_entries(DOMAIN) if e.state is ConfigEntryState.LOADED and (entry_id is None or e.entry_id == entry_id)), None)
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/subscribe_series",
+    vol.Optional("entry_id"): str,
+    vol.Optional("series"): vol.All(config_validation.ensure_list, [vol.In(SERIES)])
+})
+@callback
+def ws_subscribe_series(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]) -> None:
+    if (entry := async_get_entry(hass, msg.get("entry_id"))) is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "Config entry not found")
+        return
+
+    coordinator = entry.runtime_data
+    names = msg.get("series", list(SERIES))
+    sent: dict[str, dict[str, Any]] = {}
+
+    @callback
+    def forward() -> None:
+        if not (data := coordinator.data):
+            return
+        full = not sent
+        series = {}
+        for name in names:
+            current = SERIES[name](data)
+            if (previous := sent.get(name)) is current:
+                continue
+            if previous is None:
+                series[name] = {"changed": current, "removed": []}
+            else:
+                changed = {k: v for k, v in current.items() if previous.get(k, _MISSING) != v}
+                removed = [k for k in previous if k not in current]
+                if changed or removed:
+                    series[name] = {"changed": changed, "removed": removed}
+            sent[name] = current
+        if series:
+            connection.send_message(websocket_api.event_message(msg["id"], {"full": full, "series": series}))
+
+    remove_listener = coordinator.async_add_listener(forward)
+
+    @callback
+    def unsubscribe() -> None:
+        nonlocal remove_listener
+        if remove_listener:
+            remove_listener()
+            remove_listener = None
+
+    @callback
+    def unload() -> None:
+        # The subscription ends with the entry, its listener would keep the unloaded coordinator alive
+        #
+        if remove_listener:
+            connection.subscriptions.pop(msg["id"], None)
+            unsubscribe()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    entry.async_on_unload(unload)
+    connection.send_result(msg["id"])
+    forward()
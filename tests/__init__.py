@@ -0,0 +1 @@
+"""Tests of the Energy Management integration."""
@@ -0,0 +1 @@
+"""Benchmarks of the Energy Management integration, run with pytest-benchmark."""
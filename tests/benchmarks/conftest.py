@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import re
+import json
+import asyncio
+
+from pathlib import Path
+from datetime import date
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+import pytest
+
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker, AiohttpClientMockResponse
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.async_ import run_callback_threadsafe
+
+from custom_components.energy_management.providers.cz.ote import _URL_OTE, _URL_CNB
+from custom_components.energy_management.providers.cz.const import URL_CEZ, URL_EGD_REGION, URL_EGD
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+_ITEM = re.compile(r"<Item><Date>([^<]+)</Date>.*?</Item>\n")
+
+def fixture(name: str) -> Any:
+    text = (FIXTURES / name).read_text(encoding = "utf-8")
+    return json.loads(text) if name.endswith(".json") else text
+
+@pytest.fixture
+def aio_benchmark(hass: HomeAssistant, benchmark: BenchmarkFixture) -> Callable[..., Awaitable[Any]]:
+    """Benchmark of a coroutine function on the event loop.
+
+    pytest-benchmark times synchronous callables, so its rounds are driven from an executor thread and every round
+    runs on the loop, reset runs on the loop before each of them.
+    """
+    async def run(function: Callable[[], Awaitable[Any]], reset: Callable[[], None] | None = None, rounds: int = 5) -> Any:
+        def setup() -> None:
+            if reset:
+                run_callback_threadsafe(hass.loop, reset).result()
+
+        def target() -> Any:
+            return asyncio.run_coroutine_threadsafe(function(), hass.loop).result()
+
+        return await hass.async_add_executor_job(partial(benchmark.pedantic, target, setup = setup, rounds = rounds))
+
+    return run
+
+@pytest.fixture
+def published() -> Callable[[], date]:
+    """Last day OTE has published, every day of the fixtures unless a test moves it with its clock."""
+    return lambda: date.max
+
+@pytest.fixture
+def upstreams(aioclient_mock: AiohttpClientMocker, published: Callable[[], date]) -> AiohttpClientMocker:
+    """OTE, CNB and the HDO services answering from the committed fixtures, OTE with the published days of the requested period."""
+    ote = fixture("ote.xml")
+    head, tail = ote[:ote.index("<Item>")], ote[ote.rindex("</Item>\n") + 8:]
+    items = [(m.group(1), m.group(0)) for m in _ITEM.finditer(ote)]
+
+    async def period(method: str, url: Any, data: Any) -> AiohttpClientMockResponse:
+        start, end = (re.search(f"<pub:{t}>([^<]+)</pub:{t}>", data).group(1) for t in ("StartDate", "EndDate"))
+        end = min(end, published().isoformat())
+        return AiohttpClientMockResponse(method, url, text = head + "".join(i for d, i in items if start <= d <= end) + tail, headers = {"Content-Type": "text/xml"})
+
+    aioclient_mock.post(_URL_OTE, side_effect = period)
+    aioclient_mock.get(_URL_CNB, json = fixture("cnb.json"), headers = {"Content-Type": "application/json"})
+    aioclient_mock.get(re.compile(re.escape(URL_CEZ.split("{")[0])), json = fixture("cez.json"), headers = {"Content-Type": "application/json"})
+    aioclient_mock.get(URL_EGD_REGION, json = fixture("egd_region.json"), headers = {"Content-Type": "application/json"})
+    aioclient_mock.get(URL_EGD, json = fixture("egd.json"), headers = {"Content-Type": "application/json"})
+    return aioclient_mock
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+import random
+
+from typing import Any
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, Table, Column, Index, Integer, SmallInteger, BigInteger, Float, String, Boolean, insert
+from sqlalchemy.engine import Engine
+
+# Statistic ids of the synthetic energy configuration, the remaining sensors are unrelated statistics
+# every recorder accumulates and the queries have to filter out
+#
+GRID_FROM = "sensor.bench_grid_import"
+GRID_TO = "sensor.bench_grid_export"
+PRODUCTION = "sensor.bench_solar_energy"
+BATTERY_FROM = "sensor.bench_battery_discharge"
+BATTERY_TO = "sensor.bench_battery_charge"
+COST = "sensor.bench_grid_import_cost"
+COMPENSATION = "sensor.bench_grid_export_compensation"
+SOC = "sensor.bench_battery_soc"
+
+ENERGY = (GRID_FROM, GRID_TO, PRODUCTION, BATTERY_FROM, BATTERY_TO, COST, COMPENSATION)
+
+_SOC_INTERVAL = 900
+
+def schema() -> MetaData:
+    """The recorder tables and indexes the queries touch, reduced to the columns they read and their siblings that matter for the row size."""
+    metadata = MetaData()
+    Table("statistics_meta", metadata,
+        Column("id", Integer, primary_key = True),
+        Column("statistic_id", String(255)),
+        Column("source", String(32)),
+        Column("unit_of_measurement", String(255)),
+        Column("has_mean", Boolean),
+        Column("has_sum", Boolean),
+        Column("name", String(255)),
+        Index("ix_statistics_meta_statistic_id", "statistic_id", unique = True)
+    )
+    Table("statistics", metadata,
+        Column("id", Integer, primary_key = True),
+        Column("created_ts", Float),
+        Column("metadata_id", Integer),
+        Column("start_ts", Float),
+        Column("mean", Float),
+        Column("min", Float),
+        Column("max", Float),
+        Column("last_reset_ts", Float),
+        Column("state", Float),
+        Column("sum", Float),
+        Index("ix_statistics_statistic_id_start_ts", "metadata_id", "start_ts", unique = True),
+        Index("ix_statistics_start_ts", "start_ts")
+    )
+    Table("states_meta", metadata,
+        Column("metadata_id", Integer, primary_key = True),
+        Column("entity_id", String(255)),
+        Index("ix_states_meta_entity_id", "entity_id", unique = True)
+    )
+    Table("states", metadata,
+        Column("state_id", BigInteger().with_variant(Integer, "sqlite"), primary_key = True),
+        Column("state", String(255)),
+        Column("last_changed_ts", Float),
+        Column("last_updated_ts", Float),
+        Column("last_reported_ts", Float),
+        Column("old_state_id", BigInteger().with_variant(Integer, "sqlite")),
+        Column("origin_idx", SmallInteger),
+        Column("metadata_id", Integer),
+        Index("ix_states_metadata_id_last_updated_ts", "metadata_id", "last_updated_ts"),
+        Index("ix_states_last_updated_ts", "last_updated_ts")
+    )
+    return metadata
+
+def _hourly(statistic_id: str, hour: int, rnd: random.Random) -> float:
+    match statistic_id:
+        case "sensor.bench_grid_import" | "sensor.bench_grid_import_cost":
+            v = (.25 + .6 * math.exp(-((hour - 19) ** 2) / 8) + .3 * math.exp(-((hour - 7) ** 2) / 4)) * rnd.uniform(.6, 1.6)
+            return v * 4.2 if statistic_id == COST else v
+        case "sensor.bench_solar_energy" | "sensor.bench_grid_export" | "sensor.bench_grid_export_compensation":
+            v = max(0, math.sin(math.pi * (hour - 6) / 14)) * rnd.uniform(.2, 4.5) if 6 <= hour <= 20 else 0
+            return v if statistic_id == PRODUCTION else v * .4 * (1.8 if statistic_id == COMPENSATION else 1)
+        case "sensor.bench_battery_charge":
+            return rnd.uniform(.5, 2.5) if 10 <= hour <= 15 else 0
+        case "sensor.bench_battery_discharge":
+            return rnd.uniform(.2, 1.2) if hour >= 18 or hour <= 6 else 0
+    return rnd.uniform(0, 1)
+
+def populate(engine: Engine, sensors: int, days: int, now: datetime, seed: int = 0) -> dict[str, Any]:
+    """Fill an empty database with hourly statistics of sensors (at least the energy ones) over days of history and 15 minute battery states."""
+    metadata = schema()
+    metadata.create_all(engine)
+    rnd = random.Random(seed)
+    ids = ENERGY + tuple(f"sensor.bench_noise_{i}" for i in range(max(0, sensors - len(ENERGY))))
+    end = now.replace(minute = 0, second = 0, microsecond = 0)
+    start = end - timedelta(days = days)
+    hours = int((end - start).total_seconds() // 3600)
+    statistics_meta, statistics, states_meta, states = (metadata.tables[t] for t in ("statistics_meta", "statistics", "states_meta", "states"))
+    rows = {"statistics": 0, "states": 0}
+
+    with engine.begin() as connection:
+        connection.execute(insert(statistics_meta), [{"id": i, "statistic_id": s, "source": "recorder", "unit_of_measurement": "kWh" if s not in (COST, COMPENSATION) else "CZK", "has_mean": False, "has_sum": True, "name": None} for i, s in enumerate(ids, 1)])
+        connection.execute(insert(states_meta), [{"metadata_id": 1, "entity_id": SOC}])
+        for i, s in enumerate(ids, 1):
+            total = .0
+            batch = []
+            for h in range(hours):
+                ts = start + timedelta(hours = h)
+                total += _hourly(s, ts.hour, rnd)
+                batch.append({"created_ts": (ts + timedelta(hours = 1, seconds = 10)).timestamp(), "metadata_id": i, "start_ts": ts.timestamp(), "state": total, "sum": total})
+            connection.execute(insert(statistics), batch)
+            rows["statistics"] += len(batch)
+        soc = 50.
+        batch = []
+        for n in range(int((end - start).total_seconds() // _SOC_INTERVAL)):
+            ts = (start + timedelta(seconds = n * _SOC_INTERVAL)).timestamp()
+            soc = min(100., max(10., soc + rnd.uniform(-3, 3)))
+            batch.append({"state": f"{soc:.0f}", "last_changed_ts": ts, "last_updated_ts": ts, "last_reported_ts": ts, "old_state_id": n or None, "origin_idx": 0, "metadata_id": 1})
+        connection.execute(insert(states), batch)
+        rows["states"] += len(batch)
+
+    return rows
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import math
+import random
+
+from collections.abc import AsyncGenerator
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from pytest_benchmark.fixture import BenchmarkFixture
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import UTC, utcnow
+
+from custom_components.energy_management import sensor, binary_sensor, select, number
+from custom_components.energy_management.const import DOMAIN
+from custom_components.energy_management.common import dt_block
+from custom_components.energy_management.coordinator import Coordinator, CoordinatorData
+from custom_components.energy_management.entity import EnergyManagementEntity
+from custom_components.energy_management.money import to_money
+from custom_components.energy_management.plan import Plan
+from custom_components.energy_management.segments import DayRing
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+_ROUNDS = 5
+
+def _window(slots: int, now: datetime, seed: int) -> tuple[CoordinatorData, Plan]:
+    """Coordinator data and plan over slots // 96 days around today (yesterday included from two days on)."""
+    rnd = random.Random(seed)
+    today = now.astimezone(TIMEZONE).date()
+    days = max(1, slots // 96)
+    lookback = 1 if days > 1 else 0
+    ring = DayRing(lookback, days - 1 - lookback)
+    ring.rotate(today)
+    keys = []
+    for d in range(-lookback, days - lookback):
+        day = today + timedelta(days = d)
+        start = datetime.combine(day, time(0), tzinfo = TIMEZONE).astimezone(UTC)
+        segment = {}
+        for i in range(100):
+            if (dt := start + timedelta(minutes = 15 * i)).astimezone(TIMEZONE).date() != day:
+                break
+            spot = to_money(round(rnd.uniform(-.5, 4.5), 3))
+            segment[dt] = (spot + to_money(1.8), spot - to_money(.4), spot)
+            keys.append(dt)
+        ring.put(day, segment)
+    data = CoordinatorData(now, ring, str(TIMEZONE))
+    data.forecast = {k.astimezone(TIMEZONE): round(max(0, math.sin(math.pi * (k.astimezone(TIMEZONE).hour - 6) / 14)) * 3800, 1) for k in keys if k.minute == 0}
+    ahead = [k for k in keys if k >= now]
+    soc = [round(rnd.uniform(.2, .95), 3) for _ in ahead]
+    charge = [rnd.random() < .2 for _ in ahead]
+    discharge = [not c and rnd.random() < .2 for c in charge]
+    plan = Plan(now, tuple(map(tuple, (soc, [round(rnd.uniform(-1, 2), 3) for _ in ahead], [round(rnd.uniform(-.5, .5), 3) for _ in ahead], charge, discharge, [d and rnd.random() < .5 for d in discharge], [0.] * len(ahead)))))
+    data.optimization = plan.view(now)
+    return data, plan
+
+def _serve(coordinator: Coordinator, data: CoordinatorData, plan: Plan) -> None:
+    """Data of a refresh and the per slot state over its window."""
+    keys = [k for k, _ in data.window(0)]
+    coordinator.data = coordinator._data = data
+    coordinator.optimization = plan
+    coordinator.forecast = {k: v / 4000 for k, v in data.forecast.items()}
+    for name in ("production", "consumption", "consumption_max", "today_consumption", "expected_consumption", "imported", "exported", "cost"):
+        setattr(coordinator, name, {k: .1 + .05 * (k.hour % 7) for k in keys})
+    coordinator.battery = 55.
+    coordinator.cost_total = {data.day: 1234.5}
+
+@pytest.fixture
+async def coordinators(hass: HomeAssistant, request: pytest.FixtureRequest) -> AsyncGenerator[list[Coordinator]]:
+    await hass.config.async_update(time_zone = "Europe/Prague")
+    coordinators = []
+    for e in range(request.param):
+        entry = MockConfigEntry(domain = DOMAIN, title = f"Home {e}")
+        entry.add_to_hass(hass)
+        entry.runtime_data = coordinator = Coordinator(hass, entry)
+        coordinator._load_options(entry.options)
+        coordinators.append(coordinator)
+    yield coordinators
+    for coordinator in coordinators:
+        coordinator._periodic_listener()
+
+async def _entities(hass: HomeAssistant, coordinator: Coordinator, writes: list[int]) -> list[EnergyManagementEntity]:
+    """Entities of all platforms as their setup creates them, not added to Home Assistant, their state writes are counted."""
+    entities = []
+    for platform in (sensor, binary_sensor, select, number):
+        await platform.async_setup_entry(hass, coordinator.config_entry, entities.extend)
+
+    def write() -> None:
+        writes[0] += 1
+
+    for entity in entities:
+        entity.hass = hass
+        entity.async_write_ha_state = write
+    return entities
+
+@pytest.mark.parametrize("coordinators", [1, 4], ids = lambda n: f"{n}e", indirect = True)
+@pytest.mark.parametrize("slots", [96, 3 * 96, 7 * 96])
+@pytest.mark.parametrize("changed", [True, False], ids = ["changed", "unchanged"])
+async def test_fanout(hass: HomeAssistant, benchmark: BenchmarkFixture, coordinators: list[Coordinator], slots: int, changed: bool) -> None:
+    """_handle_coordinator_update of every entity, with a new data generation (a refresh) or the same data (a minute tick)."""
+    now = dt_block(utcnow())
+    writes = [0]
+    # Data of every round is built up front so only the entity layer is measured
+    #
+    rounds = [[_window(slots, now, e * 1000 + r) for e in range(len(coordinators))] for r in range(_ROUNDS + 2)]
+    for coordinator, window in zip(coordinators, rounds.pop()):
+        _serve(coordinator, *window)
+    entities = [entity for coordinator in coordinators for entity in await _entities(hass, coordinator, writes)]
+
+    def fanout() -> None:
+        for entity in entities:
+            entity._handle_coordinator_update()
+
+    def setup() -> None:
+        if changed:
+            for coordinator, window in zip(coordinators, rounds.pop()):
+                _serve(coordinator, *window)
+
+    fanout()
+    writes[0] = 0
+    benchmark.pedantic(fanout, setup = setup, rounds = _ROUNDS)
+    # Entities whose state and attributes did not change are not written again
+    #
+    assert (writes[0] > 0) if changed else (writes[0] == 0)
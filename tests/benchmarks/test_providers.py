@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any, Awaitable, Callable
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import UTC
+
+from custom_components.energy_management.hub import ProviderHub
+from custom_components.energy_management.memory import CACHES
+from custom_components.energy_management.money import to_money
+from custom_components.energy_management.providers.cz import get_function, _get_intervals, _get_tariff, _get_final_pricing, tariffs
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+from custom_components.energy_management.providers.cz.ote import post as ote_post
+from custom_components.energy_management.providers.cz.fix import post as fix_post
+
+# Days of the committed fixtures, the week ends with the fall-back day of 100 slots
+#
+TODAY = date(2026, 10, 19)
+
+_AREA, _RATE, _FEE = "cez", "D57d", (0.3, 0.3)
+_TARIFFS = {"cez": "zapad;405", "egd": "60200;A1B5DP06", "pre": ""}
+
+Benchmark = Callable[..., Awaitable[Any]]
+
+@pytest.fixture
+async def hub(hass: HomeAssistant, upstreams: AiohttpClientMocker) -> ProviderHub:
+    await hass.async_add_executor_job(tariffs.load, (TODAY.year,))
+    return ProviderHub(hass)
+
+def _reset(hub: ProviderHub, upstreams: AiohttpClientMocker) -> Callable[[], None]:
+    """Every round is cold, the hub resources and the pricing caches are dropped before it."""
+    def reset() -> None:
+        hub._resources.clear()
+        upstreams.mock_calls.clear()
+        for c in CACHES.values():
+            if c.name.startswith("cz."):
+                c.cache_clear()
+    return reset
+
+def _days(window: int) -> list[date]:
+    return [TODAY + timedelta(days = d) for d in range(window)]
+
+def _slots(days: list[date]) -> list[datetime]:
+    return [s for d in days for i in range(100) if (s := (datetime.combine(d, time(0), tzinfo = TIMEZONE).astimezone(UTC) + timedelta(minutes = 15 * i)).astimezone(TIMEZONE)).date() == d]
+
+@pytest.mark.parametrize("window", [1, 7])
+async def test_ote_post(aio_benchmark: Benchmark, hub: ProviderHub, upstreams: AiohttpClientMocker, window: int) -> None:
+    rates = get_function(ote_post, hub, _AREA, _RATE, _TARIFFS[_AREA], _FEE, "", "CZK")[0]
+
+    async def run() -> int:
+        return sum([1 for d in _days(window) async for _ in rates(dt = datetime.combine(d, time(12), tzinfo = TIMEZONE))])
+
+    # Yesterday, today and tomorrow of every day, the fall-back day has 4 slots more. OTE and CNB are requested
+    # once per day, the HDO of the tariff once per priced day
+    #
+    assert await aio_benchmark(run, _reset(hub, upstreams)) == sum(len(_slots([d - timedelta(days = 1), d, d + timedelta(days = 1)])) for d in _days(window))
+    assert upstreams.call_count == 2 * window + window + 2
+
+@pytest.mark.parametrize("window", [1, 7])
+async def test_fix_post(aio_benchmark: Benchmark, hub: ProviderHub, upstreams: AiohttpClientMocker, window: int) -> None:
+    rates = get_function(fix_post, hub, _AREA, _RATE, _TARIFFS[_AREA], _FEE, "", "CZK")[0]
+
+    async def run() -> int:
+        return sum([1 for d in _days(window) async for _ in rates(dt = datetime.combine(d, time(12), tzinfo = TIMEZONE), T1 = to_money(2.5), T2 = to_money(1.5))])
+
+    assert await aio_benchmark(run, _reset(hub, upstreams)) == 3 * 96 * window
+
+@pytest.mark.parametrize("window", [1, 7])
+@pytest.mark.parametrize("area", list(_TARIFFS))
+async def test_intervals(aio_benchmark: Benchmark, hub: ProviderHub, upstreams: AiohttpClientMocker, area: str, window: int) -> None:
+    async def run() -> int:
+        return sum([await _get_intervals(hub, area, _RATE, _TARIFFS[area], d) is not None for d in _days(window)])
+
+    assert await aio_benchmark(run, _reset(hub, upstreams)) == (window if area != "pre" else 0)
+    assert upstreams.call_count == {"cez": window, "egd": 2 * window, "pre": 0}[area]
+
+@pytest.mark.parametrize("window", [1, 7])
+async def test_tariff(aio_benchmark: Benchmark, hub: ProviderHub, upstreams: AiohttpClientMocker, window: int) -> None:
+    slots = _slots(_days(window))
+    types = [tariffs.TARIFF["AKU8V1"], await _get_intervals(hub, "egd", _RATE, _TARIFFS["egd"], TODAY)]
+
+    async def run() -> int:
+        return sum([_get_tariff(t, s.date(), s.weekday(), s.time()) == "T2" for t in types for s in slots])
+
+    assert await aio_benchmark(run, _reset(hub, upstreams)) > 0
+
+@pytest.mark.parametrize("window", [1, 7])
+async def test_final_pricing(aio_benchmark: Benchmark, hub: ProviderHub, upstreams: AiohttpClientMocker, window: int) -> None:
+    slots = _slots(_days(window))
+
+    async def run() -> int:
+        return len({await _get_final_pricing(hub, _AREA, _RATE, _TARIFFS[_AREA], _FEE, s, (to_money(2.5), to_money(1.5))) for s in slots})
+
+    assert await aio_benchmark(run, _reset(hub, upstreams)) == 2
+    assert upstreams.call_count == window
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import Any
+from collections.abc import Generator
+
+import pytest
+
+from pytest_benchmark.fixture import BenchmarkFixture
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from homeassistant.util.dt import utcnow
+
+from custom_components.energy_management import common
+from custom_components.energy_management.util import generate_query_string, generate_query_string_simple, generate_lambda_stmt
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+from .database import GRID_FROM, GRID_TO, PRODUCTION, BATTERY_FROM, BATTERY_TO, COST, COMPENSATION, SOC, populate
+
+_SENSORS = 24
+_WINDOW = 14
+
+# The queries filter by the database clock, the history ends at the real now
+#
+@pytest.fixture(scope = "module", params = [30, 90, 365], ids = lambda days: f"{days}d")
+def engine(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> Generator[Engine]:
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('recorder') / 'recorder.db'}")
+    populate(engine, _SENSORS, request.param, utcnow())
+    yield engine
+    engine.dispose()
+
+def _queries() -> tuple[str, str]:
+    local = utcnow().astimezone(TIMEZONE)
+    offset = f"{o[:3]}:{o[3:]}" if (o := local.strftime('%z')) else "+00:00"
+    query_str = generate_query_string(
+        True,
+        common.joinify(GRID_FROM, PRODUCTION, BATTERY_FROM),
+        common.joinify(GRID_TO, BATTERY_TO),
+        common.joinify(PRODUCTION),
+        common.joinify(GRID_FROM),
+        common.joinify(GRID_TO),
+        common.joinify(COST),
+        common.joinify(COMPENSATION),
+        common.joinify(),
+        offset,
+        _WINDOW,
+        local.weekday(),
+        (local.weekday() + 1) % 7
+    )
+    return query_str, generate_query_string_simple(True, common.joinify(SOC), offset, 15)
+
+def _execute(engine: Engine, query_str: str) -> list[Any]:
+    """The statement the coordinator runs on a synchronous session maker."""
+    with Session(engine) as session:
+        return session.execute(generate_lambda_stmt(query_str)).mappings().all()
+
+def _plan(engine: Engine, query_str: str) -> list[str]:
+    with engine.connect() as connection:
+        return [r[-1] for r in connection.execute(text(f"EXPLAIN QUERY PLAN {query_str}"))]
+
+def test_profile_query(benchmark: BenchmarkFixture, engine: Engine) -> None:
+    query_str, _ = _queries()
+    rows = benchmark(_execute, engine, query_str)
+    assert [r["idx"] for r in rows] == list(range(24))
+    assert all(r["mean"] is not None for r in rows)
+
+def test_battery_query(benchmark: BenchmarkFixture, engine: Engine) -> None:
+    _, battery_str = _queries()
+    rows = benchmark(_execute, engine, battery_str)
+    assert 10 <= next(iter(rows[0].values())) <= 100
+
+def test_query_plans(engine: Engine) -> None:
+    # The statistics and states are reached through the recorder's indexes, never scanned whole
+    #
+    query_str, battery_str = _queries()
+    plan, battery_plan = _plan(engine, query_str), _plan(engine, battery_str)
+    assert any("ix_statistics_statistic_id_start_ts" in p for p in plan)
+    assert any("ix_states_metadata_id_last_updated_ts" in p for p in battery_plan)
+    assert not [p for p in plan + battery_plan if p.startswith(("SCAN statistics", "SCAN states"))]
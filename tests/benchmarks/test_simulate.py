@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+import json
+
+from pathlib import Path
+from typing import Any, Callable, Mapping
+from collections import Counter
+from collections.abc import AsyncGenerator, Generator
+from datetime import date, datetime, time, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from freezegun.api import FrozenDateTimeFactory
+from sqlalchemy import create_engine, event as sqlalchemy_event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+from pytest_homeassistant_custom_component.common import MockConfigEntry, async_fire_time_changed
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker, AiohttpClientMockResponse
+
+from homeassistant.const import EVENT_STATE_CHANGED, EVENT_STATE_REPORTED
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import entity_registry
+from homeassistant.setup import async_setup_component
+from homeassistant.components.energy.data import async_get_manager
+from homeassistant.util.dt import utcnow
+
+from custom_components.energy_management.const import DOMAIN, URL
+from custom_components.energy_management.coordinator import Coordinator
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+from .database import GRID_FROM, GRID_TO, PRODUCTION, BATTERY_FROM, BATTERY_TO, SOC, populate
+
+# A simulated afternoon and night, from before the 13:00 price publication past the midnight rollover
+#
+START = datetime(2026, 10, 19, 10, tzinfo = TIMEZONE)
+HOURS = 16
+
+_SOLAR = "bench_solar_forecast"
+
+@pytest.fixture(scope = "module")
+def engine(tmp_path_factory: pytest.TempPathFactory) -> Generator[Engine]:
+    # The profile query filters by the database clock, the history covers the whole of its today so every
+    # simulated hour finds its consumption recorded
+    #
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('simulate') / 'recorder.db'}")
+    populate(engine, 24, 32, datetime.combine(utcnow().astimezone(TIMEZONE).date() + timedelta(days = 1), time(2), tzinfo = TIMEZONE))
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def mock_recorder_before_hass(async_setup_recorder_instance: Any) -> None:
+    """The recorder is set up before Home Assistant."""
+
+@pytest.fixture
+def published() -> Callable[[], date]:
+    """OTE publishes the next day at 13:00."""
+    def published() -> date:
+        local = utcnow().astimezone(TIMEZONE)
+        return local.date() + timedelta(days = 1 if local.hour >= 13 else 0)
+    return published
+
+async def _optimizer(method: str, url: Any, data: Any) -> AiohttpClientMockResponse:
+    """Plan of the request's length, charging in the cheapest and discharging in the dearest quarter."""
+    request = json.loads(data)
+    soc, rates = request["constraints"]["soc"], [i for i, _ in request["rate"]]
+    ordered = sorted(rates)
+    low, high = ordered[len(ordered) // 4], ordered[-len(ordered) // 4 - 1]
+    plan = []
+    for r in rates:
+        charge, discharge = r <= low and soc < .95, r >= high and soc > .25
+        soc = min(1., soc + .05) if charge else max(0., soc - .05) if discharge else soc
+        plan.append([soc, 1.2 if charge else -.8 if discharge else .3, .5 if charge else -.5 if discharge else 0, charge, discharge, discharge and r >= high, 0])
+    return AiohttpClientMockResponse(method, url, json = [[0, sum(rates) * .01, 0, len(rates) * .002], plan], headers = {"Content-Type": "application/json"})
+
+async def _forecast(hass: HomeAssistant, entry_id: str) -> dict[str, Any]:
+    today = utcnow().astimezone(TIMEZONE).date()
+    hours = (datetime.combine(today + timedelta(days = d), time(h), tzinfo = TIMEZONE) for d in (-1, 0, 1) for h in range(24))
+    return {"wh_hours": {h.isoformat(): round(max(0, math.sin(math.pi * (h.hour - 6) / 14)) * 3800, 1) for h in hours}}
+
+def _cost(hass: HomeAssistant, dt: datetime) -> list[dict[str, Any]]:
+    return [{"meta": {"statistic_id": s}, "stat": {"sum": 48.3}} for s in hass.data["energy"]["cost_sensors"].values()]
+
+def _battery(hass: HomeAssistant, dt: datetime, entity_ids: list[str]) -> dict[str, list[dict[str, Any]]]:
+    local = dt.astimezone(TIMEZONE)
+    hour = local.hour + local.minute / 60
+    soc = 20 + 70 * min(1, max(0, (hour - 9) / 6)) if hour < 18 else 90 - 70 * min(1, (hour - 18) / 8)
+    return {i: [{"s": f"{soc:.0f}", "lu": (dt - timedelta(minutes = 1)).timestamp()}] for i in entity_ids}
+
+@pytest.fixture
+async def coordinator(recorder_mock: Any, hass: HomeAssistant, freezer: FrozenDateTimeFactory, engine: Engine, upstreams: AiohttpClientMocker, tmp_path: Path) -> AsyncGenerator[Coordinator]:
+    """The entry set up on the frozen clock with its energy configuration, the recorder statistics of the synthetic
+    database, a scripted solar forecast, battery state and cost total, and the optimizer answering with a plan."""
+    freezer.move_to(START)
+    hass.config.config_dir = str(tmp_path)
+    await hass.config.async_update(time_zone = "Europe/Prague", country = "CZ", currency = "CZK")
+    assert await async_setup_component(hass, "energy", {})
+    MockConfigEntry(domain = "bench", entry_id = _SOLAR).add_to_hass(hass)
+    await (await async_get_manager(hass)).async_update({
+        "energy_sources": [
+            {"type": "grid", "flow_from": [{"stat_energy_from": GRID_FROM, "stat_cost": None, "entity_energy_price": None, "number_energy_price": 4.2}], "flow_to": [{"stat_energy_to": GRID_TO, "stat_compensation": None, "entity_energy_price": None, "number_energy_price": 1.8}], "cost_adjustment_day": 0},
+            {"type": "solar", "stat_energy_from": PRODUCTION, "config_entry_solar_forecast": [_SOLAR]},
+            {"type": "battery", "stat_energy_from": BATTERY_FROM, "stat_energy_to": BATTERY_TO}
+        ]
+    })
+    await hass.async_block_till_done()
+    upstreams.post(URL, side_effect = _optimizer)
+    maker = scoped_session(sessionmaker(bind = engine))
+    entry = MockConfigEntry(domain = DOMAIN, title = "Home", version = 0, minor_version = 0, options = {"battery_entity_ids": [SOC]})
+    entry.add_to_hass(hass)
+    with (
+        patch("custom_components.energy_management.coordinator._get_sessionmaker", AsyncMock(return_value = maker)),
+        patch("custom_components.energy_management.coordinator.async_get_energy_platforms", AsyncMock(return_value = {"bench": _forecast})),
+        patch("custom_components.energy_management.coordinator._compile_statistics", _cost),
+        patch("custom_components.energy_management.coordinator._get_significant_states_with_session", _battery)
+    ):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        yield entry.runtime_data
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    maker.remove()
+
+async def test_simulate(hass: HomeAssistant, freezer: FrozenDateTimeFactory, engine: Engine, upstreams: AiohttpClientMocker, coordinator: Coordinator) -> None:
+    """Minute ticks and their deferred fetches 30 s later, counted per simulated hour."""
+    entities = {e.entity_id for e in entity_registry.async_entries_for_config_entry(entity_registry.async_get(hass), coordinator.config_entry.entry_id)}
+    counts: Counter[str] = Counter()
+
+    @callback
+    def entity(data: Mapping[str, Any]) -> bool:
+        return data["entity_id"] in entities
+
+    @callback
+    def write(_: Event) -> None:
+        counts["writes"] += 1
+
+    def query(*_: Any) -> None:
+        counts["queries"] += 1
+
+    remove = [hass.bus.async_listen(EVENT_STATE_CHANGED, write, entity), hass.bus.async_listen(EVENT_STATE_REPORTED, write, entity), coordinator.async_add_listener(lambda: counts.update(("fanouts",)))]
+    sqlalchemy_event.listen(engine, "before_cursor_execute", query)
+    hourly = []
+    try:
+        for _ in range(HOURS):
+            upstreams.mock_calls.clear()
+            counts.clear()
+            local = utcnow().astimezone(TIMEZONE)
+            for _ in range(2 * 60):
+                freezer.tick(timedelta(seconds = 30))
+                async_fire_time_changed(hass, utcnow())
+                await hass.async_block_till_done()
+            hourly.append({
+                "hour": local.hour,
+                "http": Counter(str(url.host) for _, url, _, _ in upstreams.mock_calls),
+                "tomorrow": bool(coordinator.data.tomorrow),
+                "rolled": coordinator._rolled
+            } | {k: counts[k] for k in ("fanouts", "writes", "queries")})
+    finally:
+        sqlalchemy_event.remove(engine, "before_cursor_execute", query)
+        for r in remove:
+            r()
+
+    by_hour = {h["hour"]: h for h in hourly}
+    # Every minute refreshes the entities, the optimizer is asked by the deferred fetches
+    #
+    assert all(h["fanouts"] >= 60 for h in hourly)
+    assert all(0 < h["writes"] for h in hourly)
+    assert all(h["http"]["optimization.ranware.com"] >= 60 for h in hourly)
+    # OTE is asked again once tomorrow is published at 13:00, then left alone for the rest of the day
+    #
+    assert not by_hour[12]["tomorrow"] and by_hour[13]["tomorrow"]
+    assert by_hour[13]["http"]["www.ote-cr.cz"] > 0
+    assert all(not h["http"]["www.ote-cr.cz"] for h in hourly if 14 <= h["hour"] <= 23)
+    # The profile prepared for tomorrow is swapped in at midnight, the recorder is not queried every minute
+    #
+    assert by_hour[0]["rolled"] == START.date() + timedelta(days = 1)
+    assert [h["hour"] for h in hourly if h["queries"]] == [13, 1]
+    # The rate cache is created in the fresh config directory
+    #
+    assert any(Path(hass.config.path(DOMAIN, "rates")).glob("*.bin"))
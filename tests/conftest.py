@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+import pytest
+
+@pytest.fixture(autouse = True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
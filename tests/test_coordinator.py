@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from datetime import date, datetime, time, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import UTC
+
+from custom_components.energy_management.const import DOMAIN
+from custom_components.energy_management.coordinator import Coordinator, CoordinatorData, Rollover, _SERIES, _build_series
+from custom_components.energy_management.segments import DayRing
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+YESTERDAY, TODAY = date(2026, 10, 18), date(2026, 10, 19)
+
+def _slots(day: date) -> list[datetime]:
+    start = datetime.combine(day, time(0), tzinfo = TIMEZONE).astimezone(UTC)
+    return [start + timedelta(minutes = 15 * i) for i in range(96)]
+
+def _rollover(day: date) -> Rollover:
+    slots = _slots(day)
+    return Rollover(day, dict.fromkeys(slots, 0), dict.fromkeys(slots), dict.fromkeys(slots, 0.5), dict.fromkeys(slots, 1.0), dict.fromkeys(slots), dict.fromkeys(slots, 0.5), 0.5, 1.0, 0, 0)
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant) -> AsyncGenerator[Coordinator]:
+    await hass.config.async_update(time_zone = "Europe/Prague")
+    entry = MockConfigEntry(domain = DOMAIN, title = "Home")
+    entry.add_to_hass(hass)
+    coordinator = Coordinator(hass, entry)
+    yield coordinator
+    coordinator._periodic_listener()
+
+def _profile(coordinator: Coordinator, day: date, recorded: datetime | None = None) -> None:
+    """Profile of the day as the query leaves it, consumption recorded up to (excluding) the given slot."""
+    for k in _slots(day) + _slots(day + timedelta(days = 1)):
+        coordinator.consumption[k] = 0.5
+    for k in _slots(day):
+        coordinator.today_consumption[k] = 0.4 if recorded and k < recorded else None
+
+def test_forced(coordinator: Coordinator) -> None:
+    coordinator.now = _slots(TODAY)[48]
+    assert coordinator._needs_profile_query(TODAY)
+    _profile(coordinator, TODAY, coordinator.now)
+    assert not coordinator._needs_profile_query(TODAY)
+    coordinator.invalidate_profile()
+    assert coordinator._needs_profile_query(TODAY)
+
+def test_last_hour(coordinator: Coordinator) -> None:
+    coordinator.now = _slots(TODAY)[48]
+    _profile(coordinator, TODAY, coordinator.now - timedelta(hours = 1))
+    assert coordinator._needs_profile_query(TODAY)
+    _profile(coordinator, TODAY, coordinator.now)
+    assert not coordinator._needs_profile_query(TODAY)
+
+def test_midnight_rollover(coordinator: Coordinator) -> None:
+    _profile(coordinator, YESTERDAY, _slots(TODAY)[0])
+    coordinator._rollover = _rollover(TODAY)
+    assert coordinator._swap_rollover(TODAY)
+    for slot in (0, 3):
+        coordinator.now = _slots(TODAY)[slot]
+        assert not coordinator._needs_profile_query(TODAY)
+    # Once the last hour is today's, its unknown consumption is queried again
+    #
+    coordinator.now = _slots(TODAY)[4]
+    assert coordinator._needs_profile_query(TODAY)
+
+def test_midnight_without_rollover(coordinator: Coordinator) -> None:
+    _profile(coordinator, TODAY)
+    coordinator.now = _slots(TODAY)[0]
+    assert coordinator._rolled is None
+    assert coordinator._needs_profile_query(TODAY)
+
+def test_build_series() -> None:
+    ring = DayRing(0, 1)
+    ring.rotate(TODAY)
+    for day in (TODAY, TODAY + timedelta(days = 1)):
+        ring.put(day, {k: (i * 10_000_000, -i * 1_000_000, i) for i, k in enumerate(_slots(day))})
+    data = CoordinatorData(_slots(TODAY)[0], ring, "Europe/Prague")
+    data.forecast = {k.astimezone(TIMEZONE): 100 for k in _slots(TODAY)[::4]}
+    series = _build_series({c: getattr(data, c) for c, _ in _SERIES.values()}, data.zone_info)
+    assert series == {name: data.series(name) for name in _SERIES}
+    assert next(iter(series["forecast"])) == "2026-10-19T00:00:00+02:00"
+
+def _snapshot(coordinator: Coordinator) -> dict:
+    """Snapshot of today's rates and an empty profile, taken with the coordinator's current options."""
+    return {
+        "saved": datetime.combine(TODAY, time(9), tzinfo = TIMEZONE).isoformat(),
+        "rates_key": coordinator._get_rates_key(),
+        "options": coordinator._get_options_key(),
+        "days": [[(k.isoformat(), 1, 2, 3) for k in _slots(TODAY)]],
+        "profile": {"forecast": [], "consumption": [], "consumption_max": [], "consumption_mean": 0.5, "consumption_max_max": 1.0, "reserve": 0, "battery_max": 50},
+        "plan": None,
+        "battery": 50,
+        "predicted": (0, 0)
+    }
+
+@pytest.mark.parametrize(("options", "restored"), [({"memory": {"cost_days": 7}}, True), ({"tariff": "EVV2"}, False), ({"lookback": 2}, False)], ids = ["runtime", "rates", "structural"])
+async def test_restore_options(hass: HomeAssistant, freezer: FrozenDateTimeFactory, coordinator: Coordinator, options: dict, restored: bool) -> None:
+    freezer.move_to(datetime.combine(TODAY, time(10), tzinfo = TIMEZONE))
+    coordinator._load_options(coordinator.config_entry.options)
+    snapshot = _snapshot(coordinator)
+    # Options that reload the entry discard the snapshot taken before, the runtime ones are applied in place
+    #
+    hass.config_entries.async_update_entry(coordinator.config_entry, options = options)
+    coordinator._load_options(coordinator.config_entry.options)
+    with patch.object(coordinator._store, "async_load", AsyncMock(return_value = snapshot)):
+        assert await coordinator._async_restore() is restored
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import sys
+import json
+import subprocess
+
+from pathlib import Path
+
+import pytest
+
+from custom_components.energy_management.const import IMPORT_BUDGET
+
+# Home Assistant modules the integration imports, loaded by Home Assistant itself before the integration
+#
+_PRELOAD = (
+    "homeassistant.helpers.update_coordinator",
+    "homeassistant.helpers.entity_platform",
+    "homeassistant.components.http",
+    "homeassistant.components.websocket_api",
+    "homeassistant.components.recorder",
+    "homeassistant.components.energy.data",
+    "homeassistant.components.energy.websocket_api",
+    "homeassistant.components.sensor",
+    "homeassistant.components.binary_sensor",
+    "homeassistant.components.select",
+    "homeassistant.components.number"
+)
+
+_PACKAGE = "custom_components.energy_management"
+_MODULES = (_PACKAGE, *(f"{_PACKAGE}.{name}" for name in ("coordinator", "sensor", "binary_sensor", "select", "number", "services", "view", "websocket_api", "diagnostics")))
+
+# Imported on first use only
+#
+_LAZY = ("holidays", "homeassistant.components.sql", "homeassistant.components.recorder.history")
+
+_SCRIPT = """
+import sys, json, time, importlib
+for name in sys.argv[1].split(","):
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+for name in sys.argv[2].split(","):
+    importlib.import_module(name)
+print(json.dumps({"time": time.perf_counter() - start, "modules": sorted(set(sys.modules) - before)}))
+"""
+
+def _import(*modules: str) -> dict:
+    result = subprocess.run([sys.executable, "-c", _SCRIPT, ",".join(_PRELOAD), ",".join(modules)], cwd = Path(__file__).parents[1], capture_output = True, text = True, check = True)
+    return json.loads(result.stdout)
+
+def test_import_package_is_light() -> None:
+    assert not any(m.startswith(f"{_PACKAGE}.coordinator") for m in _import(_PACKAGE)["modules"])
+
+def test_import_budget() -> None:
+    # Best of three fresh interpreters, a single run is at the mercy of the disk cache and the scheduler
+    #
+    runs = [_import(*_MODULES) for _ in range(3)]
+    assert (best := min(r["time"] for r in runs)) < IMPORT_BUDGET, f"Import took {best * 1000:.0f} ms, budget is {IMPORT_BUDGET * 1000:.0f} ms"
+    assert not [m for m in runs[0]["modules"] if m.startswith(_LAZY)]
+
+def test_lazy_constants() -> None:
+    from custom_components.energy_management import const
+    from custom_components.energy_management.providers.cz import const as cz
+
+    for module in (const, cz):
+        assert module.HOLIDAYS is module.HOLIDAYS
+        with pytest.raises(AttributeError):
+            module.MISSING
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import random
+
+from decimal import Decimal, ROUND_HALF_EVEN, localcontext
+
+import pytest
+
+from custom_components.energy_management import money
+from custom_components.energy_management.money import SCALE, mul, muldiv, round_div, parse, to_money, to_decimal
+
+_VAT = SCALE + to_money("0.21")
+_RANDOM = random.Random(20260101)
+
+def _half_even(value: Decimal) -> int:
+    with localcontext() as context:
+        context.prec = 100
+        return int(value.quantize(Decimal(1), rounding = ROUND_HALF_EVEN))
+
+def _exact(value: str) -> Decimal:
+    with localcontext() as context:
+        context.prec = 100
+        return Decimal(value) * SCALE
+
+def _prices(n: int) -> list[int]:
+    """Fixed point prices of both signs across magnitudes, including exact ties."""
+    return [0, 1, -1, SCALE // 2, -SCALE // 2, 5, -5, 15, -15] + [_RANDOM.choice((1, -1)) * _RANDOM.randrange(10 ** _RANDOM.randrange(1, 13)) for _ in range(n)]
+
+@pytest.mark.parametrize("d", [1, 2, 3, 4, 7, 10, 1000, SCALE, SCALE * 1000])
+def test_round_div(d: int) -> None:
+    for n in _prices(500):
+        assert round_div(n, d) == _half_even(Decimal(n) / Decimal(d)), (n, d)
+
+def test_mul_vat() -> None:
+    for a in _prices(1000):
+        assert mul(a, _VAT) == _half_even(Decimal(a) * Decimal(_VAT) / SCALE), a
+
+def test_mul() -> None:
+    for a, b in zip(_prices(1000), _prices(1000)):
+        assert mul(a, b) == _half_even(Decimal(a) * Decimal(b) / SCALE), (a, b)
+
+def test_muldiv() -> None:
+    for a, b in zip(_prices(1000), _prices(1000)):
+        assert muldiv(a, b, 1000) == _half_even(Decimal(a) * Decimal(b) / SCALE / 1000), (a, b)
+
+@pytest.mark.parametrize("decimals", [0, 1, 2, 3, 8, 9])
+def test_parse_exact(decimals: int) -> None:
+    for _ in range(500):
+        text = f"{_RANDOM.choice(('', '-', '+'))}{_RANDOM.randrange(10000)}" + (f".{_RANDOM.randrange(10 ** decimals):0{decimals}d}" if decimals else "")
+        assert parse(text) == _exact(text), text
+        assert to_decimal(parse(text)) == Decimal(text), text
+
+@pytest.mark.parametrize("decimals", [10, 12, 20])
+def test_parse_rounded(decimals: int) -> None:
+    for text in [f"{sign}0.{'0' * 8}{tail}" for sign in ("", "-") for tail in ("5", "15", "25", "50000000000001")] + [f"{_RANDOM.choice(('', '-'))}{_RANDOM.randrange(10000)}.{_RANDOM.randrange(10 ** decimals):0{decimals}d}" for _ in range(500)]:
+        assert parse(text) == _half_even(_exact(text)), text
+
+def test_spot_price_exact() -> None:
+    # EUR/MWh with 2 decimals times the CNB rate with 3 decimals per kWh needs 8 decimals, no rounding happens
+    #
+    for _ in range(1000):
+        eur, crate = f"{_RANDOM.randrange(-50000, 500000) / 100:.2f}", f"{_RANDOM.randrange(20000, 30000) / 1000:.3f}"
+        assert muldiv(parse(eur), parse(crate), 1000) == _exact(eur) * Decimal(crate) / 1000, (eur, crate)
+
+def test_final_price_within_half_nano() -> None:
+    # Spot price plus distribution with VAT against the former Decimal arithmetic, one rounding of at most 0.5e-9
+    #
+    for _ in range(1000):
+        eur, crate, add = f"{_RANDOM.randrange(-50000, 500000) / 100:.2f}", f"{_RANDOM.randrange(20000, 30000) / 1000:.3f}", f"{_RANDOM.randrange(0, 400000) / 100000:.5f}"
+        fixed = mul(parse(add) + muldiv(parse(eur), parse(crate), 1000), _VAT)
+        with localcontext() as context:
+            context.prec = 100
+            exact = (Decimal(add) + Decimal(eur) * Decimal(crate) / 1000) * Decimal("1.21")
+        assert abs(to_decimal(fixed) - exact) <= Decimal("0.5e-9"), (eur, crate, add)
+
+@pytest.mark.parametrize("value", [0.3, 0.1, 0.01, 1.21, 2.5, 0.123456789, -0.3, 1e-9, 100.0, 0.7])
+def test_float_fee_shortest_repr(value: float) -> None:
+    assert to_money(value) == _exact(repr(value))
+    assert to_money(value) == money.parse(str(value))
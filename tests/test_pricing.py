@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import UTC
+
+from custom_components.energy_management.hub import ProviderHub
+from custom_components.energy_management.money import to_money
+from custom_components.energy_management.providers import cz
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+# Low tariff 00:00-06:00 and 19:00-21:00
+#
+_AREA, _RATE, _TARIFF, _FEE = "cez", "D25d", "AKU8V1", (0.3, 0.3)
+
+@pytest.mark.parametrize(("day", "slots"), [(date(2026, 3, 29), 92), (date(2026, 6, 1), 96), (date(2026, 10, 25), 100)])
+async def test_layer_slots(hass: HomeAssistant, day: date, slots: int) -> None:
+    layer = await cz._get_layer(ProviderHub(hass), _AREA, _RATE, _TARIFF, _FEE, day)
+    start = datetime.combine(day, time(0), tzinfo = TIMEZONE).astimezone(UTC)
+    assert list(layer) == [start + timedelta(minutes = 15 * i) for i in range(slots)]
+
+async def test_fall_back_hours_priced(hass: HomeAssistant) -> None:
+    hub = ProviderHub(hass)
+    first = datetime(2026, 10, 25, 0, 15, tzinfo = UTC)
+    repeated = first + timedelta(hours = 1)
+    assert first.astimezone(TIMEZONE).replace(tzinfo = None) == repeated.astimezone(TIMEZONE).replace(tzinfo = None)
+    prices = [await cz._get_final_pricing(hub, _AREA, _RATE, _TARIFF, _FEE, dt.astimezone(TIMEZONE), to_money("2.5")) for dt in (first, repeated)]
+    assert prices[0] == prices[1]
+    layer = await cz._get_layer(hub, _AREA, _RATE, _TARIFF, _FEE, date(2026, 10, 25))
+    assert first in layer and repeated in layer
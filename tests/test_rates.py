@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from pathlib import Path
+from zoneinfo import ZoneInfo
+from datetime import date, datetime, time, timedelta
+
+from homeassistant.util.dt import UTC
+
+from custom_components.energy_management import rates
+from custom_components.energy_management.rates import RateCache
+
+TZ = ZoneInfo("Europe/Prague")
+KEY = "CZ|CZK|cez|D57d|EVV1|False|0.3|0.3"
+TODAY = date(2026, 10, 19)
+
+def _rates(day: date, value: int = 1) -> list[rates.Rate]:
+    start = datetime.combine(day, time(0), tzinfo = TZ).astimezone(UTC)
+    return [(start + timedelta(minutes = 15 * i), value, value + 1, value + 2) for i in range(96)]
+
+def _cache(tmp_path: Path) -> RateCache:
+    return RateCache(tmp_path / "energy_management" / "rates", 30)
+
+def test_store_read(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    cache.store(KEY, _rates(TODAY) + _rates(TODAY + timedelta(days = 1), 2), TZ, TODAY)
+    assert cache.read(KEY, TODAY, TODAY + timedelta(days = 1)) == _rates(TODAY) + _rates(TODAY + timedelta(days = 1), 2)
+    assert cache.read("other", TODAY, TODAY + timedelta(days = 1)) == []
+
+def test_fresh_install(tmp_path: Path) -> None:
+    # Neither the integration's directory nor the cache exist in a new config directory
+    #
+    cache = _cache(tmp_path)
+    assert cache.read(KEY, TODAY, TODAY) == []
+    cache.store(KEY, _rates(TODAY), TZ, TODAY)
+    assert cache.read(KEY, TODAY, TODAY) == _rates(TODAY)
+
+def test_store_rewrites_only_its_days(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    cache.store(KEY, _rates(TODAY), TZ, TODAY)
+    other = cache._file(KEY, TODAY)
+    before = other.stat().st_mtime_ns, other.read_bytes()
+    cache.store(KEY, _rates(TODAY + timedelta(days = 1), 2), TZ, TODAY)
+    assert (other.stat().st_mtime_ns, other.read_bytes()) == before
+    assert cache.read(KEY, TODAY, TODAY) == _rates(TODAY)
+
+def test_retention(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    old = TODAY - timedelta(days = 31)
+    cache.store(KEY, _rates(old), TZ, old)
+    cache.store(KEY, _rates(TODAY), TZ, TODAY)
+    assert cache.read(KEY, old, old) == []
+    assert not cache._file(KEY, old).exists()
+
+def test_truncated(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    cache.store(KEY, _rates(TODAY), TZ, TODAY)
+    data = (path := cache._file(KEY, TODAY)).read_bytes()
+    for content in (b"", data[:5], data[:-8]):
+        path.write_bytes(content)
+        assert cache.read(KEY, TODAY, TODAY) == []
+
+def test_remove_legacy(tmp_path: Path) -> None:
+    cache = _cache(tmp_path)
+    cache.remove_legacy()
+    cache.path.parent.mkdir()
+    (legacy := cache.path.with_name("ote")).write_text("2026-10-19T00:00:00+00:00 1 2 3\n")
+    cache.remove_legacy()
+    assert not legacy.exists()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta
+
+import pytest
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util.dt import UTC
+
+from custom_components.energy_management.const import DOMAIN
+from custom_components.energy_management.coordinator import Coordinator, CoordinatorData
+from custom_components.energy_management.segments import DayRing
+from custom_components.energy_management.sensor import Freshness
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+NOW = datetime(2026, 10, 19, 10, tzinfo = TIMEZONE)
+
+@pytest.fixture
+async def coordinator(hass: HomeAssistant) -> AsyncGenerator[Coordinator]:
+    await hass.config.async_update(time_zone = "Europe/Prague")
+    entry = MockConfigEntry(domain = DOMAIN, title = "Home")
+    entry.add_to_hass(hass)
+    coordinator = Coordinator(hass, entry)
+    coordinator._load_options(entry.options)
+    yield coordinator
+    coordinator._periodic_listener()
+
+def _tick(coordinator: Coordinator, now: datetime) -> None:
+    ring = DayRing(0, 1)
+    ring.rotate(now.date())
+    ring.put(now.date(), {NOW.astimezone(UTC): (1, 2, 3)})
+    coordinator.data = CoordinatorData(now.astimezone(UTC), ring, "Europe/Prague")
+
+async def test_freshness_writes(hass: HomeAssistant, coordinator: Coordinator) -> None:
+    writes = [0]
+
+    def write() -> None:
+        writes[0] += 1
+
+    coordinator.fresh["battery"] = NOW
+    entity = Freshness(coordinator, "battery")
+    entity.hass = hass
+    entity.async_write_ha_state = write
+    # Minute ticks without a new sample are not written until the sample turns stale
+    #
+    for minute in range(0, 45):
+        _tick(coordinator, NOW + timedelta(minutes = minute))
+        entity._handle_coordinator_update()
+    assert writes[0] == 2
+    assert entity.extra_state_attributes["stale"]
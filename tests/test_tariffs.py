@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+
+from pathlib import Path
+from datetime import datetime
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.energy_management.hub import ProviderHub
+from custom_components.energy_management.providers import cz
+from custom_components.energy_management.providers.cz import tariffs
+from custom_components.energy_management.providers.cz.const import TIMEZONE
+
+@pytest.fixture(autouse = True)
+def _compiled(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(tariffs, "RATE", {})
+    monkeypatch.setattr(tariffs, "TARIFF", {})
+    monkeypatch.setattr(tariffs, "_loaded", set())
+
+def test_missing_year_falls_back(caplog: pytest.LogCaptureFixture) -> None:
+    tariffs.load((2026, 2031))
+    assert tariffs.loaded(2031)
+    assert "Distribution rates for 2031 are not available" in caplog.text
+    assert [r.levelno for r in caplog.records] == [logging.ERROR]
+    assert tariffs.get(2031, "cez", "D01d") == tariffs.get(2026, "cez", "D01d")
+
+def test_invalid_year_falls_back(tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
+    for name in ("tariffs", "2026"):
+        (tmp_path / f"{name}.json").write_text((tariffs.DATA / f"{name}.json").read_text(encoding = "utf-8"), encoding = "utf-8")
+    (tmp_path / "2027.json").write_text(json.dumps({"version": tariffs.DATA_VERSION, "year": 2027, "fees": ["x"], "areas": {}}), encoding = "utf-8")
+    monkeypatch.setattr(tariffs, "DATA", tmp_path)
+    tariffs.load((2026, 2027))
+    assert "Distribution rates for 2027 are invalid" in caplog.text
+    assert tariffs.get(2027, "cez", "D01d") == tariffs.get(2026, "cez", "D01d")
+
+def test_unknown_rate() -> None:
+    tariffs.load((2026,))
+    with pytest.raises(ValueError, match = "cez/D99d"):
+        tariffs.get(2026, "cez", "D99d")
+
+def test_get_never_reads(monkeypatch: pytest.MonkeyPatch) -> None:
+    tariffs.load((2026,))
+    monkeypatch.setattr(tariffs, "_read", lambda name: pytest.fail(f"{name}.json read by get"))
+    assert tariffs.get(2025, "cez", "D01d") == tariffs.get(2026, "cez", "D01d")
+
+async def test_distribution_loads_in_executor(hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch) -> None:
+    threads = []
+    read = tariffs._read
+    monkeypatch.setattr(tariffs, "_read", lambda name: threads.append(threading.current_thread()) or read(name))
+    assert await cz._get_distribution(ProviderHub(hass), "cez", "D25d", "AKU8V1", datetime(2026, 1, 1, 3, tzinfo = TIMEZONE)) == (-1, tariffs.get(2026, "cez", "D25d").fee + tariffs.get(2026, "cez", "D25d").rates["T2"])
+    assert threads and threading.main_thread() not in threads
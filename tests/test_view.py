@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from custom_components.energy_management.view import _matches
+
+ETAG = "\"0123456789abcdef\""
+
+def test_matches() -> None:
+    assert _matches(ETAG, ETAG)
+    assert _matches(f"W/{ETAG}", ETAG)
+    assert _matches(f"\"fedcba9876543210\", W/{ETAG}", ETAG)
+    assert _matches(" * ", ETAG)
+    assert not _matches("\"fedcba9876543210\"", ETAG)
+    assert not _matches(f"x{ETAG}x", ETAG)
+    assert not _matches(ETAG.strip("\""), ETAG)
+    assert not _matches("", ETAG)
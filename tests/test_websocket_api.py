@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from typing import Any
+from logging import getLogger
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from custom_components.energy_management import websocket_api
+from custom_components.energy_management.const import DOMAIN
+
+async def test_unload_closes_subscriptions(hass: HomeAssistant, hass_ws_client: Any) -> None:
+    assert await async_setup_component(hass, "websocket_api", {})
+    websocket_api.async_setup(hass)
+    entry = MockConfigEntry(domain = DOMAIN, title = "Home", state = ConfigEntryState.LOADED)
+    entry.add_to_hass(hass)
+    # Only listening and its data are used by the subscription
+    #
+    entry.runtime_data = coordinator = DataUpdateCoordinator(hass, getLogger(__name__), config_entry = entry, name = "Home")
+    client = await hass_ws_client(hass)
+    for i in (1, 2):
+        await client.send_json({"id": i, "type": f"{DOMAIN}/subscribe_series", "entry_id": entry.entry_id})
+        assert (await client.receive_json())["success"]
+    await client.send_json({"id": 3, "type": "unsubscribe_events", "subscription": 1})
+    assert (await client.receive_json())["success"]
+    assert len(coordinator._listeners) == 1
+    assert await hass.config_entries.async_unload(entry.entry_id)
+    assert not coordinator._listeners
+    # The subscription is gone from the connection as well
+    #
+    await client.send_json({"id": 4, "type": "unsubscribe_events", "subscription": 2})
+    assert not (await client.receive_json())["success"]